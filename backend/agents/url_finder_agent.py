@@ -8,9 +8,9 @@ This agent is responsible for:
 - Returning the verified full URL
 """
 
-import yaml
-from crewai import Agent, LLM
+from crewai import Agent
 from models.agent_config import AgentConfig
+from helper.config_registry import get_config_registry
 
 
 class URLFinderAgent:
@@ -18,7 +18,7 @@ class URLFinderAgent:
     URL Finder Agent class for discovering and verifying workflow starting points.
     
     This class handles:
-    - Loading agent configuration from YAML
+    - Loading agent configuration from the config registry
     - Generating comprehensive backstories
     - Creating and configuring the CrewAI Agent
     - Managing agent lifecycle
@@ -33,15 +33,12 @@ class URLFinderAgent:
     
     def _load_config(self) -> AgentConfig:
         """
-        Load agent configuration from YAML file.
+        Get the agent configuration from the config registry.
         
         Returns:
-            AgentConfig object with all configuration parameters
+            AgentConfig object loaded from configs/agents/url_finder_agent.yaml
         """
-        with open("configs/agents/url_finder_agent.yaml", "r") as f:
-            yaml_data = yaml.safe_load(f)
-            config = AgentConfig(**yaml_data["url_finder_agent"])
-        return config
+        return get_config_registry().agent_config("url_finder_agent")
     
     def _create_agent(self) -> Agent:
         """
@@ -57,7 +54,7 @@ class URLFinderAgent:
             backstory=self.config.backstory,
             verbose=self.config.verbose,
             allow_delegation=self.config.allow_delegation,
-            llm=LLM(model=self.config.llm),
+            llm=get_config_registry().llm(self.config.llm),
             cache=False,  # Disable agent-level tool caching otherwise it does not take the latest snapshot
         )
         
@@ -0,0 +1,3 @@
+"""
+Benchmarks package - offline performance measurements against local fixture pages.
+"""
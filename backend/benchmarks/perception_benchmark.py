@@ -0,0 +1,91 @@
+"""
+Perception Benchmark - Snapshot time on large DOMs, before and after.
+
+Loads the large DOM fixture at several sizes and measures:
+- legacy: the original snapshot script (per-candidate ancestor style walks)
+- cold: the perception agent's first snapshot of the page
+- warm: a repeat snapshot with no DOM changes
+- modal: a snapshot right after a dialog was appended
+
+Usage (from the backend directory):
+    python -m benchmarks.perception_benchmark --sizes 1000 10000 50000 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from playwright.async_api import async_playwright, Page
+from helper.perception import PERCEPTION_SCRIPT
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _load_legacy_script() -> str:
+    lines = (FIXTURES_DIR / "legacy_perception.js").read_text().splitlines()
+    return "\n".join(line for line in lines if not line.startswith("//"))
+
+
+async def _timed(page: Page, expression: str, arg=None) -> float:
+    started = time.perf_counter()
+    await page.evaluate(expression, arg)
+    return (time.perf_counter() - started) * 1000
+
+
+async def _measure_size(page: Page, fixture_url: str, nodes: int, runs: int, legacy_script: str) -> dict:
+    url = f"{fixture_url}?nodes={nodes}"
+    snapshot = "() => window.__perception.snapshot(500).elements.length"
+    results = {"legacy": [], "cold": [], "warm": [], "modal": []}
+
+    for _ in range(runs):
+        await page.goto(url)
+        results["legacy"].append(await _timed(page, legacy_script))
+
+        await page.goto(url)
+        await page.evaluate(PERCEPTION_SCRIPT)
+        results["cold"].append(await _timed(page, snapshot))
+        results["warm"].append(await _timed(page, snapshot))
+        await page.evaluate("() => window.openModal()")
+        results["modal"].append(await _timed(page, snapshot))
+
+    node_count = await page.evaluate("() => document.getElementsByTagName('*').length")
+    return {
+        "nodes": node_count,
+        **{f"{name}_ms": round(statistics.median(values), 1) for name, values in results.items()},
+    }
+
+
+async def run(sizes: list, runs: int) -> list:
+    legacy_script = _load_legacy_script()
+    fixture_url = (FIXTURES_DIR / "large_dom.html").resolve().as_uri()
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page(viewport={"width": 1920, "height": 1080})
+        rows = [await _measure_size(page, fixture_url, nodes, runs, legacy_script) for nodes in sizes]
+        await browser.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UI snapshot extraction on large DOMs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="Fixture DOM sizes")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per size, the median is reported")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.sizes, args.runs))
+
+    print(f"{'nodes':>8} {'legacy ms':>10} {'cold ms':>9} {'warm ms':>9} {'modal ms':>9}")
+    for row in rows:
+        print(f"{row['nodes']:>8} {row['legacy_ms']:>10} {row['cold_ms']:>9} {row['warm_ms']:>9} {row['modal_ms']:>9}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
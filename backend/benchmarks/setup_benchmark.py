@@ -0,0 +1,99 @@
+"""
+Setup Benchmark - Per-request agent/task setup time, before and after the config registry.
+
+Measures what every request pays before the crew starts:
+- legacy: re-parse the four YAML configs and build a new LLM client per agent
+- registry: the same configs and LLM clients from the warm config registry
+- crew: building both agents, both tasks and the Crew from the registry
+
+Startup time of the registry (load_all) is reported once.
+
+Usage (from the backend directory):
+    python -m benchmarks.setup_benchmark --runs 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+import yaml
+from crewai import Crew, LLM
+from helper.config_registry import get_config_registry
+from models.agent_config import AgentConfig
+from models.task_config import TaskConfig
+from agents.url_finder_agent import URLFinderAgent
+from agents.workflow_executor_agent import WorkflowExecutorAgent
+from tasks.url_finding_task import URLFindingTask
+from tasks.workflow_execution_task import WorkflowExecutionTask
+
+AGENTS = ["url_finder_agent", "workflow_executor_agent"]
+TASKS = ["url_finding_task", "workflow_execution_task"]
+
+
+def _legacy_setup():
+    for name in AGENTS:
+        with open(f"configs/agents/{name}.yaml", "r") as f:
+            config = AgentConfig(**yaml.safe_load(f)[name])
+        LLM(model=config.llm)
+    for name in TASKS:
+        with open(f"configs/tasks/{name}.yaml", "r") as f:
+            TaskConfig(**yaml.safe_load(f)[name])
+
+
+def _registry_setup():
+    registry = get_config_registry()
+    for name in AGENTS:
+        registry.llm(registry.agent_config(name).llm)
+    for name in TASKS:
+        registry.task_config(name)
+
+
+def _crew_setup():
+    url_finder_agent = URLFinderAgent().get_agent()
+    workflow_executor_agent = WorkflowExecutorAgent().get_agent()
+    url_finding_task = URLFindingTask(agent=url_finder_agent, tools=[]).get_task()
+    workflow_execution_task = WorkflowExecutionTask(
+        agent=workflow_executor_agent, tools=[], url_finding_task=url_finding_task
+    ).get_task()
+    Crew(agents=[url_finder_agent, workflow_executor_agent], tasks=[url_finding_task, workflow_execution_task], cache=False)
+
+
+def _median_ms(func, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def run(runs: int) -> dict:
+    started = time.perf_counter()
+    get_config_registry().load_all()
+    startup_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    return {
+        "startup_ms": startup_ms,
+        "legacy_ms": _median_ms(_legacy_setup, runs),
+        "registry_ms": _median_ms(_registry_setup, runs),
+        "crew_ms": _median_ms(_crew_setup, runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request agent and task setup.")
+    parser.add_argument("--runs", type=int, default=200, help="Runs per measurement, the median is reported")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    print(f"{'startup ms':>11} {'legacy ms':>10} {'registry ms':>12} {'crew ms':>8}")
+    print(f"{result['startup_ms']:>11} {result['legacy_ms']:>10} {result['registry_ms']:>12} {result['crew_ms']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Workflow Benchmark - End-to-end tool performance on local fixture apps, offline.
+
+Serves the fixture apps in benchmarks/fixtures over a local HTTP server and lets a
+scripted stub LLM drive the real CrewAI tools (navigate, snapshot, click, fill)
+through the browser pool, the tool bridge and Perception, exactly as the agents
+would, but without OpenAI or any live site. Scenarios:
+- large_dom: a generated app-like page of --nodes elements
+- modal: a settings dialog with CSS transitions and a delayed save request
+- spa: a single-page app that fetches its items late and renders views on a timer
+
+Reported per step (median over --runs): latency, settle wait, screenshot capture
+and encode time, perception extraction time and snapshot size; per scenario the
+browser and JS heap memory. --json writes everything, with the current commit,
+for comparing runs across commits.
+
+Usage (from the backend directory):
+    python -m benchmarks.workflow_benchmark --runs 3 --json workflow.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from browser_pool import BrowserPool
+from create_tools import create_tools
+from helper.instrumentation import record_task_timings
+from helper.page_helper import get_current_page
+from helper.screenshot_store import get_screenshot_store
+from helper.task_events import TaskEventStream
+from models.screenshot_options import ScreenshotOptions
+from session import prepare_context
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+INTERACTIVE_TAGS = {"a", "button", "input", "textarea", "select"}
+
+# Each scenario is the sequence of tool calls the stub LLM makes. Elements are
+# named by their text or label and resolved to ids from the latest snapshot.
+SCENARIOS = {
+    "large_dom": [
+        ("navigate", "/large_dom.html?nodes={nodes}"),
+        ("snapshot",),
+        ("click", "Open 3"),
+        ("snapshot_delta",),
+        ("fill", "Filter 3", "quarterly report"),
+    ],
+    "modal": [
+        ("navigate", "/modal_app.html"),
+        ("snapshot",),
+        ("click", "Open settings"),
+        ("snapshot_delta",),
+        ("fill", "Display name", "Ada Lovelace"),
+        ("click", "Save"),
+        ("snapshot_delta",),
+    ],
+    "spa": [
+        ("navigate", "/spa_delayed.html?delay_ms=600&count=200"),
+        ("snapshot",),
+        ("click", "Item 7"),
+        ("snapshot_delta",),
+        ("fill", "Comment", "Looks good"),
+        ("click", "Archive item"),
+    ],
+}
+
+TOOL_NAMES = {
+    "navigate": "navigate_page_and_take_screenshot_tool",
+    "snapshot": "capture_ui_snapshot_tool",
+    "snapshot_delta": "capture_ui_snapshot_tool",
+    "click": "click_element_and_take_screenshot_tool",
+    "fill": "fill_input_and_take_screenshot_tool",
+}
+
+# Timing breakdown keys reported per step
+SPAN_COLUMNS = {
+    "settle_ms": "settle_wait",
+    "capture_ms": "screenshot_capture",
+    "encode_ms": "screenshot_encode",
+    "perception_ms": "perception_extract",
+}
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the fixtures, plus /api/items and /api/save answered after ?delay_ms."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/api/"):
+            return super().do_GET()
+
+        query = parse_qs(url.query)
+        time.sleep(int(query.get("delay_ms", ["0"])[0]) / 1000)
+        if url.path == "/api/items":
+            count = int(query.get("count", ["50"])[0])
+            body = [
+                {"id": i, "name": f"Item {i}", "description": f"Description of item {i}"}
+                for i in range(1, count + 1)
+            ]
+        else:
+            body = {"ok": True}
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_fixture_server() -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_FixtureHandler, directory=str(FIXTURES_DIR)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class ScriptedLLM:
+    """
+    Stand-in for the agent's LLM: turns a scenario script into tool calls.
+
+    Like the real agent it only sees tool results; element names in the script
+    are looked up in the snapshots it has received to find the element ids.
+    """
+
+    def __init__(self, script: List[tuple], base_url: str, nodes: int):
+        self.script = script
+        self.base_url = base_url
+        self.nodes = nodes
+        self._elements: Dict[int, Tuple[str, str, str, str]] = {}
+        self._snapshot_id: Optional[int] = None
+
+    def calls(self):
+        """Yield (action, tool name, tool arguments) for each step of the script."""
+        for action, *params in self.script:
+            if action == "navigate":
+                self._elements.clear()
+                self._snapshot_id = None
+                kwargs = {"url": self.base_url + params[0].format(nodes=self.nodes)}
+            elif action == "snapshot":
+                kwargs = {}
+            elif action == "snapshot_delta":
+                kwargs = {"since_snapshot_id": self._snapshot_id}
+            elif action == "click":
+                kwargs = {"element_id": self._find(params[0])}
+            else:
+                kwargs = {"element_id": self._find(params[0]), "value": params[1]}
+            yield action, TOOL_NAMES[action], kwargs
+
+    def observe(self, result):
+        """Take in a tool result; snapshots update the known elements."""
+        if not isinstance(result, dict):
+            return
+        self._snapshot_id = result.get("snapshot_id")
+        if result.get("mode") != "delta":
+            self._elements.clear()
+        removed = result.get("removed_element_ids") or [item.get("id") for item in result.get("removed_elements", [])]
+        for element_id in removed:
+            self._elements.pop(element_id, None)
+        for key in ("visible_elements", "added_elements", "changed_elements"):
+            value = result.get(key)
+            if isinstance(value, str):
+                for line in filter(None, value.split("\n")):
+                    cells = line.split("|")
+                    self._elements[int(cells[0])] = (cells[1], cells[2], cells[3], cells[4])
+            elif isinstance(value, list):
+                for item in value:
+                    self._elements[item["id"]] = (
+                        item.get("tag", ""), item.get("role", ""), item.get("hasText", ""), item.get("ariaLabel", "")
+                    )
+
+    def _find(self, name: str) -> Optional[int]:
+        """Id of the element named name: exact matches before partial ones, controls before text."""
+        name = name.lower()
+        candidates = []
+        for element_id, (tag, role, text, label) in self._elements.items():
+            names = (text.lower(), label.lower())
+            if name in names:
+                rank = 0
+            elif any(name in value for value in names):
+                rank = 2
+            else:
+                continue
+            if tag not in INTERACTIVE_TAGS and not role:
+                rank += 1
+            candidates.append((rank, element_id))
+        return min(candidates)[1] if candidates else None
+
+
+async def _run_scenario(pool: BrowserPool, name: str, base_url: str, nodes: int, options: ScreenshotOptions, session_path: str) -> dict:
+    lease = await pool.acquire(storage_state=session_path)
+    await prepare_context(lease)
+    events = TaskEventStream()
+    task_id = f"benchmark-{name}-{int(time.time() * 1000)}"
+    tools = {tool.name: tool for tool in create_tools(lease.context, task_id, events, options)}
+    llm = ScriptedLLM(SCENARIOS[name], base_url, nodes)
+
+    steps = []
+    try:
+        for action, tool_name, kwargs in llm.calls():
+            started = time.perf_counter()
+            # CrewAI runs tools from a worker thread; so does the benchmark
+            with record_task_timings() as timings:
+                result = await asyncio.to_thread(tools[tool_name].run, **kwargs)
+            latency_ms = (time.perf_counter() - started) * 1000
+            llm.observe(result)
+
+            breakdown = timings.summary()
+            step = {"action": action, "latency_ms": latency_ms}
+            for column, span_name in SPAN_COLUMNS.items():
+                step[column] = sum(timing.total_ms for key, timing in breakdown.items() if key.split(":")[0] == span_name)
+            if isinstance(result, dict):
+                step["snapshot_chars"] = len(json.dumps(result))
+                step["snapshot_tokens"] = step["snapshot_chars"] // 4
+            elif isinstance(result, str) and ("failed" in result.lower() or result.startswith("No ")):
+                step["error"] = result
+            steps.append(step)
+
+        page = await get_current_page(lease.context)
+        js_heap = await page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : null")
+        memory = {
+            "browser_rss_mb": await pool.memory_mb(lease.browser),
+            "js_heap_mb": round(js_heap / 1024 / 1024, 1) if js_heap else None,
+        }
+    finally:
+        await lease.release()
+        store = get_screenshot_store()
+        for event in events.history:
+            if event.screenshot_path:
+                store.release(task_id, event.screenshot_path)
+
+    return {"steps": steps, "memory": memory}
+
+
+def _median_steps(runs: List[dict]) -> List[dict]:
+    """Median of every numeric column, step by step; the scripts make steps line up across runs."""
+    rows = []
+    for step_runs in zip(*(run["steps"] for run in runs)):
+        row = {"action": step_runs[0]["action"]}
+        for key in step_runs[0]:
+            values = [step[key] for step in step_runs if isinstance(step.get(key), (int, float))]
+            if key != "action" and values:
+                row[key] = round(statistics.median(values), 1)
+        errors = [step["error"] for step in step_runs if "error" in step]
+        if errors:
+            row["error"] = errors[0]
+        rows.append(row)
+    return rows
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(scenarios: List[str], runs: int, nodes: int, options: ScreenshotOptions) -> dict:
+    server, base_url = _start_fixture_server()
+    pool = BrowserPool(size=1, headless=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        session_path = os.path.join(directory, "session.json")
+        with open(session_path, "w") as f:
+            json.dump({"cookies": [], "origins": []}, f)
+
+        results = {}
+        try:
+            await pool.start()
+            for name in scenarios:
+                scenario_runs = [
+                    await _run_scenario(pool, name, base_url, nodes, options, session_path) for _ in range(runs)
+                ]
+                steps = _median_steps(scenario_runs)
+                results[name] = {
+                    "steps": steps,
+                    "total_ms": round(sum(step["latency_ms"] for step in steps), 1),
+                    "memory": scenario_runs[-1]["memory"],
+                }
+        finally:
+            await pool.close()
+            server.shutdown()
+
+    return {
+        "commit": _commit(),
+        "runs": runs,
+        "nodes": nodes,
+        "screenshot": options.model_dump(),
+        # ru_maxrss is in KB on Linux
+        "python_max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the browser tools on local fixture apps with a scripted LLM.")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per scenario, the median of each step is reported")
+    parser.add_argument("--nodes", type=int, default=10000, help="DOM size of the large_dom scenario")
+    parser.add_argument("--format", choices=["png", "jpeg", "webp"], default="png", help="Screenshot format")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.scenarios, args.runs, args.nodes, ScreenshotOptions(format=args.format)))
+
+    columns = ["latency_ms", *SPAN_COLUMNS, "snapshot_tokens"]
+    for name, scenario in result["scenarios"].items():
+        memory = scenario["memory"]
+        print(f"\n{name}: {scenario['total_ms']} ms, browser {memory['browser_rss_mb']} MB, JS heap {memory['js_heap_mb']} MB")
+        print(f"{'step':<16}" + "".join(f"{column:>16}" for column in columns))
+        for step in scenario["steps"]:
+            print(f"{step['action']:<16}" + "".join(f"{step.get(column, ''):>16}" for column in columns))
+            if "error" in step:
+                print(f"  ! {step['error']}")
+    print(f"\nPython max RSS: {result['python_max_rss_mb']} MB")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Browser Pool - Keeps warm Chromium processes and leases isolated contexts.
+
+Launching Chromium costs seconds per task, so the pool starts a fixed number of
+headless browsers once and hands out a fresh BrowserContext per task. Browsers
+are recycled after serving a configurable number of contexts or when their
+process tree grows past a memory ceiling.
+"""
+
+import asyncio
+import os
+from typing import Optional, Union
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext
+from helper.instrumentation import span
+from helper.request_blocking import RequestBlocker, create_request_blocker
+from models.browser_pool_stats import BrowserPoolStats
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# Chromium flags per launch profile; "lean" drops what headless capture never uses
+LAUNCH_PROFILES = {
+    "full": [],
+    "lean": [
+        "--disable-gpu",
+        "--disable-extensions",
+        "--disable-component-extensions-with-background-pages",
+        "--disable-background-networking",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-features=Translate,MediaRouter,OptimizationHints",
+        "--disable-dev-shm-usage",
+        "--autoplay-policy=user-gesture-required",
+        "--mute-audio",
+        "--no-first-run",
+    ],
+}
+
+
+class PooledBrowser:
+    """
+    A long-lived browser process owned by the pool.
+    """
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.contexts_served = 0
+
+
+class BrowserLease:
+    """
+    A browser context leased from the pool for the duration of one task.
+
+    The context is isolated from every other lease, even when it shares the
+    underlying browser process. Call release() when the task is done.
+    """
+
+    def __init__(self, pool: "BrowserPool", pooled: PooledBrowser, context: BrowserContext, request_blocker: RequestBlocker):
+        self._pool = pool
+        self._released = False
+        self.pooled = pooled
+        self.context = context
+        self.request_blocker = request_blocker
+
+    @property
+    def browser(self) -> Browser:
+        return self.pooled.browser
+
+    async def release(self):
+        """
+        Close the leased context and hand the browser back to the pool.
+        """
+        if self._released:
+            return
+        self._released = True
+        await self._pool.release(self)
+
+
+class BrowserPool:
+    """
+    Pool of warm Chromium browsers.
+
+    Responsibilities:
+    - Launch and keep N browsers warm
+    - Lease one isolated BrowserContext per task, built from a storage state
+    - Recycle browsers after too many contexts or too much memory
+    - Report pool statistics
+    """
+
+    def __init__(
+        self,
+        size: int = None,
+        max_contexts_per_browser: int = None,
+        max_memory_mb: int = None,
+        headless: bool = None,
+        launch_profile: str = None,
+    ):
+        """
+        Initialize the pool. Unset arguments are read from the environment.
+
+        Args:
+            size: Number of warm browsers (BROWSER_POOL_SIZE, default 2)
+            max_contexts_per_browser: Contexts served before a browser is recycled
+                (BROWSER_POOL_MAX_CONTEXTS, default 20)
+            max_memory_mb: Memory ceiling of a browser process tree in MB, 0 disables
+                the check (BROWSER_POOL_MAX_MEMORY_MB, default 1500)
+            headless: Launch browsers headless (BROWSER_HEADLESS, default true)
+            launch_profile: Chromium flags from LAUNCH_PROFILES (BROWSER_LAUNCH_PROFILE, default lean)
+        """
+        self.size = size if size is not None else int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.max_contexts_per_browser = (
+            max_contexts_per_browser
+            if max_contexts_per_browser is not None
+            else int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "20"))
+        )
+        self.max_memory_mb = (
+            max_memory_mb if max_memory_mb is not None else int(os.getenv("BROWSER_POOL_MAX_MEMORY_MB", "1500"))
+        )
+        self.headless = (
+            headless if headless is not None else os.getenv("BROWSER_HEADLESS", "true").lower() != "false"
+        )
+        self.launch_profile = launch_profile or os.getenv("BROWSER_LAUNCH_PROFILE", "lean")
+        if self.launch_profile not in LAUNCH_PROFILES:
+            raise ValueError(f"Unknown browser launch profile '{self.launch_profile}', use one of {', '.join(LAUNCH_PROFILES)}")
+
+        self._playwright: Optional[Playwright] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._background_tasks = set()
+        self._leased = 0
+        self._launches = 0
+        self._recycles = 0
+        self._contexts_created = 0
+        self._blocked_requests = 0
+
+    @property
+    def playwright(self) -> Playwright:
+        if self._playwright is None:
+            raise RuntimeError("Browser pool has not been started.")
+        return self._playwright
+
+    async def start(self):
+        """
+        Start Playwright and launch the warm browsers. Safe to call repeatedly.
+        """
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            self._playwright = await async_playwright().start()
+            idle = asyncio.Queue()
+            browsers = await asyncio.gather(*(self._launch() for _ in range(self.size)))
+            for pooled in browsers:
+                idle.put_nowait(pooled)
+            self._idle = idle
+            print(f"Browser pool started with {self.size} warm browsers")
+
+    async def close(self):
+        """
+        Close every idle browser and stop Playwright.
+        """
+        if self._idle is None:
+            return
+        while not self._idle.empty():
+            pooled = self._idle.get_nowait()
+            await self._close_browser(pooled)
+        self._idle = None
+        await self._playwright.stop()
+        self._playwright = None
+
+    async def acquire(self, storage_state: Union[str, dict] = None) -> BrowserLease:
+        """
+        Lease a fresh BrowserContext with one open page.
+
+        Waits until a browser is idle when every browser is leased.
+
+        Args:
+            storage_state: Session cookies/localStorage as a file path or parsed dict
+
+        Returns:
+            BrowserLease holding the browser and its new context
+        """
+        await self.start()
+        pooled = await self._idle.get()
+        try:
+            if not pooled.browser.is_connected():
+                pooled = await self._launch()
+            async with span("context_create"):
+                context = await pooled.browser.new_context(
+                    storage_state=storage_state,
+                    viewport=VIEWPORT,
+                    device_scale_factor=1.0,
+                )
+                request_blocker = create_request_blocker()
+                await request_blocker.install(context)
+                await context.new_page()
+        except Exception:
+            self._idle.put_nowait(pooled)
+            raise
+
+        pooled.contexts_served += 1
+        self._leased += 1
+        self._contexts_created += 1
+        return BrowserLease(self, pooled, context, request_blocker)
+
+    async def release(self, lease: BrowserLease):
+        """
+        Close a leased context and return its browser to the idle queue,
+        recycling the browser first when it has hit a limit.
+        """
+        try:
+            await lease.context.close()
+        except Exception as e:
+            print(f"Closing leased context failed: {type(e).__name__} - {e}")
+        self._leased -= 1
+        self._blocked_requests += lease.request_blocker.total_blocked()
+
+        pooled = lease.pooled
+        if await self._needs_recycle(pooled):
+            # Relaunch in the background so the task response is not delayed
+            task = asyncio.create_task(self._recycle(pooled))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        else:
+            self._idle.put_nowait(pooled)
+
+    async def launch_interactive_browser(self) -> Browser:
+        """
+        Launch a visible, non-pooled browser, used for manual login.
+        The caller is responsible for closing it.
+        """
+        await self.start()
+        self._launches += 1
+        return await self.playwright.chromium.launch(headless=False)
+
+    def stats(self) -> BrowserPoolStats:
+        """
+        Get a snapshot of the pool statistics.
+        """
+        return BrowserPoolStats(
+            size=self.size,
+            idle=self._idle.qsize() if self._idle is not None else 0,
+            leased=self._leased,
+            launches=self._launches,
+            recycles=self._recycles,
+            contexts_created=self._contexts_created,
+            blocked_requests=self._blocked_requests,
+        )
+
+    async def memory_mb(self, browser: Browser) -> Optional[float]:
+        """
+        Resident memory of the browser process tree in MB, or None when it
+        cannot be measured on this platform.
+        """
+        try:
+            session = await browser.new_browser_cdp_session()
+            info = await session.send("SystemInfo.getProcessInfo")
+            await session.detach()
+        except Exception:
+            return None
+
+        total_kb = 0
+        for process in info.get("processInfo", []):
+            try:
+                with open(f"/proc/{process['id']}/status", "r") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total_kb += int(line.split()[1])
+                            break
+            except (OSError, ValueError):
+                continue
+        return total_kb / 1024 if total_kb else None
+
+    async def _launch(self) -> PooledBrowser:
+        async with span("browser_launch"):
+            browser = await self.playwright.chromium.launch(
+                headless=self.headless, args=LAUNCH_PROFILES[self.launch_profile]
+            )
+        self._launches += 1
+        return PooledBrowser(browser)
+
+    async def _recycle(self, pooled: PooledBrowser):
+        await self._close_browser(pooled)
+        self._recycles += 1
+        try:
+            pooled = await self._launch()
+        except Exception as e:
+            # Keep the dead browser in the queue so the next acquire relaunches it
+            print(f"Relaunching recycled browser failed: {type(e).__name__} - {e}")
+        self._idle.put_nowait(pooled)
+
+    async def _needs_recycle(self, pooled: PooledBrowser) -> bool:
+        if not pooled.browser.is_connected():
+            return True
+        if self.max_contexts_per_browser and pooled.contexts_served >= self.max_contexts_per_browser:
+            print(f"Recycling browser after {pooled.contexts_served} contexts")
+            return True
+        if self.max_memory_mb:
+            memory_mb = await self.memory_mb(pooled.browser)
+            if memory_mb is not None and memory_mb > self.max_memory_mb:
+                print(f"Recycling browser using {memory_mb:.0f} MB")
+                return True
+        return False
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"Closing pooled browser failed: {type(e).__name__} - {e}")
+
+
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserPool()
+    return _browser_pool
@@ -9,12 +9,22 @@ from tools.click_element_tool import create_click_element_tool
 from tools.fill_input_tool import create_fill_input_tool
 from tools.navigate_tool import create_navigate_tool
 from tools.snapshot_tool import create_snapshot_tool
+from tools.ui_actions_tool import create_ui_actions_tool
+from tools.verify_urls_tool import create_verify_urls_tool
 from tools.web_search_tool import create_web_search_tool
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from helper.task_events import TaskEventStream
+from models.screenshot_options import ScreenshotOptions
 
 
-def create_tools(context: BrowserContext, id_number: str):
+def create_tools(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream = None,
+    screenshot_options: ScreenshotOptions = None,
+):
     """
-    Create all tools with browser context and id_number dependencies injected.
+    Create all tools with browser context, id_number and event stream dependencies injected.
     
     This function coordinates the creation of all tools by:
     1. Getting the current event loop
@@ -24,18 +34,29 @@ def create_tools(context: BrowserContext, id_number: str):
     Args:
         context: Playwright BrowserContext for dynamic page management
         id_number: Unique identifier for this task (used in screenshot paths)
+        events: Stream that receives a step event per browser tool invocation
+        screenshot_options: Format, quality, scaling and thumbnail size of the screenshots
         
     Returns:
         List of configured CrewAI tools
     """
     # Get the event loop that Playwright is running on
     loop = asyncio.get_event_loop()
+
+    # Tools always report their steps, even when nobody is listening
+    if events is None:
+        events = TaskEventStream()
+    
+    # Interaction tools prepare the next UI snapshot for the snapshot tool
+    prefetcher = SnapshotPrefetcher(context, loop)
     
     # Create each tool using its factory function
-    click_element_and_take_screenshot_tool = create_click_element_tool(context, id_number, loop)
-    fill_input_and_take_screenshot_tool = create_fill_input_tool(context, id_number, loop)
-    navigate_page_and_take_screenshot_tool = create_navigate_tool(context, id_number, loop)
-    capture_ui_snapshot_tool = create_snapshot_tool(context, loop)
+    click_element_and_take_screenshot_tool = create_click_element_tool(context, id_number, loop, events, screenshot_options, prefetcher)
+    fill_input_and_take_screenshot_tool = create_fill_input_tool(context, id_number, loop, events, screenshot_options, prefetcher)
+    navigate_page_and_take_screenshot_tool = create_navigate_tool(context, id_number, loop, events, screenshot_options, prefetcher)
+    perform_ui_actions_tool = create_ui_actions_tool(context, id_number, loop, events, screenshot_options, prefetcher)
+    capture_ui_snapshot_tool = create_snapshot_tool(context, loop, events, prefetcher)
+    verify_urls_tool = create_verify_urls_tool(context, loop, events)
     
     # Create API-based tools (no browser dependencies needed)
     web_search_tool = create_web_search_tool()
@@ -44,6 +65,8 @@ def create_tools(context: BrowserContext, id_number: str):
         click_element_and_take_screenshot_tool,
         fill_input_and_take_screenshot_tool,
         navigate_page_and_take_screenshot_tool,
+        perform_ui_actions_tool,
         capture_ui_snapshot_tool,
+        verify_urls_tool,
         web_search_tool,
     ]
\ No newline at end of file
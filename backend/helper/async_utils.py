@@ -3,45 +3,184 @@ Async utility functions for tools.
 
 This module provides utilities for converting async functions to sync,
 enabling async Playwright operations to work with CrewAI's thread-based execution model.
+
+CrewAI calls tools from worker threads and runs a coroutine returned by a tool
+with asyncio.run on a fresh loop, where the Playwright objects of the task cannot
+be used. Tools therefore stay synchronous and hand their coroutine to the
+ToolBridge, which runs it on the Playwright loop with a per-tool timeout, a bound
+on concurrently running browser operations, and cancellation of the coroutine
+itself when the timeout hits, so no browser operation keeps running after its
+tool call has given up.
 """
 
 import asyncio
+import os
+import threading
+import time
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Optional
+from helper.instrumentation import record, span
+from models.tool_stats import ToolStats
+
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+DEFAULT_MAX_CONCURRENT_TOOLS = int(os.getenv("TOOL_MAX_CONCURRENT", "8"))
+
+# Seconds a tool call may wait for a free slot before it starts running
+DEFAULT_QUEUE_TIMEOUT = float(os.getenv("TOOL_QUEUE_TIMEOUT_SECONDS", "60"))
+
+
+def _parse_tool_timeouts(value: str) -> Dict[str, float]:
+    """Parse "tool_a=45,tool_b=20" into per-tool timeouts in seconds."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
 
 
-def create_async_to_sync_decorator(loop: asyncio.AbstractEventLoop, timeout: int = 30) -> Callable:
+class ToolTimeoutError(TimeoutError):
+    """Raised in the tool thread when a tool call timed out and its coroutine was cancelled."""
+
+
+class ToolBridge:
+    """
+    Runs tool coroutines on the Playwright event loop for CrewAI's tool threads.
+
+    Each call is bounded by a semaphore on the loop and by its tool's timeout;
+    on timeout the coroutine is cancelled. Time spent waiting for a slot and time
+    spent running are recorded per tool.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_TOOLS,
+        default_timeout: float = DEFAULT_TOOL_TIMEOUT,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.loop = loop
+        self.max_concurrent = max_concurrent
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self.timeouts = timeouts if timeouts is not None else _parse_tool_timeouts(os.getenv("TOOL_TIMEOUTS", ""))
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._stats: Dict[str, ToolStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    def run(self, name: str, coro_func: Callable, *args: Any, timeout: float = None, **kwargs: Any) -> Any:
+        """
+        Run coro_func(*args, **kwargs) on the bridge's loop and block the calling thread until it ends.
+
+        Raises:
+            ToolTimeoutError: The call did not finish in time; its coroutine was cancelled.
+        """
+        timeout = timeout if timeout is not None else self.timeout_for(name)
+        submitted = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(
+            self._execute(name, coro_func, args, kwargs, submitted, timeout), self.loop
+        )
+        try:
+            # The loop enforces the timeouts; this only guards against a stalled loop
+            return future.result(timeout=self.queue_timeout + timeout + 5)
+        except ToolTimeoutError:
+            raise
+        except TimeoutError:
+            # Cancelling the concurrent future cancels the task on the loop
+            future.cancel()
+            self._record(name, "timeouts")
+            raise ToolTimeoutError(f"{name} did not finish within {timeout:g}s and was cancelled")
+
+    async def _execute(self, name: str, coro_func: Callable, args: tuple, kwargs: dict, submitted: float, timeout: float):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._record(name, "timeouts")
+            raise ToolTimeoutError(f"{name} waited more than {self.queue_timeout:g}s for a free browser slot")
+
+        started = time.perf_counter()
+        self._record(name, "queue_wait_ms", (started - submitted) * 1000)
+        record("tool_queue_wait", started - submitted, tool=name)
+        try:
+            async with span("tool_call", tool=name):
+                return await asyncio.wait_for(coro_func(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            self._record(name, "timeouts")
+            raise ToolTimeoutError(f"{name} did not finish within {timeout:g}s and was cancelled")
+        except Exception:
+            self._record(name, "errors")
+            raise
+        finally:
+            self._semaphore.release()
+            self._record(name, "execution_ms", (time.perf_counter() - started) * 1000)
+
+    def _record(self, name: str, field: str, value: float = 1):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, ToolStats(tool=name))
+            if field == "queue_wait_ms":
+                stats.calls += 1
+                stats.queue_wait_ms_total += value
+                stats.queue_wait_ms_max = max(stats.queue_wait_ms_max, value)
+            elif field == "execution_ms":
+                stats.execution_ms_total += value
+                stats.execution_ms_max = max(stats.execution_ms_max, value)
+            else:
+                setattr(stats, field, getattr(stats, field) + 1)
+
+    def stats(self) -> list:
+        with self._stats_lock:
+            return [stats.model_copy() for stats in self._stats.values()]
+
+
+_tool_bridges: Dict[asyncio.AbstractEventLoop, ToolBridge] = {}
+_bridges_lock = threading.Lock()
+
+
+def get_tool_bridge(loop: asyncio.AbstractEventLoop = None) -> ToolBridge:
+    """Return the process-wide bridge of a loop (default: the running loop)."""
+    loop = loop or asyncio.get_running_loop()
+    with _bridges_lock:
+        if loop not in _tool_bridges:
+            _tool_bridges[loop] = ToolBridge(loop)
+        return _tool_bridges[loop]
+
+
+def create_async_to_sync_decorator(loop: asyncio.AbstractEventLoop, timeout: float = None, name: str = None) -> Callable:
     """
     Create an async_to_sync decorator bound to a specific event loop.
-    
+
     This decorator allows async functions to be called synchronously by scheduling
-    them on the main event loop and waiting for the result. This is necessary because
-    CrewAI runs tools in a separate thread using asyncio.to_thread().
-    
+    them on the main event loop through its ToolBridge and waiting for the result.
+    This is necessary because CrewAI runs tools in a separate thread using asyncio.to_thread().
+
     Args:
         loop: The event loop where async operations should run (usually the Playwright loop)
-        timeout: Maximum seconds to wait for the operation to complete (default: 30)
-        
+        timeout: Maximum seconds the operation may run before it is cancelled
+            (default: the tool's timeout from TOOL_TIMEOUTS, else TOOL_TIMEOUT_SECONDS)
+        name: The tool name used for per-tool timeouts and stats (default: the function name)
+
     Returns:
         A decorator function that converts async functions to sync
-        
+
     """
+    bridge = get_tool_bridge(loop)
+
     def async_to_sync(func: Callable) -> Callable:
         """
         Decorator to convert an async function to sync by running it on the main loop.
-        
+
         Args:
             func: The async function to wrap
-            
+
         Returns:
             A synchronous wrapper function
         """
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Schedule the coroutine on the main event loop and wait for result
-            future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop)
-            return future.result(timeout=timeout)
+            return bridge.run(name or func.__name__, func, *args, timeout=timeout, **kwargs)
         return wrapper
-    
-    return async_to_sync
 
+    return async_to_sync
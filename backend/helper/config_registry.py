@@ -0,0 +1,104 @@
+"""
+Config Registry - Loads agent and task configs once per process.
+
+Agent and task classes used to re-open and re-parse their YAML file and build a
+new LLM client for every request. The registry parses and validates every
+config under configs/ at startup, hands out the cached AgentConfig/TaskConfig
+objects, and re-reads a file only when its modification time changes, so
+edited prompts still take effect without a restart. LLM clients are cached per
+model name and shared by all requests; they hold configuration only, no
+per-request state.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple, Type
+import yaml
+from crewai import LLM
+from pydantic import BaseModel
+from helper.instrumented_llm import InstrumentedLLM
+from models.agent_config import AgentConfig
+from models.task_config import TaskConfig
+
+CONFIGS_DIR = "configs"
+
+
+class ConfigRegistry:
+    """
+    Process-wide cache of the YAML configs and LLM clients.
+
+    A config named "<name>" lives in configs/agents/<name>.yaml or
+    configs/tasks/<name>.yaml under the top-level key "<name>".
+    """
+
+    def __init__(self, configs_dir: str = CONFIGS_DIR):
+        self.configs_dir = configs_dir
+        self._configs: Dict[str, Tuple[int, BaseModel]] = {}
+        self._llms: Dict[str, LLM] = {}
+        self._lock = threading.Lock()
+
+    def load_all(self):
+        """
+        Load and validate every agent and task config.
+
+        Raises:
+            ValueError: A config file is missing its key or fails validation.
+        """
+        for kind, model in (("agents", AgentConfig), ("tasks", TaskConfig)):
+            directory = os.path.join(self.configs_dir, kind)
+            for filename in sorted(os.listdir(directory)):
+                name, extension = os.path.splitext(filename)
+                if extension == ".yaml":
+                    self._get(kind, name, model)
+        print(f"Loaded {len(self._configs)} agent and task configs")
+
+    def agent_config(self, name: str) -> AgentConfig:
+        return self._get("agents", name, AgentConfig)
+
+    def task_config(self, name: str) -> TaskConfig:
+        return self._get("tasks", name, TaskConfig)
+
+    def llm(self, model: str) -> LLM:
+        """Return the shared LLM client of a model."""
+        with self._lock:
+            if model not in self._llms:
+                self._llms[model] = InstrumentedLLM(model=model)
+            return self._llms[model]
+
+    def _get(self, kind: str, name: str, model: Type[BaseModel]) -> BaseModel:
+        path = os.path.join(self.configs_dir, kind, f"{name}.yaml")
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._configs.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        config = self._load(path, name, model)
+        with self._lock:
+            if cached is not None:
+                print(f"Reloaded config {path}")
+            self._configs[path] = (mtime, config)
+        return config
+
+    @staticmethod
+    def _load(path: str, name: str, model: Type[BaseModel]) -> BaseModel:
+        with open(path, "r") as f:
+            yaml_data = yaml.safe_load(f) or {}
+        if name not in yaml_data:
+            raise ValueError(f"{path} has no top-level '{name}' key")
+        try:
+            return model(**yaml_data[name])
+        except Exception as e:
+            raise ValueError(f"Invalid config {path}: {e}") from e
+
+
+_config_registry: Optional[ConfigRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_config_registry() -> ConfigRegistry:
+    global _config_registry
+    with _registry_lock:
+        if _config_registry is None:
+            _config_registry = ConfigRegistry()
+    return _config_registry
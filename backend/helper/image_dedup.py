@@ -0,0 +1,80 @@
+"""
+Image Dedup - Finds near-identical workflow screenshots with a perceptual hash.
+
+Each frame is reduced to a difference hash (dHash): the image is shrunk to a
+(size + 1) x size grayscale grid and every bit records whether a pixel is
+brighter than its right neighbour. Frames whose hashes differ in at most a
+configurable number of bits show the same UI state.
+
+A highlight box is too thin to change the hash, so frames highlighting
+different elements (or one highlighting an element and one without) are never
+duplicates, however similar they look.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 16
+
+
+def dhash(path: str, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the difference hash of an image file.
+
+    Returns:
+        int: A hash_size * hash_size bit perceptual hash
+    """
+    with Image.open(path) as img:
+        img.draft("L", (img.width // 4, img.height // 4))  # JPEG decodes at reduced size
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def find_duplicates(
+    paths: List[str], max_distance: int, highlights: Optional[Dict[str, tuple]] = None
+) -> Dict[str, str]:
+    """
+    Link every frame to the first earlier frame that looks the same.
+
+    Args:
+        paths: Screenshot paths in workflow order
+        max_distance: Largest Hamming distance between hashes of duplicate frames
+        highlights: The bounding box highlighted in each frame; frames missing
+            from it have none. Only frames with the same box are linked
+
+    Returns:
+        Dict mapping each duplicate path to the path of the frame it duplicates.
+        Frames that cannot be read are never treated as duplicates.
+    """
+    highlights = highlights or {}
+    kept: List[Tuple[str, int]] = []
+    duplicates: Dict[str, str] = {}
+    for path in paths:
+        if path in duplicates or any(path == kept_path for kept_path, _ in kept):
+            continue
+        try:
+            frame_hash = dhash(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not hash {path}: {type(e).__name__} - {e}")
+            continue
+        original = next(
+            (
+                kept_path for kept_path, kept_hash in kept
+                if highlights.get(kept_path) == highlights.get(path)
+                and hamming_distance(frame_hash, kept_hash) <= max_distance
+            ),
+            None,
+        )
+        if original is None:
+            kept.append((path, frame_hash))
+        else:
+            duplicates[path] = original
+    return duplicates
+
@@ -0,0 +1,163 @@
+"""
+Instrumentation - Timing spans, Prometheus histograms and per-task breakdowns.
+
+Code that does measurable work wraps it in a span:
+
+    async with span("settle_wait"):
+        ...
+    with span("llm_call", model=model):
+        ...
+
+Every span is added to a process-wide histogram, rendered at /metrics in the
+Prometheus text format, and to the timing breakdown of the task it runs for.
+The task is found through a context variable that TaskService sets; asyncio
+tasks, asyncio.to_thread and run_coroutine_threadsafe all carry it along, so
+spans in CrewAI's tool and LLM threads are attributed to the right task.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from models.task_timing import SpanTiming
+
+METRIC_NAME = "workflow_span_duration_seconds"
+
+# Upper bounds in seconds, from settle waits up to whole LLM turns
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+
+class MetricsRegistry:
+    """
+    Process-wide span histograms, keyed by span name and labels. Thread-safe.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Dict[str, str], seconds: float):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+
+    def render(self) -> str:
+        """Render all histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of instrumented workflow steps.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                label_text = ",".join([f'span="{name}"'] + [f'{key}="{_escape(value)}"' for key, value in labels])
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{METRIC_NAME}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+                lines.append(f"{METRIC_NAME}_sum{{{label_text}}} {histogram.total}")
+                lines.append(f"{METRIC_NAME}_count{{{label_text}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class TaskTimings:
+    """
+    Timing breakdown of one task: count, total and longest duration per span.
+    """
+
+    def __init__(self):
+        self._spans: Dict[str, SpanTiming] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, seconds: float):
+        milliseconds = seconds * 1000
+        with self._lock:
+            timing = self._spans.setdefault(key, SpanTiming())
+            timing.count += 1
+            timing.total_ms = round(timing.total_ms + milliseconds, 1)
+            timing.max_ms = round(max(timing.max_ms, milliseconds), 1)
+
+    def summary(self) -> Dict[str, SpanTiming]:
+        with self._lock:
+            return {key: timing.model_copy() for key, timing in sorted(self._spans.items())}
+
+
+_metrics = MetricsRegistry()
+_current_task_timings: contextvars.ContextVar[Optional[TaskTimings]] = contextvars.ContextVar(
+    "current_task_timings", default=None
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _metrics
+
+
+@contextmanager
+def record_task_timings() -> Iterator[TaskTimings]:
+    """Attribute the spans of the enclosed code (and everything it starts) to a new task breakdown."""
+    timings = TaskTimings()
+    token = _current_task_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_task_timings.reset(token)
+
+
+class Span:
+    """
+    Times the enclosed block; usable with both `with` and `async with`.
+    """
+
+    def __init__(self, name: str, **labels: str):
+        self.name = name
+        self.labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> "Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self._started, **self.labels)
+
+    async def __aenter__(self) -> "Span":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        self.__exit__(*exc_info)
+
+
+def span(name: str, **labels: str) -> Span:
+    return Span(name, **labels)
+
+
+def record(name: str, seconds: float, **labels: str):
+    """Record a duration that was measured elsewhere, e.g. time spent waiting in a queue."""
+    labels = {key: str(value) for key, value in labels.items()}
+    _metrics.observe(name, labels, seconds)
+    timings = _current_task_timings.get()
+    if timings is not None:
+        timings.add(":".join([name, *labels.values()]), seconds)
@@ -0,0 +1,48 @@
+"""
+Instrumented LLM - CrewAI LLM client that times and caches every call.
+
+CrewAI calls LLM.call from the agent's worker thread for every reasoning step.
+The subclass wraps it in an "llm_call" span labelled with the model, so LLM
+time shows up in /metrics and in the timing breakdown of the task. Plain
+completions go through the LLM cache (see helper/llm_cache.py); a cache hit is
+recorded as "llm_cache_hit" instead of "llm_call".
+"""
+
+import time
+from crewai import LLM
+from helper.instrumentation import record, span
+from helper.llm_cache import LLMCacheMissError, get_llm_cache
+
+
+class InstrumentedLLM(LLM):
+    def call(self, messages, *args, **kwargs):
+        cache = get_llm_cache()
+        # With function calling the client runs the tools itself, which must not be skipped
+        tools = args[0] if args else kwargs.get("tools")
+        available_functions = args[2] if len(args) > 2 else kwargs.get("available_functions")
+        cacheable = cache.mode != "off" and not tools and not available_functions
+
+        key = None
+        if cacheable:
+            key = cache.key_for(
+                self.model, messages,
+                temperature=getattr(self, "temperature", None),
+                stop=getattr(self, "stop", None),
+                max_tokens=getattr(self, "max_tokens", None),
+                response_format=getattr(self, "response_format", None),
+            )
+        if cacheable and cache.reads:
+            started = time.perf_counter()
+            response = cache.lookup(key)
+            if response is not None:
+                record("llm_cache_hit", time.perf_counter() - started, model=self.model)
+                return response
+            if cache.mode == "playback":
+                raise LLMCacheMissError(f"No recorded {self.model} completion for this prompt (LLM_CACHE_MODE=playback)")
+
+        with span("llm_call", model=self.model):
+            response = super().call(messages, *args, **kwargs)
+
+        if cacheable and cache.writes and isinstance(response, str):
+            cache.store(key, self.model, response)
+        return response
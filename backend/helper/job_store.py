@@ -0,0 +1,251 @@
+"""
+Job Store - SQLite job queue and event log shared by the API and worker processes.
+
+With worker processes, the API process only writes submitted jobs to the store
+and reads their status, results and events back; the workers claim queued jobs,
+run them and write everything back. SQLite in WAL mode lets any number of
+processes on one machine do this concurrently; a job is claimed inside an
+immediate transaction, so no two workers ever run the same job.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+from models.job import JobStatus, JobResponse
+from models.start_task import StartTaskRequest, StartTaskResponse
+from models.task_event import TaskEvent
+from helper.task_events import TaskEventStream
+
+JOB_STORE_PATH = "jobs.sqlite3"
+
+
+class JobStore:
+    """
+    Jobs and their events in SQLite. Thread-safe; one instance per process.
+    """
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Transactions are opened explicitly, claim() needs BEGIN IMMEDIATE
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT UNIQUE NOT NULL,
+                task_id TEXT NOT NULL,
+                request TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq);
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                event TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+            """
+        )
+
+    def submit(self, job_id: str, request: StartTaskRequest, max_queued: int) -> bool:
+        """Queue a job. Returns False, queueing nothing, when max_queued jobs are already waiting."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                queued = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JobStatus.QUEUED.value,)).fetchone()[0]
+                if queued >= max_queued:
+                    self._db.execute("ROLLBACK")
+                    return False
+                self._db.execute(
+                    "INSERT INTO jobs (job_id, task_id, request, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, request.task_id, request.model_dump_json(), JobStatus.QUEUED.value, now),
+                )
+                self._insert_event(job_id, TaskEvent(type="status", status=JobStatus.QUEUED.value))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return True
+
+    def claim(self, worker: str) -> Optional[Tuple[str, StartTaskRequest]]:
+        """Take the oldest queued job and mark it running on worker, or return None if there is none."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT job_id, request FROM jobs WHERE status = ? ORDER BY seq LIMIT 1", (JobStatus.QUEUED.value,)
+                ).fetchone()
+                if row is None:
+                    self._db.execute("ROLLBACK")
+                    return None
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE job_id = ?",
+                    (JobStatus.RUNNING.value, worker, datetime.now().isoformat(), row[0]),
+                )
+                self._insert_event(row[0], TaskEvent(type="status", status=JobStatus.RUNNING.value))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return row[0], StartTaskRequest.model_validate_json(row[1])
+
+    def finish(self, job_id: str, result: Optional[StartTaskResponse], error: Optional[str] = None):
+        """Record the outcome of a job and its final status event."""
+        status = JobStatus.SUCCEEDED if error is None else JobStatus.FAILED
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                    (
+                        status.value,
+                        result.model_dump_json() if result is not None else None,
+                        error,
+                        datetime.now().isoformat(),
+                        job_id,
+                    ),
+                )
+                self._insert_event(job_id, TaskEvent(type="status", status=status.value, error=error))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def fail_orphaned(self, worker: str):
+        """Fail the jobs a previous run of this worker left running, e.g. after a crash."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT job_id FROM jobs WHERE status = ? AND worker = ?", (JobStatus.RUNNING.value, worker)
+            ).fetchall()
+        for (job_id,) in rows:
+            self.finish(job_id, None, error="Worker stopped while the job was running")
+
+    def append_event(self, job_id: str, event: TaskEvent):
+        with self._lock:
+            self._insert_event(job_id, event)
+
+    def append_events(self, job_id: str, events: List[TaskEvent]):
+        """Append several events of a job in one transaction."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for event in events:
+                    self._insert_event(job_id, event)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def events_after(self, job_id: str, after_seq: int = 0) -> List[Tuple[int, TaskEvent]]:
+        """Events of a job newer than after_seq, with their sequence numbers."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, event FROM events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after_seq)
+            ).fetchall()
+        return [(seq, TaskEvent.model_validate_json(event)) for seq, event in rows]
+
+    def get(self, job_id: str) -> Optional[JobResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, task_id, status, result, error, created_at, started_at, finished_at FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return JobResponse(
+            job_id=row[0],
+            task_id=row[1],
+            status=JobStatus(row[2]),
+            result=StartTaskResponse.model_validate_json(row[3]) if row[3] else None,
+            error=row[4],
+            created_at=row[5],
+            started_at=row[6],
+            finished_at=row[7],
+        )
+
+    def prune(self, retention: int):
+        """Forget the oldest finished jobs, and their events, beyond the retention limit."""
+        finished = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    """DELETE FROM events WHERE job_id IN (
+                        SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY seq DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (*finished, retention),
+                )
+                self._db.execute(
+                    """DELETE FROM jobs WHERE job_id IN (
+                        SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY seq DESC LIMIT -1 OFFSET ?
+                    )""",
+                    (*finished, retention),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _insert_event(self, job_id: str, event: TaskEvent):
+        self._db.execute("INSERT INTO events (job_id, event) VALUES (?, ?)", (job_id, event.model_dump_json()))
+
+
+class StoredTaskEventStream(TaskEventStream):
+    """
+    Event stream of a job run by a worker process; every event is also written to
+    the job store, where the API process reads it.
+
+    The writes happen in a worker thread, in order, so the event loop never waits
+    for SQLite; events published meanwhile are written together.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        super().__init__()
+        self._store = store
+        self._job_id = job_id
+        self._pending: List[TaskEvent] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    def publish(self, event: TaskEvent):
+        super().publish(event)
+        self._pending.append(event)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._write_pending())
+
+    async def drain(self):
+        """Wait until every published event is in the store."""
+        if self._writer is not None:
+            await self._writer
+
+    async def _write_pending(self):
+        while self._pending:
+            events, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._store.append_events, self._job_id, events)
+            except sqlite3.Error as e:
+                print(f"Storing {len(events)} events of job {self._job_id} failed: {e}")
+
+
+_job_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _job_store
+    with _store_lock:
+        if _job_store is None:
+            _job_store = JobStore(os.getenv("JOB_STORE_PATH", JOB_STORE_PATH))
+    return _job_store
@@ -0,0 +1,148 @@
+"""
+LLM Cache - Persistent cache of LLM completions.
+
+Re-running a workflow on the same pages sends the same system prompts,
+backstories and UI snapshots again. Completions are kept in SQLite keyed by a
+hash of the model, the sampling parameters and the normalized messages (which
+contain the snapshots), with least-recently-used eviction under a size cap.
+
+LLM_CACHE_MODE selects how the cache is used:
+- off: every call goes to the LLM (default)
+- record: every call goes to the LLM and its completion is stored
+- playback: completions only come from the cache; a miss is an error, which
+  makes tests and benchmarks deterministic and offline
+- readwrite: a real cache, for deterministic (temperature 0) prompts
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+from models.llm_cache_stats import LLMCacheStats
+
+LLM_CACHE_MODES = ("off", "record", "playback", "readwrite")
+
+
+class LLMCacheMissError(RuntimeError):
+    """Raised in playback mode for a call that was never recorded."""
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+def normalize_messages(messages: Any) -> Any:
+    """Messages with whitespace collapsed and only role and content kept."""
+    if isinstance(messages, str):
+        return _normalize_content(messages)
+    return [
+        {"role": message.get("role"), "content": _normalize_content(message.get("content"))}
+        if isinstance(message, dict) else message
+        for message in messages
+    ]
+
+
+class LLMCache:
+    """
+    SQLite-backed prompt -> completion cache with LRU eviction by size. Thread-safe.
+    """
+
+    def __init__(self, path: str, mode: str, max_bytes: int):
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(f"LLM_CACHE_MODE must be one of {', '.join(LLM_CACHE_MODES)}, not {mode!r}")
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+        if mode != "off":
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    @property
+    def reads(self) -> bool:
+        return self.mode in ("playback", "readwrite")
+
+    @property
+    def writes(self) -> bool:
+        return self.mode in ("record", "readwrite")
+
+    @staticmethod
+    def key_for(model: str, messages: Any, **params: Any) -> str:
+        payload = json.dumps(
+            {"model": model, "params": params, "messages": normalize_messages(messages)},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached completion of a key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            with self._db:
+                self._db.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+            self._hits += 1
+        return row[0]
+
+    def store(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode()), now, now),
+            )
+            # Keep the most recently used completions that fit in max_bytes
+            self._db.execute(
+                """DELETE FROM completions WHERE key IN (
+                    SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS total FROM completions)
+                    WHERE total > ?
+                )""",
+                (self.max_bytes,),
+            )
+            self._writes += 1
+
+    def stats(self) -> LLMCacheStats:
+        with self._lock:
+            entries, size = 0, 0
+            if self._db is not None:
+                entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+            lookups = self._hits + self._misses
+            return LLMCacheStats(
+                mode=self.mode,
+                entries=entries,
+                size_bytes=size,
+                hits=self._hits,
+                misses=self._misses,
+                writes=self._writes,
+                hit_rate=self._hits / lookups if lookups else 0.0,
+            )
+
+
+_llm_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    global _llm_cache
+    with _cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache(
+                path=os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3"),
+                mode=os.getenv("LLM_CACHE_MODE", "off").lower(),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            )
+    return _llm_cache
@@ -1,197 +1,661 @@
 """
 Perception - Analyzes the current UI state
 Extracts semantic UI snapshot from DOM: visible text, roles, URLs
+
+The extraction runs inside the page as a persistent perception agent
+(window.__perception), injected once per document with add_init_script. A
+MutationObserver marks the subtrees that changed since the last snapshot, so
+repeat snapshots only re-walk dirty regions, and a delta mode returns just the
+elements added, removed or changed since a previous snapshot.
+
+Visibility is decided in the same single top-down walk: each element's own
+style is read once and hidden subtrees are skipped entirely, instead of
+re-walking every candidate's ancestors with getComputedStyle. Geometry is read
+once per element at snapshot time. benchmarks/perception_benchmark.py compares
+snapshot times against the original script on 1k/10k/50k-node pages.
+
+Every element carries a short id that the click and fill tools accept instead
+of a selector. Ids live in an in-page registry (id -> WeakRef) for the lifetime
+of the element, so a tool resolves an id in O(1) without re-querying the DOM.
+
+Before a snapshot is handed to the agent it is compacted into a
+pipe-separated table with rounded boxes, trimmed class names and no redundant
+fields, keeping the most relevant elements (interactive and on screen first)
+within a token budget.
 """
 
-from typing import Dict, List
-from playwright.async_api import Page
+import os
+import re
+import weakref
+from typing import Dict, List, Optional, Tuple
+from playwright.async_api import BrowserContext, ElementHandle, Page
+from helper.instrumentation import span
 
+# Page -> documentId of its latest snapshot, so element ids of an old document are rejected
+_snapshot_documents: "weakref.WeakKeyDictionary[Page, str]" = weakref.WeakKeyDictionary()
 
-class Perception:
-    """
-    Perception that analyzes the current UI state
-    Responsibilities:
-    - Extract visible text and interactive elements
-    - Identify buttons, forms, links, modals
-    - Capture accessibility information
-    - Summarize current page context
-    """
-    
-    async def extract_ui_snapshot(self, page: Page) -> Dict:
-        """
-        Extract a semantic snapshot of the current UI state
-        """
-        snapshot = {
-            "url": page.url,
-            "title": await page.title(),
-            "visible_elements": await self._get_visible_elements(page),
+# Approximate prompt tokens a snapshot may use; 0 returns the raw element dicts
+SNAPSHOT_TOKEN_BUDGET = int(os.getenv("SNAPSHOT_TOKEN_BUDGET", "3000"))
+
+COMPACT_COLUMNS = "id|tag|role|text|label|class|x,y,w,h"
+
+# Roles the tag already implies are left out of the table
+_IMPLIED_ROLES = {"a": "link", "button": "button", "input": "textbox", "textarea": "textbox"}
+_KIND_WEIGHTS = {"input": 3, "toggle": 3, "clickable": 2, "text": 1}
+# Build-generated class names (css-1x2y3z, sc-AxjAm, Button_root__a1B2c, card-3fa9c2) carry no meaning.
+# A hash is a whole name segment with a digit in it, so feedback-button or decade-picker are kept
+_GENERATED_CLASS = re.compile(
+    r"^(css|sc|jsx|emotion|svelte)-|__[A-Za-z0-9]{5}$|\d{3,}|(^|[-_])(?=[a-f]*\d)[0-9a-f]{6,}($|[-_])"
+)
+
+
+PERCEPTION_SCRIPT = """
+(() => {
+    if (window.__perception) return;
+
+    const INTERACTIVE_ROLES = new Set([
+        'button', 'link', 'menuitem', 'treeitem', 'tab', 'switch', 'checkbox',
+        'radio', 'option', 'textbox', 'combobox', 'slider', 'spinbutton'
+    ]);
+    const TOGGLE_ROLES = new Set(['checkbox', 'radio', 'switch', 'slider']);
+    const SKIPPED_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const KEPT_SNAPSHOTS = 5;
+
+    // element -> candidates found in its subtree, grouped by kind (geometry is read at snapshot time)
+    let subtreeCache = new WeakMap();
+    // elements whose attributes changed: every cached descendant may be stale too
+    let deepDirty = new WeakSet();
+    // roots of hidden subtrees, re-checked before every snapshot for CSS-only reveals (:hover, :focus-within)
+    const hiddenRoots = new Set();
+    let epoch = 0;
+    let snapshotSeq = 0;
+    // snapshot id -> (dedup key -> item)
+    const snapshots = new Map();
+
+    // Element id registry: an element keeps its id for as long as it lives, and an
+    // id resolves back to its element in O(1) without holding the element alive.
+    // documentId tells ids of this document apart from those of an earlier page.
+    const documentId = Math.random().toString(36).slice(2);
+    const elementIds = new WeakMap();
+    const elementsById = new Map();
+    const releasedIds = typeof FinalizationRegistry === 'function'
+        ? new FinalizationRegistry((id) => elementsById.delete(id))
+        : null;
+    let nextElementId = 0;
+
+    const idOf = (el) => {
+        let id = elementIds.get(el);
+        if (id === undefined) {
+            id = ++nextElementId;
+            elementIds.set(el, id);
+            elementsById.set(id, new WeakRef(el));
+            if (releasedIds) releasedIds.register(el, id);
         }
-        return snapshot
-    
-    async def _get_visible_elements(self, page: Page, limit: int = 500) -> List[Dict]:
-        """Extract visible text and interactive elements from the page, including checkboxes, radios, switches, sliders."""
-        try:
-            results = await page.evaluate("""
-            () => {
-            const isVisibleEl = (el) => {
-                if (!el) return false;
-                if (el.nodeType !== 1) return false;
-                const style = window.getComputedStyle(el);
-                const r = el.getBoundingClientRect();
-                if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') return false;
-                if (r.width <= 0 || r.height <= 0) return false;
-                if (r.bottom < 0 || r.top > window.innerHeight * 1.5) return false;
-                let parent = el.parentElement;
-                while (parent && parent !== document.body) {
-                const ps = window.getComputedStyle(parent);
-                if (ps.display === 'none' || ps.visibility === 'hidden' || ps.opacity === '0') return false;
-                parent = parent.parentElement;
-                }
-                return true;
-            };
+        return id;
+    };
 
-            const meaningfulAncestor = (node) => {
-                let el = node.parentElement;
-
-                const interactiveRoles = new Set([
-                    'button', 'link', 'menuitem', 'treeitem', 'tab', 'switch', 'checkbox',
-                    'radio', 'option', 'textbox', 'combobox', 'slider', 'spinbutton'
-                ]);
-
-                while (el && el !== document.body) {
-                    const role = el.getAttribute('role');
-                    const tag = el.tagName.toLowerCase();
-
-                    const isInteractive =
-                    tag === 'a' ||
-                    tag === 'button' ||
-                    tag === 'input' ||
-                    tag === 'textarea' ||
-                    el.hasAttribute('tabindex') ||
-                    el.hasAttribute('onclick') ||
-                    (role && interactiveRoles.has(role)) ||
-                    el.getAttribute('contenteditable') === 'true' ||
-                    el.hasAttribute('aria-label');
-
-                    if (isInteractive) {
-                    return el;
-                    }
-                    el = el.parentElement;
-                }
+    const resetCache = () => {
+        subtreeCache = new WeakMap();
+        deepDirty = new WeakSet();
+    };
 
-                // fallback: find the nearest visible parent
-                el = node.parentElement;
-                while (el && el !== document.body) {
-                    if (isVisibleEl(el)) return el;
-                    el = el.parentElement;
+    const invalidate = (node, deep) => {
+        let el = node.nodeType === 1 ? node : node.parentElement;
+        if (!el || el === document.documentElement || el === document.head) {
+            resetCache();
+            return;
+        }
+        if (deep) deepDirty.add(el);
+        while (el) {
+            subtreeCache.delete(el);
+            el = el.parentElement;
+        }
+    };
+
+    const isStyleNode = (n) => n.nodeName === 'STYLE' || (n.nodeName === 'LINK' && /stylesheet/i.test(n.rel || ''));
+    // The screenshot highlight overlay is not part of the page
+    const isOverlayRecord = (r) => r.type === 'childList' &&
+        [...r.addedNodes, ...r.removedNodes].every(n => n.nodeType === 1 && n.hasAttribute('data-agent-overlay'));
+
+    const observer = new MutationObserver((records) => {
+        records = records.filter(r => !isOverlayRecord(r));
+        if (records.length === 0) return;
+        epoch++;
+        for (const r of records) {
+            if (r.type === 'childList') {
+                // New or removed stylesheets can change any element
+                if ([...r.addedNodes, ...r.removedNodes].some(isStyleNode)) {
+                    resetCache();
+                    return;
                 }
+                invalidate(r.target, false);
+            } else if (r.type === 'attributes') {
+                invalidate(r.target, true);
+            } else {
+                invalidate(r.target, false);
+            }
+        }
+    });
+    observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
 
-                return node.parentElement || document.body;
-                };
+    // Whether the element itself hides its subtree. The walk never descends into a
+    // hidden subtree, so ancestors are known to be visible and are not re-checked.
+    const styleHidden = (el) => {
+        // checkVisibility() answers from the engine's own state without building a
+        // CSSStyleDeclaration; a false result is confirmed with the computed style because
+        // boxless elements (display: contents) also report false
+        if (typeof el.checkVisibility === 'function' &&
+            el.checkVisibility({ opacityProperty: true, visibilityProperty: true })) {
+            return false;
+        }
+        const style = window.getComputedStyle(el);
+        return style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0';
+    };
 
-            const items = [];
+    // Geometry part of visibility, read once per element and snapshot
+    const rectInView = (el, rects) => {
+        let r = rects.get(el);
+        if (r === undefined) {
+            r = el.getBoundingClientRect();
+            if (r.width <= 0 || r.height <= 0 || r.bottom < 0 || r.top > window.innerHeight * 1.5) r = null;
+            rects.set(el, r);
+        }
+        return r;
+    };
 
-            // --- Text nodes ---
-            const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, {
-                acceptNode: (t) => {
-                const raw = t.nodeValue || '';
-                const txt = raw.replace(/\\s+/g, ' ').trim();
-                if (txt.length < 2) return NodeFilter.FILTER_REJECT;
-                if (/^skip to content$/i.test(txt)) return NodeFilter.FILTER_REJECT;
-                return NodeFilter.FILTER_ACCEPT;
-                }
-            });
+    const meaningfulAncestor = (node) => {
+        let el = node.parentElement;
+        while (el && el !== document.body) {
+            const role = el.getAttribute('role');
+            const tag = el.tagName.toLowerCase();
+            const isInteractive =
+                tag === 'a' ||
+                tag === 'button' ||
+                tag === 'input' ||
+                tag === 'textarea' ||
+                el.hasAttribute('tabindex') ||
+                el.hasAttribute('onclick') ||
+                (role && INTERACTIVE_ROLES.has(role)) ||
+                el.getAttribute('contenteditable') === 'true' ||
+                el.hasAttribute('aria-label');
+            if (isInteractive) return el;
+            el = el.parentElement;
+        }
+        // fallback: the nearest visible parent is resolved at snapshot time
+        return null;
+    };
+
+    const emptyGroups = () => ({ text: [], clickable: [], input: [], toggle: [] });
+    const HIDDEN_GROUPS = emptyGroups();
+
+    const ownCandidates = (el, groups) => {
+        for (const child of el.childNodes) {
+            if (child.nodeType !== 3) continue;
+            const raw = child.nodeValue || '';
+            const txt = raw.replace(/\\s+/g, ' ').trim();
+            if (txt.length < 2) continue;
+            if (/^skip to content$/i.test(txt)) continue;
+            groups.text.push({ node: child, target: meaningfulAncestor(child) });
+        }
+        if (el.matches('button, [role="button"], a')) groups.clickable.push(el);
+        if (el.matches('input, textarea, select')) groups.input.push(el);
+        if (TOGGLE_ROLES.has(el.getAttribute('role'))) groups.toggle.push(el);
+    };
+
+    const walk = (el, force) => {
+        if (!force) {
+            const cached = subtreeCache.get(el);
+            if (cached) return cached;
+        }
+        const deep = force || deepDirty.has(el);
+        deepDirty.delete(el);
+
+        // Visibility is inherited top-down: a hidden element hides every descendant
+        if (styleHidden(el)) {
+            hiddenRoots.add(el);
+            subtreeCache.set(el, HIDDEN_GROUPS);
+            return HIDDEN_GROUPS;
+        }
+
+        const groups = emptyGroups();
+        ownCandidates(el, groups);
+        for (const child of el.children) {
+            if (SKIPPED_TAGS.has(child.tagName)) continue;
+            const sub = walk(child, deep);
+            for (const kind in groups) {
+                const target = groups[kind];
+                for (const c of sub[kind]) target.push(c);
+            }
+        }
+        subtreeCache.set(el, groups);
+        return groups;
+    };
+
+    const visibleFallbackAncestor = (node, rects) => {
+        let el = node.parentElement;
+        while (el && el !== document.body) {
+            if (rectInView(el, rects)) return el;
+            el = el.parentElement;
+        }
+        return node.parentElement || document.body;
+    };
+
+    const bboxOf = (r) => ({ x: r.left, y: r.top, w: r.width, h: r.height });
+
+    const cssEscape = (value) => (window.CSS && CSS.escape) ? CSS.escape(value) : value.replace(/[^\\w-]/g, '\\\\$&');
+    const isUnique = (selector) => {
+        try { return document.querySelectorAll(selector).length === 1; } catch (e) { return false; }
+    };
 
-            let node;
-            while ((node = walker.nextNode())) {
-                const parent = meaningfulAncestor(node);
-                if (!parent || !isVisibleEl(parent)) continue;
-                const range = document.createRange();
-                range.selectNodeContents(node);
-                const rects = Array.from(range.getClientRects()).filter(r => r.width > 0 && r.height > 0);
-                if (rects.length === 0) continue;
-                const text = node.nodeValue.trim();
-                if (text.length > 200) continue;
-                const r = parent.getBoundingClientRect();
-                items.push({
+    // A selector that matches only this element, for replaying actions taken by element id
+    const selectorFor = (el) => {
+        const tag = el.tagName.toLowerCase();
+        if (el.id && isUnique('#' + cssEscape(el.id))) return '#' + cssEscape(el.id);
+        for (const attr of ['data-testid', 'data-test', 'aria-label', 'name', 'placeholder']) {
+            const value = el.getAttribute(attr);
+            if (!value) continue;
+            const selector = tag + '[' + attr + '="' + value.replace(/["\\\\]/g, '\\\\$&') + '"]';
+            if (isUnique(selector)) return selector;
+        }
+        // nth-of-type path up to the nearest ancestor with a unique id
+        const parts = [];
+        let node = el;
+        while (node && node !== document.documentElement) {
+            if (node !== el && node.id && isUnique('#' + cssEscape(node.id))) {
+                parts.unshift('#' + cssEscape(node.id));
+                break;
+            }
+            const parent = node.parentElement;
+            const siblings = parent ? [...parent.children].filter(c => c.tagName === node.tagName) : [];
+            const name = node.tagName.toLowerCase();
+            parts.unshift(siblings.length > 1 ? name + ':nth-of-type(' + (siblings.indexOf(node) + 1) + ')' : name);
+            node = parent;
+        }
+        return parts.join(' > ');
+    };
+
+    const revalidateHiddenRoots = () => {
+        for (const el of hiddenRoots) {
+            if (!el.isConnected) {
+                hiddenRoots.delete(el);
+            } else if (!styleHidden(el)) {
+                hiddenRoots.delete(el);
+                invalidate(el, true);
+            }
+        }
+    };
+
+    const collect = (limit) => {
+        const seen = new Map();
+        if (!document.body) return seen;
+        revalidateHiddenRoots();
+        const groups = walk(document.body, false);
+        const rects = new Map();
+        const items = [];
+
+        // --- Text nodes ---
+        for (const c of groups.text) {
+            if (!c.node.isConnected) continue;
+            const parent = c.target || visibleFallbackAncestor(c.node, rects);
+            const parentRect = parent && rectInView(parent, rects);
+            if (!parentRect) continue;
+            const range = document.createRange();
+            range.selectNodeContents(c.node);
+            const textRects = Array.from(range.getClientRects()).filter(r => r.width > 0 && r.height > 0);
+            if (textRects.length === 0) continue;
+            const text = c.node.nodeValue.trim();
+            if (text.length > 200) continue;
+            items.push({
+                el: parent,
+                kind: 'text',
                 tag: parent.tagName.toLowerCase(),
                 role: parent.getAttribute('role') || '',
                 ariaLabel: parent.getAttribute('aria-label') || '',
                 className: parent.className || '',
                 hasText: text,
-                bbox: { x: r.left, y: r.top, w: r.width, h: r.height }
-                });
-            }
+                bbox: bboxOf(parentRect)
+            });
+        }
 
-            // --- Buttons, links, generic clickable ---
-            document.querySelectorAll('button, [role="button"], a').forEach(el => {
-                if (!isVisibleEl(el)) return;
-                const label = el.innerText.trim() || el.getAttribute('aria-label') || '';
-                if (!label) return;
-                const r = el.getBoundingClientRect();
-                items.push({
+        // --- Buttons, links, generic clickable ---
+        for (const el of groups.clickable) {
+            const r = rectInView(el, rects);
+            if (!r) continue;
+            const label = el.innerText.trim() || el.getAttribute('aria-label') || '';
+            if (!label) continue;
+            items.push({
+                el,
+                kind: 'clickable',
                 tag: el.tagName.toLowerCase(),
                 role: el.getAttribute('role') || (el.tagName.toLowerCase() === 'a' ? 'link' : 'button'),
                 ariaLabel: el.getAttribute('aria-label') || '',
                 className: el.className || '',
                 hasText: label.substring(0, 100),
-                bbox: { x: r.left, y: r.top, w: r.width, h: r.height }
-                });
+                bbox: bboxOf(r)
             });
+        }
 
-            // --- Inputs and form fields (text, checkbox, radio, etc.) ---
-            document.querySelectorAll('input, textarea, select').forEach(el => {
-                if (!isVisibleEl(el)) return;
-                const type = el.type || 'text';
-                const r = el.getBoundingClientRect();
-                const label =
+        // --- Inputs and form fields (text, checkbox, radio, etc.) ---
+        for (const el of groups.input) {
+            const r = rectInView(el, rects);
+            if (!r) continue;
+            const type = el.type || 'text';
+            const label =
                 el.placeholder ||
                 el.getAttribute('aria-label') ||
                 el.name ||
                 el.id ||
                 (type === 'checkbox' ? 'checkbox' : type === 'radio' ? 'radio' : '');
-                items.push({
+            items.push({
+                el,
+                kind: 'input',
                 tag: el.tagName.toLowerCase(),
                 role: el.getAttribute('role') || (type === 'checkbox' || type === 'radio' ? type : 'textbox'),
                 ariaLabel: el.getAttribute('aria-label') || '',
                 hasText: label.trim(),
                 className: el.className || '',
                 inputType: type,
-                bbox: { x: r.left, y: r.top, w: r.width, h: r.height }
-                });
+                bbox: bboxOf(r)
             });
+        }
 
-            // --- Extra ARIA roles: checkbox, radio, switch, slider ---
-            document.querySelectorAll('[role="checkbox"], [role="radio"], [role="switch"], [role="slider"]').forEach(el => {
-                if (!isVisibleEl(el)) return;
-                const r = el.getBoundingClientRect();
-                const label = el.getAttribute('aria-label') || el.innerText.trim() || '';
-                if (!label) return;
-                items.push({
+        // --- Extra ARIA roles: checkbox, radio, switch, slider ---
+        for (const el of groups.toggle) {
+            const r = rectInView(el, rects);
+            if (!r) continue;
+            const label = el.getAttribute('aria-label') || el.innerText.trim() || '';
+            if (!label) continue;
+            items.push({
+                el,
+                kind: 'toggle',
                 tag: el.tagName.toLowerCase(),
                 role: el.getAttribute('role'),
                 ariaLabel: el.getAttribute('aria-label') || '',
                 className: el.className || '',
                 hasText: label.substring(0, 100),
-                bbox: { x: r.left, y: r.top, w: r.width, h: r.height }
-                });
+                bbox: bboxOf(r)
             });
+        }
 
-            // Deduplicate
-            const seen = new Set();
-            const out = [];
-            for (const it of items) {
-                const key = (it.tag + '|' + it.role + '|' + it.hasText.toLowerCase()).slice(0, 160);
-                if (!seen.has(key)) {
-                seen.add(key);
-                out.push(it);
-                }
-            }
+        // Deduplicate, and give every kept element its id
+        for (const { el, ...it } of items) {
+            const key = (it.tag + '|' + it.role + '|' + it.hasText.toLowerCase()).slice(0, 160);
+            if (seen.has(key)) continue;
+            it.id = idOf(el);
+            seen.set(key, it);
+            if (seen.size >= limit) break;
+        }
+        return seen;
+    };
+
+    const remember = (items) => {
+        const id = ++snapshotSeq;
+        snapshots.set(id, items);
+        for (const old of snapshots.keys()) {
+            if (snapshots.size <= KEPT_SNAPSHOTS) break;
+            snapshots.delete(old);
+        }
+        return id;
+    };
 
-            return out.slice(0, 500);
+    const sameItem = (a, b) => {
+        const round = (bb) => [bb.x, bb.y, bb.w, bb.h].map(Math.round).join(',');
+        return a.id === b.id && a.ariaLabel === b.ariaLabel && a.className === b.className && round(a.bbox) === round(b.bbox);
+    };
+
+    const viewport = () => ({ width: window.innerWidth, height: window.innerHeight });
+
+    window.__perception = {
+        get epoch() { return epoch; },
+        documentId,
+
+        snapshot(limit) {
+            const items = collect(limit);
+            const snapshotId = remember(items);
+            return { mode: 'full', snapshotId, documentId, epoch, viewport: viewport(), elements: [...items.values()] };
+        },
+
+        delta(sinceId, limit) {
+            const previous = snapshots.get(sinceId);
+            const items = collect(limit);
+            const snapshotId = remember(items);
+            if (!previous) {
+                return { mode: 'full', snapshotId, documentId, epoch, viewport: viewport(), elements: [...items.values()] };
+            }
+            const added = [];
+            const changed = [];
+            const removed = [];
+            for (const [key, item] of items) {
+                const before = previous.get(key);
+                if (!before) added.push(item);
+                else if (!sameItem(before, item)) changed.push(item);
             }
-            """)
-            return results
+            for (const [key, item] of previous) {
+                if (!items.has(key)) removed.push({ id: item.id, tag: item.tag, role: item.role, hasText: item.hasText });
+            }
+            return {
+                mode: 'delta', snapshotId, baseSnapshotId: sinceId, documentId, epoch, viewport: viewport(),
+                added, changed, removed, unchanged: items.size - added.length - changed.length
+            };
+        },
+
+        // The live element of an id, or null if it was removed or the id is from another document
+        element(id, expectedDocumentId) {
+            if (expectedDocumentId && expectedDocumentId !== documentId) return null;
+            const ref = elementsById.get(id);
+            const el = ref && ref.deref();
+            return el && el.isConnected ? el : null;
+        },
+
+        // Selector and current box of an element, read together in one call
+        describe(el) {
+            const r = el.getBoundingClientRect();
+            return { selector: selectorFor(el), box: { x: r.left, y: r.top, width: r.width, height: r.height } };
+        }
+    };
+})();
+"""
+
+# Runs the agent, returning null when the document predates the init script
+_CALL_AGENT_SCRIPT = """
+({ sinceSnapshotId, limit }) => {
+    const agent = window.__perception;
+    if (!agent) return null;
+    return sinceSnapshotId == null ? agent.snapshot(limit) : agent.delta(sinceSnapshotId, limit);
+}
+"""
+
+
+async def install_perception_agent(context: BrowserContext):
+    """
+    Inject the perception agent into every document the context loads.
+    """
+    await context.add_init_script(PERCEPTION_SCRIPT)
+
+
+class Perception:
+    """
+    Perception that analyzes the current UI state
+    Responsibilities:
+    - Extract visible text and interactive elements
+    - Identify buttons, forms, links, modals
+    - Capture accessibility information
+    - Summarize current page context
+    """
+
+    async def extract_ui_snapshot(self, page: Page, since_snapshot_id: Optional[int] = None, register: bool = True) -> Dict:
+        """
+        Extract a semantic snapshot of the current UI state
+
+        Args:
+            page: The page to analyze
+            since_snapshot_id: If set, return only the elements added, changed or removed
+                since that snapshot. Falls back to a full snapshot when the page no longer
+                knows the snapshot (e.g. after a navigation).
+            register: Resolve element ids against this snapshot's document from now on.
+                Snapshots taken ahead of time are registered once they are handed out.
+        """
+        result = await self._run_perception_agent(page, since_snapshot_id)
+        if register and result.get("documentId"):
+            _snapshot_documents[page] = result["documentId"]
+        snapshot = {
+            "url": page.url,
+            "title": await page.title(),
+            "snapshot_id": result.get("snapshotId"),
+            "mode": result.get("mode", "full"),
+        }
+        if SNAPSHOT_TOKEN_BUDGET > 0:
+            snapshot.update(compact_snapshot(result, SNAPSHOT_TOKEN_BUDGET))
+        elif snapshot["mode"] == "delta":
+            snapshot["base_snapshot_id"] = result["baseSnapshotId"]
+            snapshot["added_elements"] = result["added"]
+            snapshot["changed_elements"] = result["changed"]
+            snapshot["removed_elements"] = result["removed"]
+            snapshot["unchanged_count"] = result["unchanged"]
+        else:
+            snapshot["visible_elements"] = result.get("elements", [])
+        return snapshot
+
+    async def _get_visible_elements(self, page: Page, limit: int = 500) -> List[Dict]:
+        """Extract visible text and interactive elements from the page, including checkboxes, radios, switches, sliders."""
+        result = await self._run_perception_agent(page, None, limit)
+        return result.get("elements", [])
+
+    async def _run_perception_agent(self, page: Page, since_snapshot_id: Optional[int], limit: int = 500) -> Dict:
+        """Call the in-page perception agent, injecting it first if the document has none."""
+        args = {"sinceSnapshotId": since_snapshot_id, "limit": limit}
+        try:
+            async with span("perception_extract", mode="delta" if since_snapshot_id is not None else "full"):
+                result = await page.evaluate(_CALL_AGENT_SCRIPT, args)
+                if result is None:
+                    await page.evaluate(PERCEPTION_SCRIPT)
+                    result = await page.evaluate(_CALL_AGENT_SCRIPT, args)
+            return result or {}
         except Exception as e:
             print(f"Error extracting UI snapshot: {e}")
-            return []
+            return {}
+
+
+def snapshot_document(page: Page) -> Optional[str]:
+    """The documentId of the page's latest registered snapshot."""
+    return _snapshot_documents.get(page)
+
+
+def register_snapshot_document(page: Page, document_id: str):
+    """Resolve element ids of the page against document_id, e.g. when a prefetched snapshot is handed out."""
+    _snapshot_documents[page] = document_id
+
+
+async def resolve_element(page: Page, element_id: int) -> Optional[ElementHandle]:
+    """
+    Look up the element of a snapshot element id in the page's id registry.
+
+    Returns None when the element was removed, or when the id belongs to a document
+    the page has navigated away from since its last snapshot.
+    """
+    handle = await page.evaluate_handle(
+        "([id, documentId]) => (window.__perception && window.__perception.element(id, documentId)) || null",
+        [element_id, _snapshot_documents.get(page)],
+    )
+    element = handle.as_element()
+    if element is None:
+        await handle.dispose()
+    return element
+
+
+async def describe_element(element: ElementHandle) -> Dict:
+    """
+    A selector matching only this element and its current box, recorded so that
+    actions taken by id can be replayed.
+
+    Returns:
+        {"selector": str, "box": {"x", "y", "width", "height"}}
+    """
+    return await element.evaluate("el => window.__perception.describe(el)")
+
+
+def compact_snapshot(result: Dict, token_budget: int) -> Dict:
+    """
+    Encode the elements of a perception result as compact tables within a token budget.
+
+    Full snapshots become visible_elements; deltas become added_elements and
+    changed_elements (sharing the budget, added first) plus removed_element_ids.
+    """
+    viewport_height = (result.get("viewport") or {}).get("height") or 1080
+    compact = {"format": "compact", "columns": COMPACT_COLUMNS}
+
+    if result.get("mode") == "delta":
+        added, budget = _compact_rows(result.get("added", []), token_budget, viewport_height)
+        changed, _ = _compact_rows(result.get("changed", []), budget, viewport_height)
+        compact["base_snapshot_id"] = result.get("baseSnapshotId")
+        compact["added_elements"] = "\n".join(added)
+        compact["changed_elements"] = "\n".join(changed)
+        compact["removed_element_ids"] = [item.get("id") for item in result.get("removed", [])]
+        compact["unchanged_count"] = result.get("unchanged", 0)
+        compact["omitted_count"] = len(result.get("added", [])) + len(result.get("changed", [])) - len(added) - len(changed)
+    else:
+        elements = result.get("elements", [])
+        rows, _ = _compact_rows(elements, token_budget, viewport_height)
+        compact["visible_elements"] = "\n".join(rows)
+        compact["omitted_count"] = len(elements) - len(rows)
+    return compact
+
+
+def _compact_rows(items: List[Dict], token_budget: int, viewport_height: float) -> Tuple[List[str], int]:
+    """
+    Pick the most relevant items that fit the budget and encode them in reading order.
+
+    Returns:
+        (table rows, remaining token budget)
+    """
+    def priority(indexed: Tuple[int, Dict]):
+        index, item = indexed
+        bbox = item.get("bbox") or {}
+        top, height = bbox.get("y", 0), bbox.get("h", 0)
+        # Distance from the viewport in screen heights, 0 when on screen
+        distance = max(top - viewport_height, -(top + height), 0) / viewport_height
+        return (-_KIND_WEIGHTS.get(item.get("kind"), 1) + 2 * distance, index)
+
+    selected = []
+    for index, item in sorted(enumerate(items), key=priority):
+        row = _compact_row(item)
+        cost = len(row) // 4 + 1
+        if cost > token_budget:
+            continue
+        token_budget -= cost
+        selected.append((index, row))
+
+    selected.sort()
+    return [row for _, row in selected], token_budget
+
+
+def _compact_row(item: Dict) -> str:
+    tag = item.get("tag", "")
+    role = item.get("role", "")
+    input_type = item.get("inputType")
+    if input_type and input_type != "text" and role == "textbox":
+        role = input_type
+    if _IMPLIED_ROLES.get(tag) == role:
+        role = ""
+
+    text = item.get("hasText", "")
+    label = item.get("ariaLabel", "")
+    if label.strip().lower() == text.strip().lower():
+        label = ""
+
+    bbox = item.get("bbox") or {}
+    box = ",".join(str(round(bbox.get(key, 0))) for key in ("x", "y", "w", "h"))
+    cells = [str(item.get("id", "")), tag, role, text, label, _compact_class(item.get("className")), box]
+    return "|".join(_cell(cell) for cell in cells)
+
+
+def _compact_class(class_name) -> str:
+    """Keep the first two readable classes, trimmed; SVG elements report no string."""
+    if not isinstance(class_name, str):
+        return ""
+    readable = [name[:24] for name in class_name.split() if not _GENERATED_CLASS.search(name)]
+    return " ".join(readable[:2])
+
+
+def _cell(value: str) -> str:
+    return " ".join(value.replace("|", "/").split())
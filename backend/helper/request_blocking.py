@@ -0,0 +1,182 @@
+"""
+Request Blocking - Drops requests that never matter for workflow capture.
+
+Analytics beacons, ad networks and audio/video keep the network busy, which
+delays navigation and settle waits and costs browser memory, without changing
+what the screenshots show. A RequestBlocker installs a route on a context that
+aborts those requests and counts them per category; third-party requests can be
+blocked too, for apps that work with first-party resources only.
+
+Page and frame documents are never blocked, and neither is anything from the
+page's own site, so an app whose domain hosts an endpoint listed here still
+works when it is the app being documented.
+
+Only the requests matching a blocking rule are intercepted, unless third-party
+blocking is on and every request has to be looked at; media and fonts are
+then also recognized by resource type, otherwise by file extension. Note that
+Playwright disables the HTTP cache of a context with routes, so an empty
+BLOCK_RESOURCES installs no route at all. Blocked requests are
+aborted before anything is downloaded, so their size is never known; the
+counters are request counts.
+"""
+
+import os
+import re
+from typing import Dict, FrozenSet, Optional
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Request, Route
+
+BLOCK_CATEGORIES = frozenset({"analytics", "ads", "media", "fonts"})
+
+# Tracker and ad endpoints (and their subdomains) per category. Only script, ingest
+# and pixel hosts are listed, never the product domains: Mixpanel, Sentry or
+# PostHog are apps users document too.
+BLOCKED_HOSTS = {
+    "analytics": [
+        "google-analytics.com", "googletagmanager.com", "api.segment.io", "cdn.segment.com",
+        "api.mixpanel.com", "api-js.mixpanel.com", "cdn.mxpnl.com", "api.amplitude.com", "api2.amplitude.com",
+        "cdn.amplitude.com", "cdn.heapanalytics.com", "static.hotjar.com", "script.hotjar.com", "vars.hotjar.com",
+        "in.hotjar.com", "edge.fullstory.com", "rs.fullstory.com", "clarity.ms", "nr-data.net",
+        "js-agent.newrelic.com", "browser-intake-datadoghq.com", "ingest.sentry.io", "ingest.us.sentry.io",
+        "ingest.de.sentry.io", "browser.sentry-cdn.com", "cdn.logrocket.io", "r.lr-ingest.io", "i.posthog.com",
+        "intercom-metrics.com", "cdn.pendo.io", "data.pendo.io", "quantserve.com", "scorecardresearch.com",
+    ],
+    "ads": [
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+        "connect.facebook.net", "static.ads-twitter.com", "px.ads.linkedin.com", "snap.licdn.com", "bat.bing.com",
+        "adnxs.com", "static.criteo.net", "cdn.taboola.com", "trc.taboola.com", "widgets.outbrain.com",
+        "amazon-adsystem.com",
+    ],
+}
+
+# Resource types and file extensions per category, for requests from any host
+BLOCKED_RESOURCE_TYPES = {"media": "media", "fonts": "font"}
+BLOCKED_EXTENSIONS = {
+    "media": ["mp4", "webm", "m3u8", "mpd", "mp3", "ogg", "wav", "m4a", "mov"],
+    "fonts": ["woff2", "woff", "ttf", "otf", "eot"],
+}
+
+# Second-level labels under which registrable domains have three labels (e.g. example.co.uk)
+_SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "ac", "edu"}
+
+
+def parse_categories(value: str) -> FrozenSet[str]:
+    """Parse "analytics,ads,media" into block categories, ignoring unknown names."""
+    names = {name.strip().lower() for name in value.split(",") if name.strip()}
+    unknown = names - BLOCK_CATEGORIES
+    if unknown:
+        print(f"Ignoring unknown request block categories: {', '.join(sorted(unknown))}")
+    return frozenset(names & BLOCK_CATEGORIES)
+
+
+def site_of(host: str) -> str:
+    """Approximate registrable domain of a host: app.notion.so -> notion.so."""
+    labels = host.lower().rstrip(".").split(".")
+    if len(labels) > 2 and labels[-2] in _SECOND_LEVEL_LABELS and len(labels[-1]) == 2:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class RequestBlocker:
+    """
+    Blocking rules of one browser context, with per-category counters.
+    """
+
+    def __init__(self, categories: FrozenSet[str], block_third_party: bool = False):
+        self.categories = categories
+        self.block_third_party = block_third_party
+        self.blocked: Dict[str, int] = {}
+
+        host_pattern = "|".join(
+            re.escape(host) for category in sorted(categories) for host in BLOCKED_HOSTS.get(category, [])
+        )
+        self._host_regex = re.compile(rf"(^|\.)({host_pattern})$") if host_pattern else None
+        self._host_category = {
+            host: category for category in categories for host in BLOCKED_HOSTS.get(category, [])
+        }
+        extensions = [extension for category in sorted(categories) for extension in BLOCKED_EXTENSIONS.get(category, [])]
+        self._extension_category = {
+            extension: category for category in categories for extension in BLOCKED_EXTENSIONS.get(category, [])
+        }
+        self._extension_regex = re.compile(rf"\.({'|'.join(extensions)})$") if extensions else None
+        self._resource_categories = {
+            resource_type: category
+            for category, resource_type in BLOCKED_RESOURCE_TYPES.items()
+            if category in categories
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.categories) or self.block_third_party
+
+    async def install(self, context: BrowserContext):
+        """Route the context's requests through the blocking rules."""
+        if not self.enabled:
+            return
+        if self.block_third_party:
+            await context.route("**/*", self._handle)
+        else:
+            # Let the browser intercept only the requests a rule can match
+            await context.route(self._url_pattern(), self._handle)
+
+    def total_blocked(self) -> int:
+        return sum(self.blocked.values())
+
+    def _url_pattern(self) -> re.Pattern:
+        parts = []
+        if self._host_regex is not None:
+            hosts = "|".join(re.escape(host) for host in self._host_category)
+            parts.append(rf"^[a-z]+://([^/?#]*\.)?({hosts})(:\d+)?([/?#]|$)")
+        if self._extension_regex is not None:
+            extensions = "|".join(self._extension_category)
+            parts.append(rf"\.({extensions})([?#]|$)")
+        return re.compile("|".join(parts), re.IGNORECASE)
+
+    def _category(self, request: Request) -> Optional[str]:
+        if request.resource_type == "document":
+            return None
+        url = urlparse(request.url)
+        host = (url.hostname or "").lower()
+
+        # Site of the page, not of the iframe the request comes from
+        page_url = urlparse(request.frame.page.url)
+        page_host = page_url.hostname if page_url.scheme in ("http", "https") else None
+        if page_host and host and site_of(host) == site_of(page_host):
+            return None
+
+        if self._host_regex is not None:
+            match = self._host_regex.search(host)
+            if match:
+                return self._host_category[match.group(2)]
+
+        category = self._resource_categories.get(request.resource_type)
+        if category is not None:
+            return category
+        if self._extension_regex is not None:
+            match = self._extension_regex.search(url.path.lower())
+            if match:
+                return self._extension_category[match.group(1)]
+
+        if self.block_third_party and page_host and host:
+            return "third_party"
+        return None
+
+    async def _handle(self, route: Route, request: Request):
+        try:
+            category = self._category(request)
+        except Exception:
+            # The frame may already be detached; never block on doubt
+            category = None
+        if category is None:
+            await route.fallback()
+            return
+        self.blocked[category] = self.blocked.get(category, 0) + 1
+        await route.abort("blockedbyclient")
+
+
+def create_request_blocker() -> RequestBlocker:
+    """Build a blocker from BLOCK_RESOURCES and BLOCK_THIRD_PARTY."""
+    return RequestBlocker(
+        categories=parse_categories(os.getenv("BLOCK_RESOURCES", "analytics,ads,media")),
+        block_third_party=os.getenv("BLOCK_THIRD_PARTY", "false").lower() == "true",
+    )
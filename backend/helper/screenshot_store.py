@@ -0,0 +1,164 @@
+"""
+Screenshot Store - Content-addressed storage for screenshot images.
+
+Images are named after the SHA-256 of their bytes and sharded into
+screenshots/blobs/<ab>/<cd>/<digest>.<ext>, so identical frames are stored
+once across all tasks and a stored file never changes, which lets it be served
+with immutable caching headers. A small SQLite index keeps one reference per
+task and image, so an image is only deleted once no task uses it anymore, and
+remembers the thumbnail and the highlighted bounding box of each image.
+
+Worker processes share the store. Adding a reference and deleting an
+unreferenced file both happen inside an immediate SQLite transaction, so one
+process never deletes a blob another has just referenced.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+SCREENSHOTS_DIR = "screenshots"
+BLOBS_DIR = os.path.join(SCREENSHOTS_DIR, "blobs")
+
+
+class ScreenshotStore:
+    """
+    Content-addressed, reference-counted screenshot store.
+
+    All methods are blocking and thread-safe; call them from a worker thread.
+    """
+
+    def __init__(self, blobs_dir: str = BLOBS_DIR):
+        self.blobs_dir = blobs_dir
+        os.makedirs(blobs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Transactions are opened explicitly, see _transaction()
+        self._db = sqlite3.connect(
+            os.path.join(blobs_dir, "index.sqlite3"), check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS refs (task_id TEXT NOT NULL, path TEXT NOT NULL, PRIMARY KEY (task_id, path))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS refs_path ON refs (path)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS thumbnails (path TEXT PRIMARY KEY, thumbnail_path TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS highlights (path TEXT PRIMARY KEY, x REAL, y REAL, width REAL, height REAL)"
+            )
+
+    def put(self, data: bytes, extension: str, task_id: str) -> str:
+        """
+        Store image bytes and reference them from a task.
+
+        Returns:
+            str: The content-addressed path of the image, relative to the backend directory
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        directory = os.path.join(self.blobs_dir, digest[:2], digest[2:4])
+        path = os.path.join(directory, f"{digest}.{extension}")
+
+        if not os.path.exists(path):
+            self._write(path, data)
+        with self._transaction():
+            self._db.execute("INSERT OR IGNORE INTO refs (task_id, path) VALUES (?, ?)", (task_id, path))
+            # Another process may have deleted the file since; with the reference in place it stays
+            if not os.path.exists(path):
+                self._write(path, data)
+        return path
+
+    def set_thumbnail(self, path: str, thumbnail_path: str):
+        with self._transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO thumbnails (path, thumbnail_path) VALUES (?, ?)", (path, thumbnail_path)
+            )
+
+    def set_highlight(self, path: str, bbox: Tuple[float, float, float, float]):
+        with self._transaction():
+            self._db.execute(
+                "INSERT OR REPLACE INTO highlights (path, x, y, width, height) VALUES (?, ?, ?, ?, ?)", (path, *bbox)
+            )
+
+    def highlight_for(self, path: str) -> Optional[Tuple[float, float, float, float]]:
+        """The bounding box highlighted in an image, or None if it has no highlight."""
+        with self._lock:
+            row = self._db.execute("SELECT x, y, width, height FROM highlights WHERE path = ?", (path,)).fetchone()
+        return tuple(row) if row else None
+
+    def thumbnail_for(self, path: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT thumbnail_path FROM thumbnails WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    def is_referenced_by(self, task_id: str, path: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM refs WHERE task_id = ? AND path = ?", (task_id, path)).fetchone()
+        return row is not None
+
+    def release(self, task_id: str, path: str):
+        """
+        Drop a task's reference to an image (and to its thumbnail, unless another
+        image of the task has the same thumbnail), deleting the files once no
+        task references them anymore.
+        """
+        thumbnail_path = self.thumbnail_for(path)
+        for released in filter(None, [path, thumbnail_path]):
+            with self._transaction():
+                if released == thumbnail_path and self._thumbnail_in_use(task_id, thumbnail_path):
+                    # Another image of the task has a byte-identical thumbnail
+                    continue
+                self._db.execute("DELETE FROM refs WHERE task_id = ? AND path = ?", (task_id, released))
+                remaining = self._db.execute("SELECT COUNT(*) FROM refs WHERE path = ?", (released,)).fetchone()[0]
+                if remaining == 0:
+                    self._db.execute("DELETE FROM thumbnails WHERE path = ?", (released,))
+                    self._db.execute("DELETE FROM highlights WHERE path = ?", (released,))
+                    # Still inside the transaction, so no other process can reference it meanwhile
+                    try:
+                        os.remove(released)
+                    except FileNotFoundError:
+                        pass
+
+
+    @contextmanager
+    def _transaction(self):
+        """An immediate transaction: it holds the database's write lock across all processes."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _thumbnail_in_use(self, task_id: str, thumbnail_path: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM refs JOIN thumbnails ON thumbnails.path = refs.path WHERE refs.task_id = ? AND thumbnails.thumbnail_path = ? LIMIT 1",
+            (task_id, thumbnail_path),
+        ).fetchone()
+        return row is not None
+
+
+_screenshot_store: Optional[ScreenshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_screenshot_store() -> ScreenshotStore:
+    global _screenshot_store
+    with _store_lock:
+        if _screenshot_store is None:
+            _screenshot_store = ScreenshotStore()
+    return _screenshot_store
@@ -0,0 +1,139 @@
+"""
+Settle - Waits for a page to stop changing instead of sleeping a fixed time.
+
+A page counts as settled once, for a short quiet window, the DOM has not been
+mutated, no CSS animation or transition is running and no network request is
+in flight. Static pages return immediately, busy pages are capped by an upper
+bound, and the caller gets back how long the wait actually took.
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from playwright.async_api import BrowserContext, Page, Request
+from helper.instrumentation import span
+
+DEFAULT_QUIET_MS = int(os.getenv("SETTLE_QUIET_MS", "150"))
+DEFAULT_TIMEOUT_MS = int(os.getenv("SETTLE_TIMEOUT_MS", "2000"))
+
+# Long-lived connections never finish and must not keep a page unsettled
+IGNORED_RESOURCE_TYPES = {"websocket", "eventsource", "media"}
+
+# Records the time of the last DOM mutation in window.__settle
+_INSTALL_OBSERVER_JS = """
+    if (!window.__settle) {
+        const settleState = { lastMutation: performance.now() };
+        // Mutations made by the screenshot highlight overlay do not count
+        const isOverlayRecord = (r) => r.type === 'childList' &&
+            [...r.addedNodes, ...r.removedNodes].every(n => n.nodeType === 1 && n.hasAttribute('data-agent-overlay'));
+        new MutationObserver((records) => {
+            if (records.some(r => !isOverlayRecord(r))) settleState.lastMutation = performance.now();
+        }).observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+        window.__settle = settleState;
+    }
+"""
+
+# Installed in every document so the time of the last mutation is always known
+SETTLE_OBSERVER_SCRIPT = "(() => {" + _INSTALL_OBSERVER_JS + "})();"
+
+# Documents loaded before the init script was added get the observer on first use
+WAIT_FOR_QUIET_SCRIPT = """
+async ({ quietMs, timeoutMs }) => {
+""" + _INSTALL_OBSERVER_JS + """
+    const state = window.__settle;
+    const started = performance.now();
+    // Infinite animations (spinners, marquees) never finish, so only finite ones count
+    const animating = () => typeof document.getAnimations === 'function' && document.getAnimations().some(a =>
+        a.playState === 'running' && a.effect && a.effect.getComputedTiming().iterations !== Infinity
+    );
+    return await new Promise(resolve => {
+        const check = () => {
+            const now = performance.now();
+            const quiet = now - state.lastMutation >= quietMs && !animating();
+            if (quiet || now - started >= timeoutMs) {
+                resolve(quiet);
+                return;
+            }
+            setTimeout(check, Math.min(50, quietMs));
+        };
+        check();
+    });
+}
+"""
+
+# Requests in flight per page, tracked from Playwright network events
+_inflight_requests: "weakref.WeakKeyDictionary[Page, set]" = weakref.WeakKeyDictionary()
+
+
+def _track_page(page: Page):
+    if page in _inflight_requests:
+        return
+    inflight = set()
+    _inflight_requests[page] = inflight
+
+    def on_request(request: Request):
+        if request.resource_type not in IGNORED_RESOURCE_TYPES:
+            inflight.add(request)
+
+    page.on("request", on_request)
+    page.on("requestfinished", inflight.discard)
+    page.on("requestfailed", inflight.discard)
+
+
+async def install_settle_observer(context: BrowserContext):
+    """
+    Prepare a browser context for wait_for_settle: inject the mutation observer
+    into every document and track in-flight requests of every page.
+    """
+    await context.add_init_script(SETTLE_OBSERVER_SCRIPT)
+    for page in context.pages:
+        _track_page(page)
+    context.on("page", _track_page)
+
+
+def _pending_requests(page: Page) -> int:
+    return len(_inflight_requests.get(page, ()))
+
+
+async def wait_for_settle(page: Page, quiet_ms: int = DEFAULT_QUIET_MS, timeout_ms: int = DEFAULT_TIMEOUT_MS) -> float:
+    """
+    Wait until the page has been quiet for quiet_ms, or until timeout_ms has passed.
+
+    Args:
+        page: The page to wait for
+        quiet_ms: How long the DOM, animations and network must stay idle
+        timeout_ms: Upper bound of the wait
+
+    Returns:
+        float: How long the wait actually took, in milliseconds
+    """
+    async with span("settle_wait"):
+        started = time.perf_counter()
+        deadline = started + timeout_ms / 1000
+
+        while True:
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if remaining_ms <= 0:
+                break
+
+            try:
+                dom_quiet = await page.evaluate(
+                    WAIT_FOR_QUIET_SCRIPT,
+                    {"quietMs": quiet_ms, "timeoutMs": remaining_ms},
+                )
+            except Exception:
+                # The document is being replaced by a navigation, try again on the new one
+                await asyncio.sleep(0.05)
+                continue
+
+            if not dom_quiet:
+                break
+            if _pending_requests(page) == 0:
+                break
+
+            # Responses usually mutate the DOM, so re-check the quiet window once they are done
+            while _pending_requests(page) > 0 and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+
+    return (time.perf_counter() - started) * 1000
@@ -0,0 +1,128 @@
+"""
+Snapshot Prefetch - Takes the next UI snapshot before the agent asks for it.
+
+Almost every click, fill or navigation is followed by capture_ui_snapshot_tool.
+After each of those tools the prefetcher waits for the page to settle in the
+background and extracts a snapshot while the LLM is still thinking. When the
+snapshot tool is called and the page is unchanged since (same URL, document,
+DOM mutation epoch, scroll position and viewport), the prefetched snapshot is
+returned at once; otherwise it is thrown away and a fresh one is taken.
+
+The prefetch takes the kind of snapshot the agent asked for last: a delta
+against the last snapshot the agent received if its previous request was a
+delta on the same document, a full snapshot otherwise. Element ids of a
+prefetched snapshot only become valid for the click and fill tools once it is
+handed out.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+from playwright.async_api import BrowserContext, Page
+from helper.instrumentation import record, span
+from helper.page_helper import get_current_page
+from helper.perception import Perception, register_snapshot_document, snapshot_document
+from helper.settle import wait_for_settle
+
+SNAPSHOT_PREFETCH = os.getenv("SNAPSHOT_PREFETCH", "true").lower() != "false"
+
+# Everything that changes a snapshot without a DOM mutation, read in one call
+_PAGE_STATE_SCRIPT = """
+() => {
+    const agent = window.__perception;
+    if (!agent) return null;
+    return {
+        documentId: agent.documentId, epoch: agent.epoch,
+        scrollX: Math.round(window.scrollX), scrollY: Math.round(window.scrollY),
+        width: window.innerWidth, height: window.innerHeight
+    };
+}
+"""
+
+
+class SnapshotPrefetcher:
+    """
+    Background UI snapshots of one task's browser context.
+
+    schedule() is called from the tool threads after an interaction; snapshot()
+    runs on the event loop and serves the snapshot tool.
+    """
+
+    def __init__(self, context: BrowserContext, loop: asyncio.AbstractEventLoop, enabled: bool = SNAPSHOT_PREFETCH):
+        self.context = context
+        self.loop = loop
+        self.enabled = enabled
+        self.perception = Perception()
+        # The last snapshot handed to the agent, the base of prefetched deltas
+        self.last_snapshot_id: Optional[int] = None
+        self.last_was_delta = False
+        self._task: Optional[asyncio.Task] = None
+        # (page, since_snapshot_id, page state, snapshot)
+        self._entry: Optional[Tuple[Page, Optional[int], dict, Dict]] = None
+
+    def schedule(self):
+        """Start a prefetch for the current page; callable from any thread."""
+        if self.enabled:
+            self.loop.call_soon_threadsafe(self._start)
+
+    async def snapshot(self, page: Page, since_snapshot_id: Optional[int] = None) -> Dict:
+        """
+        Return the UI snapshot of the page, from the prefetch if the page has not changed since.
+        """
+        started = time.perf_counter()
+        if self._task is not None and not self._task.done():
+            await asyncio.wait([self._task])
+
+        self.last_was_delta = since_snapshot_id is not None
+        entry, self._entry = self._entry, None
+        if entry is not None and entry[0] is page and entry[1] == since_snapshot_id:
+            state = await self._page_state(page)
+            if state == entry[2] and page.url == entry[3]["url"]:
+                register_snapshot_document(page, state["documentId"])
+                snapshot = entry[3]
+                record("ui_snapshot", time.perf_counter() - started, source="prefetch")
+                self.last_snapshot_id = snapshot["snapshot_id"]
+                return snapshot
+
+        settle_ms = await wait_for_settle(page)
+        print(f"Page settled in {settle_ms:.0f} ms")
+        snapshot = await self.perception.extract_ui_snapshot(page, since_snapshot_id)
+        record("ui_snapshot", time.perf_counter() - started, source="fresh")
+        self.last_snapshot_id = snapshot.get("snapshot_id")
+        return snapshot
+
+    def _start(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._entry = None
+        self._task = asyncio.create_task(self._prefetch())
+
+    async def _prefetch(self):
+        try:
+            async with span("snapshot_prefetch"):
+                page = await get_current_page(self.context)
+                await page.wait_for_load_state("domcontentloaded")
+                await wait_for_settle(page)
+                state = await self._page_state(page)
+                if state is None:
+                    return
+                since_snapshot_id = None
+                if self.last_was_delta and snapshot_document(page) == state["documentId"]:
+                    since_snapshot_id = self.last_snapshot_id
+                snapshot = await self.perception.extract_ui_snapshot(page, since_snapshot_id, register=False)
+            # Only keep it if nothing changed while it was taken
+            if snapshot.get("snapshot_id") is not None and await self._page_state(page) == state:
+                self._entry = (page, since_snapshot_id, state, snapshot)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The page navigated or the context was closed; the snapshot tool takes a fresh one
+            print(f"Snapshot prefetch skipped: {type(e).__name__} - {e}")
+
+    @staticmethod
+    async def _page_state(page: Page) -> Optional[dict]:
+        try:
+            return await page.evaluate(_PAGE_STATE_SCRIPT)
+        except Exception:
+            return None
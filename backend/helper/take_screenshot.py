@@ -1,50 +1,204 @@
+"""
+Screenshot capture without intermediate files.
+
+The screenshot is captured to bytes and written to disk exactly once. A bounding
+box is highlighted by a temporary overlay element inside the page, so the browser
+encodes the final image itself; only if that fails is the box drawn with PIL.
+Image and file work runs on a small thread pool so it never blocks the event
+loop that drives Playwright for every tool.
+
+The output format (PNG/JPEG/WebP with quality), downscaling and a thumbnail of
+each image are configured per task with ScreenshotOptions. PNG and JPEG at
+full size are encoded by the browser; everything else is decoded and encoded
+once with PIL. Images and thumbnails are written to the content-addressed
+screenshot store.
+"""
+
 from playwright.async_api import Page
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import io
 import os
+from typing import Optional, Tuple
 from PIL import Image, ImageDraw
+from helper.screenshot_store import get_screenshot_store
+from helper.instrumentation import span
+from helper.settle import wait_for_settle
+from models.screenshot_options import ScreenshotOptions
+
+_image_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SCREENSHOT_WORKERS", "2")),
+    thread_name_prefix="screenshot",
+)
+
+# Marker attribute so DOM observers can ignore the overlay's own mutations
+OVERLAY_ATTRIBUTE = "data-agent-overlay"
+
+_SHOW_HIGHLIGHT_SCRIPT = """
+({ x, y, width, height, attribute }) => {
+    const box = document.createElement('div');
+    box.setAttribute(attribute, '');
+    Object.assign(box.style, {
+        position: 'fixed', left: x + 'px', top: y + 'px', width: width + 'px', height: height + 'px',
+        border: '3px solid red', boxSizing: 'border-box', margin: '0', padding: '0',
+        background: 'transparent', pointerEvents: 'none', zIndex: '2147483647'
+    });
+    (document.body || document.documentElement).appendChild(box);
+}
+"""
+
+_HIDE_HIGHLIGHT_SCRIPT = """
+(attribute) => document.querySelectorAll('[' + attribute + ']').forEach(el => el.remove())
+"""
+
+
+_PIL_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+
+def _browser_encodes(options: ScreenshotOptions) -> bool:
+    """Whether the browser can produce the final image without PIL re-encoding it."""
+    return options.format in ("png", "jpeg") and options.scale == 1
+
+
+def _encode(img: Image.Image, options: ScreenshotOptions) -> bytes:
+    if options.format == "jpeg" and img.mode != "RGB":
+        img = img.convert("RGB")
+    out = io.BytesIO()
+    if options.format == "png":
+        img.save(out, format="PNG")
+    else:
+        img.save(out, format=_PIL_FORMATS[options.format], quality=options.quality)
+    return out.getvalue()
+
+
+def _process_image(
+    data: bytes, options: ScreenshotOptions, reencode: bool, bbox: Optional[tuple]
+) -> Tuple[bytes, Optional[bytes]]:
+    """
+    Decode the captured image once and produce the final image and its thumbnail.
+
+    Args:
+        data: The captured image bytes
+        options: The task's screenshot options
+        reencode: Whether data still has to be scaled/encoded into the target format
+        bbox: A bounding box to draw, when the in-page highlight was not possible
+
+    Returns:
+        (image bytes, thumbnail bytes or None)
+    """
+    img = Image.open(io.BytesIO(data))
+    img.load()
+
+    if bbox is not None:
+        x, y, width, height = bbox
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([x, y, x + width, y + height], outline="red", width=3)
+        reencode = True
+
+    if options.scale != 1:
+        size = (max(int(img.width * options.scale), 1), max(int(img.height * options.scale), 1))
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    full = _encode(img, options) if reencode else data
+
+    thumbnail = None
+    if options.thumbnail_width and options.thumbnail_width < img.width:
+        thumb = img.copy()
+        thumb.thumbnail((options.thumbnail_width, img.height), Image.Resampling.LANCZOS)
+        thumbnail = _encode(thumb, options)
+
+    return full, thumbnail
+
+
+def _store_image(data: bytes, thumbnail: Optional[bytes], extension: str, id_number: str, bbox: Optional[tuple]) -> str:
+    store = get_screenshot_store()
+    path = store.put(data, extension, id_number)
+    if bbox is not None:
+        store.set_highlight(path, bbox)
+    if thumbnail is not None:
+        store.set_thumbnail(path, store.put(thumbnail, extension, id_number))
+    return path
+
+
+async def _capture_with_highlight(page: Page, bbox: tuple, options: ScreenshotOptions) -> Tuple[bytes, bool]:
+    """
+    Capture with an in-page overlay.
+
+    Returns:
+        (image bytes, whether the overlay was shown). When it was not, the caller
+        draws the box with PIL.
+    """
+    x, y, width, height = bbox
+    try:
+        await page.evaluate(
+            _SHOW_HIGHLIGHT_SCRIPT,
+            {"x": x, "y": y, "width": width, "height": height, "attribute": OVERLAY_ATTRIBUTE},
+        )
+    except Exception as e:
+        print(f"In-page highlight failed, drawing bbox instead: {type(e).__name__} - {e}")
+        return await _capture(page, options), False
+
+    try:
+        return await _capture(page, options), True
+    finally:
+        try:
+            await page.evaluate(_HIDE_HIGHLIGHT_SCRIPT, OVERLAY_ATTRIBUTE)
+        except Exception:
+            pass
+
+
+async def _capture(page: Page, options: ScreenshotOptions) -> bytes:
+    # Capture losslessly when PIL has to scale or encode the image anyway
+    if _browser_encodes(options) and options.format == "jpeg":
+        encoding = {"type": "jpeg", "quality": options.quality}
+    else:
+        encoding = {"type": "png"}
+    return await page.screenshot(
+        full_page=False, timeout=5000,
+        animations="disabled", caret="hide", **encoding
+    )
 
 
 async def take_screenshot(page: Page, id_number: str, tag: str = "step", bbox_x: float = None, bbox_y: float = None,
-                            bbox_width: float = None, bbox_height: float = None):
-        """Capture a screenshot and optionally highlight a bounding box."""
-        
+                            bbox_width: float = None, bbox_height: float = None, options: ScreenshotOptions = None):
+        """Capture a screenshot and optionally highlight a bounding box.
 
-        # Store the screenshot in the screenshots directory
-        os.makedirs(f"screenshots/{id_number}", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        raw_path = f"screenshots/{id_number}/{tag}_{timestamp}_raw.png"
-        final_path = f"screenshots/{id_number}/{tag}_{timestamp}.png"
+        The image is stored under its content hash and referenced by the task;
+        a thumbnail is stored with it (see ScreenshotStore.thumbnail_for) unless
+        options.thumbnail_width is 0.
+        """
+        options = options or ScreenshotOptions()
 
         # Wait for the page to load
         await page.wait_for_load_state("domcontentloaded")
-        # Additional wait for dynamic content to settle
-        await page.wait_for_timeout(600)
+        # Wait for dynamic content to settle
+        settle_ms = await wait_for_settle(page)
+        print(f"Page settled in {settle_ms:.0f} ms")
 
-        # Capture screenshot
-        await page.screenshot(
-            path=raw_path, full_page=False, timeout=5000,
-            animations="disabled", caret="hide"
-        )
+        # Capture screenshot, with the bbox highlighted if provided
+        bbox = (bbox_x, bbox_y, bbox_width, bbox_height)
+        draw_bbox = None
+        async with span("screenshot_capture"):
+            if all(v is not None for v in bbox):
+                data, highlighted = await _capture_with_highlight(page, bbox, options)
+                if not highlighted:
+                    draw_bbox = bbox
+            else:
+                data = await _capture(page, options)
 
-        # Draw bbox if provided
-        if all(v is not None for v in [bbox_x, bbox_y, bbox_width, bbox_height]):
-            try:
-                img = Image.open(raw_path)
-                draw = ImageDraw.Draw(img)
-                x1, y1 = bbox_x, bbox_y
-                x2, y2 = bbox_x + bbox_width, bbox_y + bbox_height
-                draw.rectangle([x1, y1, x2, y2], outline="red", width=3)
-                img.save(final_path)
-                os.remove(raw_path)
-                print(f"Screenshot with bbox: {final_path}")
-                return final_path
-            except Exception as e:
-                print(f"Screenshot saved but bbox draw failed: {type(e).__name__} - {e}")
-                return raw_path
-
-        # No bbox → rename and return
-        os.rename(raw_path, final_path)
-        print(f"Screenshot saved: {final_path}")
+        # Encode, scale and write once each, off the event loop
+        loop = asyncio.get_running_loop()
+        thumbnail = None
+        if draw_bbox is not None or not _browser_encodes(options) or options.thumbnail_width:
+            async with span("screenshot_encode", format=options.format):
+                data, thumbnail = await loop.run_in_executor(
+                    _image_executor, _process_image, data, options, not _browser_encodes(options), draw_bbox
+                )
+        async with span("screenshot_store"):
+            final_path = await loop.run_in_executor(
+                _image_executor, _store_image, data, thumbnail, _EXTENSIONS[options.format], id_number,
+                bbox if all(v is not None for v in bbox) else None
+            )
+        print(f"Screenshot saved ({tag}): {final_path}")
         return final_path
-
-        
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Task Events - Publishes per-step progress of a running task.
+
+Tools report every invocation (latency, screenshot path, resulting URL) to the
+task's event stream as it happens, so callers can follow a workflow live
+instead of waiting for the final result.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Set
+from models.task_event import TaskEvent
+
+
+class ToolStep:
+    """
+    Mutable record of one tool invocation, filled in by the tool while it runs.
+    """
+
+    def __init__(self, tool: str, args: dict):
+        self.tool = tool
+        self.args = args
+        self.screenshot_path: Optional[str] = None
+        self.url: Optional[str] = None
+        self.error: Optional[str] = None
+
+
+class TaskEventStream:
+    """
+    In-memory event stream of a single task.
+
+    Every event is kept so that subscribers joining late replay the full
+    history before receiving live events. Must be used from the event loop
+    thread, which is where the browser tools run.
+    """
+
+    def __init__(self):
+        self._history: List[TaskEvent] = []
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._closed = False
+
+    @property
+    def history(self) -> List[TaskEvent]:
+        return list(self._history)
+
+    def publish(self, event: TaskEvent):
+        """
+        Record an event and push it to every subscriber.
+        """
+        if self._closed:
+            return
+        self._history.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def close(self):
+        """
+        Mark the stream as finished; subscribers stop after the last event.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    async def subscribe(self, keepalive: float = None) -> AsyncIterator[Optional[TaskEvent]]:
+        """
+        Iterate over past and live events until the stream is closed.
+
+        Args:
+            keepalive: If set, yield None after this many idle seconds so the
+                caller can keep its connection alive
+
+        Yields:
+            TaskEvent objects, or None on keepalive ticks
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in self._history:
+            queue.put_nowait(event)
+        if self._closed:
+            queue.put_nowait(None)
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._subscribers.discard(queue)
+
+    @asynccontextmanager
+    async def step(self, tool: str, **args) -> AsyncIterator[ToolStep]:
+        """
+        Time a tool invocation and publish it as a step event when it ends.
+
+        Usage:
+            async with events.step("navigate_page_and_take_screenshot_tool", url=url) as step:
+                ...
+                step.screenshot_path = path
+                step.url = page.url
+        """
+        step = ToolStep(tool, args)
+        started = time.perf_counter()
+        try:
+            yield step
+        except asyncio.CancelledError:
+            step.error = "Cancelled"
+            raise
+        except Exception as e:
+            step.error = f"{type(e).__name__} - {e}"
+            raise
+        finally:
+            self.publish(TaskEvent(
+                type="step",
+                status="error" if step.error else "ok",
+                tool=tool,
+                args=args,
+                latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                screenshot_path=step.screenshot_path,
+                url=step.url,
+                error=step.error,
+            ))
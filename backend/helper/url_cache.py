@@ -0,0 +1,172 @@
+"""
+URL Cache - Persistent cache of web_search_url_tool results.
+
+The web search only ever returns the base domain of the target app, so "how do
+I X in Notion" always resolves to the same URL. Goals naming a well-known app are
+answered from KNOWN_APP_DOMAINS without any network call; other results are
+kept in SQLite with a TTL and least-recently-used eviction, keyed by the
+detected app name plus the normalized goal.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+from models.url_cache_stats import URLCacheStats
+
+# Apps whose web app lives on a fixed domain, matched as whole words in the goal
+KNOWN_APP_DOMAINS = {
+    "notion": ["https://www.notion.so"],
+    "linear": ["https://linear.app"],
+    "github": ["https://github.com"],
+    "gitlab": ["https://gitlab.com"],
+    "slack": ["https://app.slack.com"],
+    "asana": ["https://app.asana.com"],
+    "trello": ["https://trello.com"],
+    "figma": ["https://www.figma.com"],
+    "airtable": ["https://airtable.com"],
+    "clickup": ["https://app.clickup.com"],
+    "todoist": ["https://app.todoist.com"],
+    "miro": ["https://miro.com"],
+    "canva": ["https://www.canva.com"],
+    "dropbox": ["https://www.dropbox.com"],
+    "hubspot": ["https://app.hubspot.com"],
+    "discord": ["https://discord.com"],
+    "gmail": ["https://mail.google.com"],
+    "google docs": ["https://docs.google.com"],
+    "google sheets": ["https://docs.google.com"],
+    "google drive": ["https://drive.google.com"],
+    "google calendar": ["https://calendar.google.com"],
+}
+
+# App names that are also common words ("a linear workflow"): only taken as the
+# app when the goal names its domain, capitalizes it as a proper noun or ends
+# with it ("... in linear")
+AMBIGUOUS_APP_NAMES = {"linear"}
+
+_STOPWORDS = {
+    "a", "an", "the", "how", "do", "does", "i", "to", "in", "on", "my", "can", "you", "we",
+    "is", "what", "way", "and", "of", "for", "with", "using", "please", "me", "show",
+}
+
+# "... in Pipefy", "... on Basecamp": the app usually closes the goal
+_APP_SUFFIX_PATTERN = re.compile(r"\b(?:in|on|using|with)\s+([a-z0-9][a-z0-9.\-]*)\s*$")
+
+
+def normalize_goal(goal: str) -> str:
+    words = re.findall(r"[a-z0-9]+", goal.lower())
+    return " ".join(word for word in words if word not in _STOPWORDS)
+
+
+def _names_app(goal: str, app: str) -> bool:
+    """Whether a goal mentioning an ambiguous app name means the app rather than the word."""
+    if re.search(rf"\b{re.escape(app)}\.app\b", goal, re.IGNORECASE):
+        return True
+    # Capitalized, and not just because it starts a sentence
+    return any(
+        match.start() > 0 and not goal[: match.start()].rstrip().endswith((".", "!", "?", ":"))
+        for match in re.finditer(rf"\b{re.escape(app.capitalize())}\b", goal)
+    )
+
+
+def detect_app(goal: str) -> Optional[str]:
+    """Name of the app a goal targets, if one can be recognized."""
+    text = " ".join(re.findall(r"[a-z0-9.\-]+", goal.lower()))
+    # "Connect Slack in Notion" happens in Notion: the last app named wins
+    matches = [
+        (match.end(), app)
+        for app in KNOWN_APP_DOMAINS
+        if app not in AMBIGUOUS_APP_NAMES or _names_app(goal, app)
+        for match in re.finditer(rf"\b{re.escape(app)}\b", text)
+    ]
+    if matches:
+        return max(matches)[1]
+    match = _APP_SUFFIX_PATTERN.search(text)
+    if match and match.group(1) not in _STOPWORDS:
+        return match.group(1).strip(".-")
+    return None
+
+
+class URLCache:
+    """
+    SQLite-backed goal -> URLs cache with TTL and LRU eviction. Thread-safe.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS urls (key TEXT PRIMARY KEY, urls TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+        self._known_domain_hits = 0
+        self._cache_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key_for(goal: str) -> str:
+        return f"{detect_app(goal) or ''}|{normalize_goal(goal)}"
+
+    def lookup(self, goal: str) -> Optional[List[str]]:
+        """Return the URLs for a goal from the known domains or the cache, or None on a miss."""
+        app = detect_app(goal)
+        if app in KNOWN_APP_DOMAINS:
+            with self._lock:
+                self._known_domain_hits += 1
+            return list(KNOWN_APP_DOMAINS[app])
+
+        key = self.key_for(goal)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT urls, created_at FROM urls WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self._misses += 1
+                return None
+            with self._db:
+                self._db.execute("UPDATE urls SET last_used = ? WHERE key = ?", (now, key))
+            self._cache_hits += 1
+        return json.loads(row[0])
+
+    def store(self, goal: str, urls: List[str]):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (key, urls, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (self.key_for(goal), json.dumps(urls), now, now),
+            )
+            self._db.execute("DELETE FROM urls WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._db.execute(
+                "DELETE FROM urls WHERE key NOT IN (SELECT key FROM urls ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self) -> URLCacheStats:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            return URLCacheStats(
+                entries=entries,
+                known_domain_hits=self._known_domain_hits,
+                cache_hits=self._cache_hits,
+                misses=self._misses,
+            )
+
+
+_url_cache: Optional[URLCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_url_cache() -> URLCache:
+    global _url_cache
+    with _cache_lock:
+        if _url_cache is None:
+            _url_cache = URLCache(
+                path=os.getenv("URL_CACHE_PATH", "url_cache.sqlite3"),
+                ttl_seconds=float(os.getenv("URL_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("URL_CACHE_MAX_ENTRIES", "1000")),
+            )
+    return _url_cache
@@ -0,0 +1,92 @@
+"""
+Workflow Trace - Records the browser actions of successful runs for replay.
+
+After a run succeeds, its successful navigate/click/fill/press/select steps are taken from
+the task's event stream and saved as a WorkflowTrace, together with which step
+captured each screenshot of the result and the explanation. A later request for
+the same task and session can replay the trace without the agents.
+"""
+
+import hashlib
+import os
+import threading
+from typing import List, Optional
+from models.task_event import TaskEvent
+from models.workflow_trace import TraceStep, WorkflowTrace
+
+TRACES_DIR = os.getenv("WORKFLOW_TRACES_DIR", "traces")
+
+# Tools that change the page; snapshots and web searches are not replayed
+REPLAYABLE_TOOLS = {
+    "navigate_page_and_take_screenshot_tool",
+    "click_element_and_take_screenshot_tool",
+    "fill_input_and_take_screenshot_tool",
+    # Steps of perform_ui_actions_tool
+    "press_key_and_take_screenshot_tool",
+    "select_option_and_take_screenshot_tool",
+}
+
+
+def build_trace(task: str, session_path: str, history: List[TaskEvent], paths: List[str], explanation: str) -> Optional[WorkflowTrace]:
+    """
+    Build a trace from a run's events and result, or None when nothing is replayable.
+    """
+    steps = []
+    step_of_screenshot = {}
+    for event in history:
+        if event.type != "step" or event.status != "ok" or event.tool not in REPLAYABLE_TOOLS:
+            continue
+        # Element ids only live as long as the page; replay uses the recorded selector
+        args = {key: value for key, value in event.args.items() if key != "element_id"}
+        if event.screenshot_path:
+            step_of_screenshot.setdefault(os.path.normpath(event.screenshot_path), len(steps))
+        steps.append(TraceStep(tool=event.tool, args=args, url=event.url))
+
+    if not steps:
+        return None
+
+    # Paths that no step captured (the final state) are taken anew on replay
+    path_steps = [
+        step_of_screenshot[os.path.normpath(path)] for path in paths if os.path.normpath(path) in step_of_screenshot
+    ]
+    return WorkflowTrace(
+        task=task, session_path=session_path, steps=steps, path_steps=path_steps, explanation=explanation
+    )
+
+
+class WorkflowTraceStore:
+    """
+    One JSON file per task and session under traces/, replaced atomically.
+    """
+
+    def __init__(self, traces_dir: str = TRACES_DIR):
+        self.traces_dir = traces_dir
+
+    def _path(self, task: str, session_path: str) -> str:
+        key = f"{' '.join(task.lower().split())}\n{session_path}"
+        return os.path.join(self.traces_dir, f"{hashlib.sha256(key.encode()).hexdigest()}.json")
+
+    def save(self, trace: WorkflowTrace):
+        os.makedirs(self.traces_dir, exist_ok=True)
+        path = self._path(trace.task, trace.session_path)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(trace.model_dump_json(indent=2))
+        os.replace(tmp_path, path)
+
+    def load(self, task: str, session_path: str) -> Optional[WorkflowTrace]:
+        path = self._path(task, session_path)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return WorkflowTrace.model_validate_json(f.read())
+
+
+_workflow_trace_store: Optional[WorkflowTraceStore] = None
+
+
+def get_workflow_trace_store() -> WorkflowTraceStore:
+    global _workflow_trace_store
+    if _workflow_trace_store is None:
+        _workflow_trace_store = WorkflowTraceStore()
+    return _workflow_trace_store
@@ -0,0 +1,369 @@
+"""
+Job Scheduler - Queues workflow tasks and runs them on a bounded set of workers.
+
+POST /tasks only enqueues a job and returns its ID, so a slow workflow never
+holds an HTTP connection open. A fixed number of workers run jobs through
+TaskService, which caps how many browsers are driven at once, and a bounded
+queue pushes back on callers when the node is saturated.
+
+With TASK_WORKER_PROCESSES set, jobs run in that many worker processes instead
+(see worker.py), each with its own Playwright driver, browser pool and event
+loop, so throughput scales with CPU cores. The API process then only writes
+jobs to the shared job store and reads their status and events back.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from models.job import JobStatus, JobResponse
+from models.start_task import StartTaskRequest, StartTaskResponse
+from models.task_event import TaskEvent
+from task_service import get_task_service
+from helper.job_store import JobStore, get_job_store
+from helper.task_events import TaskEventStream
+import worker
+
+# How often the API process looks for new events and finished jobs in the job store
+STORE_POLL_SECONDS = 0.25
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """
+    A queued workflow task and its outcome.
+    """
+
+    def __init__(self, request: StartTaskRequest):
+        self.job_id = uuid.uuid4().hex
+        self.request = request
+        self.status = JobStatus.QUEUED
+        self.result: Optional[StartTaskResponse] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.done = asyncio.Event()
+        self.events = TaskEventStream()
+        self.events.publish(TaskEvent(type="status", status=self.status.value))
+
+    def to_response(self) -> JobResponse:
+        return JobResponse(
+            job_id=self.job_id,
+            task_id=self.request.task_id,
+            status=self.status,
+            result=self.result,
+            error=self.error,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class JobScheduler:
+    """
+    Bounded job queue with a fixed pool of worker coroutines.
+
+    Responsibilities:
+    - Accept jobs and reject them when the queue is full
+    - Run at most max_concurrent jobs at the same time
+    - Keep job status and results for polling
+    """
+
+    def __init__(self, max_concurrent: int = None, max_queue_size: int = None, retention: int = None):
+        """
+        Initialize the scheduler. Unset arguments are read from the environment.
+
+        Args:
+            max_concurrent: Jobs (and therefore browsers) running at once
+                (TASK_MAX_CONCURRENT_BROWSERS, defaults to BROWSER_POOL_SIZE)
+            max_queue_size: Jobs allowed to wait for a worker (TASK_QUEUE_MAX_SIZE, default 20)
+            retention: Finished jobs kept for polling (TASK_JOB_RETENTION, default 500)
+        """
+        self.max_concurrent = (
+            max_concurrent
+            if max_concurrent is not None
+            else int(os.getenv("TASK_MAX_CONCURRENT_BROWSERS", os.getenv("BROWSER_POOL_SIZE", "2")))
+        )
+        self.max_queue_size = (
+            max_queue_size if max_queue_size is not None else int(os.getenv("TASK_QUEUE_MAX_SIZE", "20"))
+        )
+        self.retention = retention if retention is not None else int(os.getenv("TASK_JOB_RETENTION", "500"))
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers = []
+
+    def start(self):
+        """
+        Spawn the worker coroutines on the running event loop.
+        """
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.max_concurrent)
+        ]
+        print(f"Job scheduler started with {self.max_concurrent} workers")
+
+    async def close(self):
+        """
+        Cancel the workers. Running jobs are cancelled with them.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, request: StartTaskRequest) -> Job:
+        """
+        Queue a task for execution.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        job = Job(request)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting), try again later.")
+        self._jobs[job.job_id] = job
+        self._prune()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+            job.events.publish(TaskEvent(type="status", status=job.status.value))
+            try:
+                job.result = await get_task_service().start_task(job.request, events=job.events)
+                job.status = JobStatus.SUCCEEDED
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Job cancelled during shutdown"
+                raise
+            except Exception as e:
+                print(f"Job {job.job_id} failed on worker {index}: {str(e)}")
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now()
+                job.events.publish(TaskEvent(type="status", status=job.status.value, error=job.error))
+                job.events.close()
+                job.done.set()
+                self._queue.task_done()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[: max(len(finished) - self.retention, 0)]:
+            del self._jobs[job_id]
+
+
+class _StoredJobEvents:
+    """
+    The event stream of a stored job, read from the job store.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self._store = store
+        self._job_id = job_id
+
+    async def subscribe(self, keepalive: float = None) -> AsyncIterator[Optional[TaskEvent]]:
+        """Same contract as TaskEventStream.subscribe: past events, then live ones until the job is finished."""
+        after_seq = 0
+        idle = 0.0
+        while True:
+            events = await asyncio.to_thread(self._store.events_after, self._job_id, after_seq)
+            for after_seq, event in events:
+                yield event
+                if event.type == "status" and event.status in (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value):
+                    return
+            # A job pruned from the store gets no more events
+            if not events and await asyncio.to_thread(self._store.get, self._job_id) is None:
+                return
+            idle = 0.0 if events else idle + STORE_POLL_SECONDS
+            if keepalive is not None and idle >= keepalive:
+                idle = 0.0
+                yield None
+            await asyncio.sleep(STORE_POLL_SECONDS)
+
+
+class _StoredJobDone:
+    """
+    Stands in for Job.done: waits until the stored job is finished.
+    """
+
+    def __init__(self, job: "StoredJob"):
+        self._job = job
+
+    def is_set(self) -> bool:
+        return self._job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    async def wait(self):
+        while not self.is_set():
+            await asyncio.sleep(STORE_POLL_SECONDS)
+            if not await self._job.refresh():
+                # Pruned from the store; its outcome is gone
+                return
+
+
+class StoredJob:
+    """
+    A job in the shared job store, as seen from the API process. Offers the same
+    attributes as Job, read from the state the job had when it was looked up or
+    last refreshed, so they never touch the store on the event loop.
+    """
+
+    def __init__(self, store: JobStore, response: JobResponse):
+        self.job_id = response.job_id
+        self._store = store
+        self._response = response
+        self.events = _StoredJobEvents(store, self.job_id)
+        self.done = _StoredJobDone(self)
+
+    async def refresh(self) -> bool:
+        """Read the job's current state from the store. Returns False if it has been pruned since."""
+        response = await asyncio.to_thread(self._store.get, self.job_id)
+        if response is None:
+            return False
+        self._response = response
+        return True
+
+    def to_response(self) -> JobResponse:
+        return self._response
+
+    @property
+    def status(self) -> JobStatus:
+        return self.to_response().status
+
+    @property
+    def result(self) -> Optional[StartTaskResponse]:
+        return self.to_response().result
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.to_response().error
+
+
+class ProcessJobScheduler:
+    """
+    Job queue in the shared job store, run by a fixed set of worker processes.
+
+    Responsibilities:
+    - Accept jobs and reject them when the queue is full
+    - Start the worker processes and restart those that die
+    - Read job status, results and events back from the store
+    """
+
+    def __init__(self, processes: int, max_queue_size: int = None, retention: int = None):
+        """
+        Args:
+            processes: Worker processes to run (TASK_WORKER_PROCESSES)
+            max_queue_size: Jobs allowed to wait for a worker (TASK_QUEUE_MAX_SIZE, default 20)
+            retention: Finished jobs kept for polling (TASK_JOB_RETENTION, default 500)
+        """
+        self.processes = processes
+        self.max_queue_size = (
+            max_queue_size if max_queue_size is not None else int(os.getenv("TASK_QUEUE_MAX_SIZE", "20"))
+        )
+        self.retention = retention if retention is not None else int(os.getenv("TASK_JOB_RETENTION", "500"))
+        self.store = get_job_store()
+        self._workers: List[Optional[multiprocessing.Process]] = [None] * processes
+        self._supervisor: Optional[asyncio.Task] = None
+
+    def start(self):
+        """
+        Start the worker processes and the task that restarts them when they exit.
+        """
+        if self._supervisor is not None:
+            return
+        for index in range(self.processes):
+            self._start_worker(index)
+        self._supervisor = asyncio.create_task(self._supervise())
+        print(f"Job scheduler started with {self.processes} worker processes")
+
+    async def close(self):
+        """
+        Stop the worker processes. Their running jobs are failed as cancelled.
+        """
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        for process in self._workers:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self._workers:
+            if process is not None:
+                await asyncio.to_thread(process.join, worker.SHUTDOWN_TIMEOUT_SECONDS + 5)
+                if process.is_alive():
+                    process.kill()
+        self._workers = [None] * self.processes
+
+    async def submit(self, request: StartTaskRequest) -> StoredJob:
+        """
+        Queue a task for execution by the worker processes.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        job_id = uuid.uuid4().hex
+        response = await asyncio.to_thread(self._submit, job_id, request)
+        if response is None:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting), try again later.")
+        return StoredJob(self.store, response)
+
+    async def get(self, job_id: str) -> Optional[StoredJob]:
+        response = await asyncio.to_thread(self.store.get, job_id)
+        if response is None:
+            return None
+        return StoredJob(self.store, response)
+
+    def _submit(self, job_id: str, request: StartTaskRequest) -> Optional[JobResponse]:
+        """Queue the job in the store and read it back, or return None if the queue is full. Blocking."""
+        if not self.store.submit(job_id, request, self.max_queue_size):
+            return None
+        self.store.prune(self.retention)
+        return self.store.get(job_id)
+
+    def _start_worker(self, index: int):
+        # Spawn, not fork: the child must not inherit this process's event loop and threads
+        process = multiprocessing.get_context("spawn").Process(
+            target=worker.run_worker, args=(index,), name=f"worker-{index}"
+        )
+        process.start()
+        self._workers[index] = process
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(5)
+            for index, process in enumerate(self._workers):
+                if process is not None and not process.is_alive():
+                    print(f"Worker {index} exited with code {process.exitcode}, restarting it")
+                    self._start_worker(index)
+
+
+_job_scheduler = None
+
+
+def get_job_scheduler():
+    """
+    The process's job scheduler: a ProcessJobScheduler when TASK_WORKER_PROCESSES
+    is above 0, otherwise an in-process JobScheduler.
+    """
+    global _job_scheduler
+    if _job_scheduler is None:
+        processes = int(os.getenv("TASK_WORKER_PROCESSES", "0"))
+        _job_scheduler = ProcessJobScheduler(processes) if processes > 0 else JobScheduler()
+    return _job_scheduler
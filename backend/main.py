@@ -3,20 +3,53 @@ FastAPI Backend for AI Multi-Agent Workflow Capture System
 Coordinates agents, runs Playwright automation, and exposes REST APIs
 """
 
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import uvicorn
-import os
 from dotenv import load_dotenv
 from task_controller import router as task_controller_router
+from screenshot_controller import router as screenshot_controller_router
+from browser_pool import get_browser_pool
+from job_scheduler import get_job_scheduler, JobScheduler
+from typing import List
+from helper.async_utils import get_tool_bridge
+from helper.config_registry import get_config_registry
+from helper.instrumentation import get_metrics_registry
+from helper.url_cache import get_url_cache
+from helper.llm_cache import get_llm_cache
+from models.browser_pool_stats import BrowserPoolStats
+from models.tool_stats import ToolStats
+from models.url_cache_stats import URLCacheStats
+from models.llm_cache_stats import LLMCacheStats
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Validate the configs, warm up the browser pool and job workers on startup and shut them down on exit"""
+    get_config_registry().load_all()
+    browser_pool = get_browser_pool()
+    job_scheduler = get_job_scheduler()
+    # With worker processes the browsers live in the workers, not here
+    runs_jobs_here = isinstance(job_scheduler, JobScheduler)
+    if runs_jobs_here:
+        await browser_pool.start()
+    job_scheduler.start()
+    yield
+    await job_scheduler.close()
+    if runs_jobs_here:
+        await browser_pool.close()
+
+
 app = FastAPI(
     title="Agent B - Workflow Capture System",
     description="AI-driven system for autonomous web app navigation and workflow capture",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend communication
@@ -28,10 +61,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount screenshots directory
-os.makedirs("screenshots", exist_ok=True)
-app.mount("/screenshots", StaticFiles(directory="screenshots"), name="screenshots")
-
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -42,10 +71,41 @@ async def root():
     }
 
 
+@app.get("/pool/stats", response_model=BrowserPoolStats)
+async def pool_stats():
+    """Browser pool statistics: idle and leased browsers, launches and recycles"""
+    return get_browser_pool().stats()
+
+
+@app.get("/tools/stats", response_model=List[ToolStats])
+async def tool_stats():
+    """Tool call statistics: calls, errors, timeouts, queue wait and execution time per tool"""
+    return get_tool_bridge().stats()
+
+
+@app.get("/url-cache/stats", response_model=URLCacheStats)
+async def url_cache_stats():
+    """URL cache statistics: entries, known-domain and cache hits, misses"""
+    return get_url_cache().stats()
+
+
+@app.get("/llm-cache/stats", response_model=LLMCacheStats)
+async def llm_cache_stats():
+    """LLM cache statistics: mode, entries, size, hits, misses and hit rate"""
+    return get_llm_cache().stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Span duration histograms in the Prometheus text format"""
+    return PlainTextResponse(get_metrics_registry().render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(task_controller_router)
+app.include_router(screenshot_controller_router)
 
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=os.getenv("UVICORN_RELOAD", "false").lower() == "true")
 
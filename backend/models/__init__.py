@@ -5,6 +5,31 @@ Models package - contains Pydantic models for configuration and data validation.
 from models.agent_config import AgentConfig
 from models.task_config import TaskConfig
 from models.start_task import StartTaskRequest, StartTaskResponse
+from models.screenshot_options import ScreenshotOptions
+from models.browser_pool_stats import BrowserPoolStats
+from models.job import JobStatus, SubmitJobResponse, JobResponse
+from models.task_event import TaskEvent
+from models.tool_stats import ToolStats
+from models.url_cache_stats import URLCacheStats
+from models.llm_cache_stats import LLMCacheStats
+from models.task_timing import SpanTiming
+from models.ui_action import UIAction
 
-__all__ = ["AgentConfig", "TaskConfig", "StartTaskRequest", "StartTaskResponse"]
+__all__ = [
+    "AgentConfig",
+    "TaskConfig",
+    "StartTaskRequest",
+    "StartTaskResponse",
+    "ScreenshotOptions",
+    "BrowserPoolStats",
+    "JobStatus",
+    "SubmitJobResponse",
+    "JobResponse",
+    "TaskEvent",
+    "ToolStats",
+    "URLCacheStats",
+    "LLMCacheStats",
+    "SpanTiming",
+    "UIAction",
+]
 
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class BrowserPoolStats(BaseModel):
+    size: int = Field(..., description="The configured number of warm browsers.")
+    idle: int = Field(..., description="The number of warm browsers waiting for a lease.")
+    leased: int = Field(..., description="The number of browsers currently leased to a task.")
+    launches: int = Field(..., description="The total number of browser processes launched.")
+    recycles: int = Field(..., description="The total number of browsers recycled.")
+    contexts_created: int = Field(..., description="The total number of browser contexts leased out.")
+    blocked_requests: int = Field(0, description="The total number of requests blocked in released contexts.")
@@ -0,0 +1,28 @@
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Optional
+from models.start_task import StartTaskResponse
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class SubmitJobResponse(BaseModel):
+    job_id: str = Field(..., description="The ID of the queued job.")
+    status: JobStatus = Field(..., description="The status of the job.")
+
+
+class JobResponse(BaseModel):
+    job_id: str = Field(..., description="The ID of the job.")
+    task_id: str = Field(..., description="The ID of the task the job runs.")
+    status: JobStatus = Field(..., description="The status of the job.")
+    result: Optional[StartTaskResponse] = Field(None, description="The workflow result once the job has succeeded.")
+    error: Optional[str] = Field(None, description="The error message if the job has failed.")
+    created_at: datetime = Field(..., description="When the job was queued.")
+    started_at: Optional[datetime] = Field(None, description="When a worker picked up the job.")
+    finished_at: Optional[datetime] = Field(None, description="When the job finished.")
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class LLMCacheStats(BaseModel):
+    mode: str = Field(..., description="The cache mode: off, record, playback or readwrite.")
+    entries: int = Field(..., description="The number of cached completions.")
+    size_bytes: int = Field(..., description="The total size of the cached completions in bytes.")
+    hits: int = Field(..., description="The number of LLM calls answered from the cache.")
+    misses: int = Field(..., description="The number of cache lookups that found no completion.")
+    writes: int = Field(..., description="The number of completions stored.")
+    hit_rate: float = Field(..., description="The share of lookups answered from the cache.")
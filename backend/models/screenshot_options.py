@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+
+
+class ScreenshotOptions(BaseModel):
+    format: Literal["png", "jpeg", "webp"] = Field("png", description="The image format of the saved screenshots.")
+    quality: int = Field(80, ge=1, le=100, description="The encoding quality for JPEG and WebP screenshots.")
+    scale: float = Field(1.0, gt=0, le=1, description="The factor the screenshots are downscaled by, 1.0 keeps full size.")
+    thumbnail_width: int = Field(320, ge=0, description="The width of the thumbnail saved next to each screenshot, 0 disables thumbnails.")
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
+from models.screenshot_options import ScreenshotOptions
+from models.task_timing import SpanTiming
 
 
 class StartTaskRequest(BaseModel):
@@ -7,8 +9,14 @@ class StartTaskRequest(BaseModel):
     session_path: str = Field(..., description="The path to store the session.")
     task: str = Field(..., description="The task to complete.")
     task_id: str = Field(..., description="The ID of the task.")
+    screenshot: ScreenshotOptions = Field(default_factory=ScreenshotOptions, description="The encoding options for the screenshots of the task.")
+    replay: bool = Field(False, description="Replay the recorded browser actions of this task without the agents, falling back to the agents if a step fails.")
 
 
 class StartTaskResponse(BaseModel):
     paths: List[str] = Field(..., description="List of saved screenshot paths showing the completed workflow.")
-    explanation: str = Field(..., description="Step-by-step explanation of how the workflow was completed.")
\ No newline at end of file
+    thumbnail_paths: List[str] = Field(default_factory=list, description="Thumbnail paths in the same order as paths, the full path where no thumbnail exists.")
+    explanation: str = Field(..., description="Step-by-step explanation of how the workflow was completed.")
+    replayed: bool = Field(False, description="Whether the workflow was replayed from a recorded trace instead of run by the agents.")
+    blocked_requests: Dict[str, int] = Field(default_factory=dict, description="Requests blocked during the task, per category (analytics, ads, media, fonts, third_party).")
+    timings: Dict[str, SpanTiming] = Field(default_factory=dict, description="Where the task spent its time, per span name and label (e.g. 'llm_call:gpt-4.1-mini', 'tool_call:<tool>', 'settle_wait').")
@@ -0,0 +1,15 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+
+class TaskEvent(BaseModel):
+    type: str = Field(..., description="The event type: 'status' for job status changes, 'step' for tool invocations.")
+    status: str = Field(..., description="The job status for status events, 'ok' or 'error' for step events.")
+    timestamp: datetime = Field(default_factory=datetime.now, description="When the event happened.")
+    tool: Optional[str] = Field(None, description="The name of the tool that was invoked.")
+    args: Dict[str, Any] = Field(default_factory=dict, description="The arguments the tool was invoked with.")
+    latency_ms: Optional[float] = Field(None, description="How long the tool invocation took in milliseconds.")
+    screenshot_path: Optional[str] = Field(None, description="The screenshot captured by the tool, if any.")
+    url: Optional[str] = Field(None, description="The page URL after the tool invocation.")
+    error: Optional[str] = Field(None, description="The error message if the job or tool invocation failed.")
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class SpanTiming(BaseModel):
+    count: int = Field(0, description="How many times the span ran during the task.")
+    total_ms: float = Field(0.0, description="The total duration of the span in milliseconds.")
+    max_ms: float = Field(0.0, description="The longest single duration of the span in milliseconds.")
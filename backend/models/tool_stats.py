@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+
+class ToolStats(BaseModel):
+    tool: str = Field(..., description="The name of the tool.")
+    calls: int = Field(0, description="The number of calls that started running.")
+    errors: int = Field(0, description="The number of calls that raised an error.")
+    timeouts: int = Field(0, description="The number of calls cancelled for exceeding their timeout or queue wait.")
+    queue_wait_ms_total: float = Field(0.0, description="The total time calls waited for a free browser slot, in milliseconds.")
+    queue_wait_ms_max: float = Field(0.0, description="The longest time a call waited for a free browser slot, in milliseconds.")
+    execution_ms_total: float = Field(0.0, description="The total time calls spent running on the browser loop, in milliseconds.")
+    execution_ms_max: float = Field(0.0, description="The longest time a call spent running on the browser loop, in milliseconds.")
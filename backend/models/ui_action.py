@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+class UIAction(BaseModel):
+    action: Literal["click", "fill", "press", "select"] = Field(..., description="The operation: click an element, fill an input, press a key or select an option.")
+    element_id: Optional[int] = Field(None, description="The id of the element in the latest UI snapshot.")
+    selector: Optional[str] = Field(None, description="A Playwright selector, only when the element has no id.")
+    value: Optional[str] = Field(None, description="The text to fill, or the value or label of the option to select.")
+    key: Optional[str] = Field(None, description="The key to press, e.g. \"Enter\" or \"Tab\"; on the element if one is given, else on the page.")
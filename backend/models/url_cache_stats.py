@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class URLCacheStats(BaseModel):
+    entries: int = Field(..., description="The number of cached goal to URL resolutions.")
+    known_domain_hits: int = Field(..., description="The number of lookups answered from the known app domains.")
+    cache_hits: int = Field(..., description="The number of lookups answered from the cache.")
+    misses: int = Field(..., description="The number of lookups that needed a web search.")
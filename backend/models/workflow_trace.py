@@ -0,0 +1,18 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+
+class TraceStep(BaseModel):
+    tool: str = Field(..., description="The name of the browser tool that was invoked.")
+    args: Dict[str, Any] = Field(default_factory=dict, description="The arguments the tool was invoked with.")
+    url: Optional[str] = Field(None, description="The page URL after the tool invocation.")
+
+
+class WorkflowTrace(BaseModel):
+    task: str = Field(..., description="The task the trace was recorded for.")
+    session_path: str = Field(..., description="The session the trace was recorded with.")
+    steps: List[TraceStep] = Field(..., description="The successful browser actions of the run, in order.")
+    path_steps: List[int] = Field(..., description="For each screenshot of the result, the index of the step that captured it.")
+    explanation: str = Field(..., description="The explanation of the recorded run.")
+    recorded_at: datetime = Field(default_factory=datetime.now, description="When the trace was recorded.")
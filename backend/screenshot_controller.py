@@ -0,0 +1,113 @@
+import asyncio
+import os
+from email.utils import formatdate
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from helper.screenshot_store import SCREENSHOTS_DIR, BLOBS_DIR
+
+router = APIRouter(prefix="/screenshots", tags=["screenshots"])
+
+# Blob files are named after their content hash and never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".webp": "image/webp"}
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def get_screenshot(file_path: str, request: Request):
+    """
+    Serve a screenshot with caching headers.
+
+    Content-addressed images are served with an immutable Cache-Control and their
+    content hash as ETag. Supports If-None-Match (304) and single byte ranges
+    (206, with If-Range).
+    """
+    root = os.path.realpath(SCREENSHOTS_DIR)
+    path = os.path.realpath(os.path.join(root, file_path))
+    extension = os.path.splitext(path)[1].lower()
+    if os.path.commonpath([root, path]) != root or extension not in MEDIA_TYPES or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+
+    stat = os.stat(path)
+    headers = {
+        "ETag": _etag(path, stat),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if _is_blob(path) else "no-cache",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+    media_type = MEDIA_TYPES[extension]
+
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = _requested_range(request, headers["ETag"], stat.st_size)
+    if byte_range is None:
+        return FileResponse(path, headers=headers, media_type=media_type)
+    if byte_range is False:
+        headers["Content-Range"] = f"bytes */{stat.st_size}"
+        return Response(status_code=416, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if request.method == "HEAD":
+        return Response(status_code=206, headers=headers, media_type=media_type)
+    content = await asyncio.to_thread(_read_range, path, start, end)
+    return Response(content=content, status_code=206, headers=headers, media_type=media_type)
+
+
+def _is_blob(path: str) -> bool:
+    blobs_root = os.path.realpath(BLOBS_DIR)
+    return os.path.commonpath([blobs_root, path]) == blobs_root
+
+
+def _etag(path: str, stat: os.stat_result) -> str:
+    if _is_blob(path):
+        return f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    return f'"{int(stat.st_mtime)}-{stat.st_size}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def _requested_range(request: Request, etag: str, size: int):
+    """
+    Parse a single "bytes=" range.
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file (no, multiple or
+        stale ranges), or False when the range cannot be satisfied.
+    """
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != etag:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            start = size - int(end_text)
+            end = size - 1
+    except ValueError:
+        return None
+
+    start = max(start, 0)
+    end = min(end, size - 1)
+    if start > end:
+        return False
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start + 1)
@@ -1,61 +1,217 @@
+"""
+Session - Logged-in browser state for the tasks, kept in memory.
+
+Parsed storage states (cookies and localStorage) are cached per session file and
+handed to every context leased for that session, so concurrent tasks share one
+authenticated state without re-reading or re-parsing the file; the file is only
+read again when it changes on disk. Manual login polls the page until the
+cookies have changed and the URL has left the login page, or, for apps that log
+in without a navigation, the password field is gone, instead of waiting a fixed
+time. After each run the context's state is written back atomically, so
+refreshed cookies survive for the next task.
+"""
+
+import asyncio
+import json
 import os
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+import re
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Page
+from browser_pool import get_browser_pool, BrowserLease, VIEWPORT
+from helper.settle import install_settle_observer
+from helper.perception import install_perception_agent
+
+LOGIN_TIMEOUT_SECONDS = float(os.getenv("LOGIN_TIMEOUT_SECONDS", "300"))
+LOGIN_POLL_SECONDS = 1.0
+
+# A password field the user can type into
+PASSWORD_FIELD_SELECTOR = "input[type=password]:visible"
+
+# Paths that are still part of a login flow (SSO redirects, 2FA, ...)
+LOGIN_PATH_PATTERN = re.compile(r"log-?in|sign-?in|auth|sso|oauth|2fa|mfa|verify|callback", re.IGNORECASE)
+
+
+def _cookie_set(cookies: list) -> set:
+    return {(cookie["name"], cookie["domain"], cookie["value"]) for cookie in cookies}
+
+
+def _left_login_page(url: str, login_url: str) -> bool:
+    current, login = urlparse(url), urlparse(login_url)
+    if current.scheme not in ("http", "https"):
+        return False
+    if (current.netloc, current.path.rstrip("/")) == (login.netloc, login.path.rstrip("/")):
+        return False
+    return not LOGIN_PATH_PATTERN.search(current.path)
+
+
+class SessionManager:
+    """
+    Process-wide cache of storage states, keyed by the absolute session file path.
+    """
+
+    def __init__(self):
+        self._states: Dict[str, Tuple[int, dict]] = {}
+        self._lock = threading.Lock()
+
+    def storage_state(self, session_path: str) -> Optional[dict]:
+        """Return the parsed storage state of a session file, or None if there is none."""
+        path = os.path.abspath(session_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._states.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, "r") as f:
+            state = json.load(f)
+        with self._lock:
+            self._states[path] = (mtime, state)
+        return state
+
+    def save(self, session_path: str, state: dict):
+        """Atomically write a storage state to its file and cache it. Unchanged states are not written."""
+        path = os.path.abspath(session_path)
+        with self._lock:
+            cached = self._states.get(path)
+            if cached is not None and cached[1] == state and os.path.exists(path):
+                return
+
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+            self._states[path] = (os.stat(path).st_mtime_ns, state)
+
+    async def refresh(self, context: BrowserContext, session_path: str):
+        """Store the current state of a context, e.g. rotated cookies, after a run."""
+        try:
+            state = await context.storage_state()
+            await asyncio.to_thread(self.save, session_path, state)
+        except Exception as e:
+            print(f"Refreshing session {session_path} failed: {type(e).__name__} - {e}")
+
+    async def login(self, login_url: str, session_path: str, timeout_seconds: float = LOGIN_TIMEOUT_SECONDS):
+        """
+        Open a visible browser for manual login and save the session once it is detected.
+
+        Raises:
+            TimeoutError: No completed login within timeout_seconds.
+        """
+        # Manual login needs a visible browser, so it does not come from the headless pool
+        browser = await get_browser_pool().launch_interactive_browser()
+        try:
+            context = await browser.new_context(viewport=VIEWPORT, device_scale_factor=1.0)
+            page = await context.new_page()
+            await page.goto(login_url, wait_until="domcontentloaded", timeout=20000)
+
+            print(f"Please log in manually within {timeout_seconds:.0f} seconds...")
+            await self._wait_for_login(context, page, login_url, timeout_seconds)
+
+            await asyncio.to_thread(self.save, session_path, await context.storage_state())
+            print(f"Session saved to {session_path}")
+        finally:
+            await browser.close()
+
+    @staticmethod
+    async def _wait_for_login(context: BrowserContext, page: Page, login_url: str, timeout_seconds: float):
+        """
+        Poll until the cookies have changed and the page has left the login flow:
+        either its URL is no longer a login page, or, for apps that log in in place,
+        the password field shown during the wait is gone.
+        """
+        initial_cookies = _cookie_set(await context.cookies())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds
+        saw_password_field = False
+
+        while loop.time() < deadline:
+            await asyncio.sleep(LOGIN_POLL_SECONDS)
+            if page.is_closed():
+                raise RuntimeError("The login window was closed before the login completed.")
+            try:
+                password_field = await page.locator(PASSWORD_FIELD_SELECTOR).count() > 0
+            except Exception:
+                # The page is navigating; look again on the next poll
+                continue
+            saw_password_field = saw_password_field or password_field
+            # An email-first form has no password field yet, so it must have been seen first
+            logged_in_place = saw_password_field and not password_field
+            if (
+                (_left_login_page(page.url, login_url) or logged_in_place)
+                and _cookie_set(await context.cookies()) - initial_cookies
+            ):
+                # Let the app finish setting its session cookies and storage
+                await page.wait_for_load_state("load")
+                print(f"Login detected at {page.url}")
+                return
+
+        raise TimeoutError(f"No login detected within {timeout_seconds:.0f} seconds.")
+
+
+_session_manager: Optional[SessionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> SessionManager:
+    global _session_manager
+    with _manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager()
+    return _session_manager
 
-# Global playwright instance that stays alive
-_playwright = None
 
 async def ensure_session(
     login_url: str = None,
     session_path: str = "session.json",
-) -> tuple[Browser, BrowserContext, Page]:
+) -> BrowserLease:
     """
     Generic Playwright session manager.
-    - Reuses existing login session if available.
-    - Otherwise opens the login page, waits for manual login, and saves session.
+    - Reuses the cached login session if available.
+    - Otherwise opens the login page, waits until the manual login completes, and saves the session.
 
     Args:
         login_url (str): Optional explicit login page URL.
         session_path (str): Where to store session cookies/localStorage.
 
     Returns:
-        (browser, page): A tuple of Playwright handles ready for use.
+        BrowserLease: A context leased from the warm browser pool, with one open page.
+            Release it once the task is done.
     """
-    global _playwright
-    
-    # Start playwright if not already started
-    if _playwright is None:
-        _playwright = await async_playwright().start()
-    
-    browser = await _playwright.chromium.launch(headless=False, channel="chrome")
-
-    # If we already have a session, reuse it
-    if os.path.exists(session_path):
+    manager = get_session_manager()
+    state = await asyncio.to_thread(manager.storage_state, session_path)
+
+    if state is None:
+        print(f"No session found. Opening {login_url} for manual login...")
+        if not login_url:
+            raise ValueError("You need to first login to the website before starting the task.")
+        await manager.login(login_url, session_path)
+        state = await asyncio.to_thread(manager.storage_state, session_path)
+    else:
         print(f"Reusing existing session from {session_path}")
-        context = await browser.new_context(
-            storage_state=session_path,
-            viewport={"width": 1920, "height": 1080},
-            device_scale_factor=1.0
-        )
-        page = await context.new_page()
-        
-        print("Logged in automatically")
-        return browser, context
-
-    # If no session found, go to login page and wait 1 minute for manual login
-    print(f"No session found. Opening {login_url} for manual login...")
-    if not login_url:
-        raise ValueError("You need to first login to the website before starting the task.")
-    context = await browser.new_context(viewport={"width": 1920, "height": 1080}, device_scale_factor=1.0)
-    page = await context.new_page()
-
-    await page.goto(login_url, wait_until="domcontentloaded", timeout=20000)
-
-    wait_time = 60000 # 1 minute for manual login
-
-    print(f"Please log in manually within {wait_time / 1000} seconds...")
-    await page.wait_for_timeout(wait_time)
-
-    await context.storage_state(path=session_path)
-    print(f"Session saved to {session_path}")
-
-    return browser, context
+
+    lease = await get_browser_pool().acquire(storage_state=state)
+    await prepare_context(lease)
+    return lease
+
+
+async def prepare_context(lease: BrowserLease):
+    """
+    Install the page scripts and listeners the tools rely on into a leased context.
+
+    ensure_session() does this for every task; call it for contexts acquired from
+    a browser pool directly. Releases the lease if the installation fails.
+    """
+    try:
+        await install_settle_observer(lease.context)
+        await install_perception_agent(lease.context)
+    except Exception:
+        await lease.release()
+        raise
@@ -1,17 +1,83 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from models.start_task import StartTaskRequest, StartTaskResponse
-from task_service import get_task_service, TaskService
+from models.job import JobStatus, SubmitJobResponse, JobResponse
+from job_scheduler import get_job_scheduler, JobScheduler, QueueFullError
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+@router.post("", response_model=SubmitJobResponse, status_code=202)
+async def submit_task(request: StartTaskRequest, job_scheduler: JobScheduler = Depends(get_job_scheduler)):
+    """
+    Queue a task and return its job ID immediately. Poll GET /tasks/{job_id} for the result.
+
+    Example:
+        POST /tasks
+        {
+            "site_url": "https://notion.so",
+            "login_url": "https://notion.so/login",
+            "session_path": "session.json"
+            "task": "How do I create a project in Notion?"
+        }
+    """
+    try:
+        job = await job_scheduler.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return SubmitJobResponse(job_id=job.job_id, status=job.status)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_task(job_id: str, job_scheduler: JobScheduler = Depends(get_job_scheduler)):
+    """
+    Get the status of a queued task, and its workflow result once it has succeeded.
+    """
+    job = await job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_response()
+
+
+@router.get("/{job_id}/events")
+async def stream_task_events(job_id: str, request: Request, job_scheduler: JobScheduler = Depends(get_job_scheduler)):
+    """
+    Stream the progress of a task as Server-Sent Events.
+
+    Emits a `status` event on every job status change and a `step` event per tool
+    invocation (tool, latency, screenshot path, URL) as soon as it finishes.
+    The stream replays past events first and ends when the job is finished.
+    """
+    job = await job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    async def event_source():
+        async for event in job.events.subscribe(keepalive=15):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event.type}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/start", response_model=StartTaskResponse)
-async def start_task(request: StartTaskRequest, task_service: TaskService = Depends(get_task_service)):
+async def start_task(request: StartTaskRequest, job_scheduler: JobScheduler = Depends(get_job_scheduler)):
     """
     Main endpoint: accepts task text, launches automation, and returns workflow steps
-    
+
+    Runs through the same job queue as POST /tasks but holds the request open until
+    the workflow is finished.
+
     Example:
         POST /tasks/start
         {
@@ -22,7 +88,12 @@ async def start_task(request: StartTaskRequest, task_service: TaskService = Depe
         }
     """
     try:
-        return await task_service.start_task(request)
-    except Exception as e:
-        print(f"Task execution failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Task execution failed: {str(e)}")
\ No newline at end of file
+        job = await job_scheduler.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    await job.done.wait()
+    if job.status != JobStatus.SUCCEEDED:
+        print(f"Task execution failed: {job.error}")
+        raise HTTPException(status_code=500, detail=f"Task execution failed: {job.error}")
+    return job.result
@@ -1,35 +1,131 @@
+import asyncio
 import json
+import os
+from typing import List
 from crewai import Crew
-from session import ensure_session
+from session import ensure_session, get_session_manager
 from models.start_task import StartTaskRequest, StartTaskResponse
+from models.task_event import TaskEvent
+from models.screenshot_options import ScreenshotOptions
 from helper.take_screenshot import take_screenshot
 from helper.page_helper import get_current_page
+from helper.image_dedup import find_duplicates
+from helper.screenshot_store import get_screenshot_store
 from create_tools import create_tools
 from agents.workflow_executor_agent import WorkflowExecutorAgent
 from agents.url_finder_agent import URLFinderAgent
 from tasks.workflow_execution_task import WorkflowExecutionTask
 from tasks.url_finding_task import URLFindingTask
+from helper.task_events import TaskEventStream
+from helper.instrumentation import record_task_timings, span
+from helper.workflow_trace import build_trace, get_workflow_trace_store
+from models.workflow_trace import WorkflowTrace
+from workflow_replay import replay_trace
 
 class TaskService:
 
-    async def start_task(self, start_task_request: StartTaskRequest) -> StartTaskResponse:
+    async def start_task(self, start_task_request: StartTaskRequest, events: TaskEventStream = None) -> StartTaskResponse:
         """
         Start a new task by coordinating browser session, tools, crew, and execution.
+
+        With replay set and a trace recorded for the task, the trace is replayed
+        without the agents; the agents only take over if a replayed step fails.
+        Every successful agent run records a new trace.
+
+        The response carries the task's timing breakdown: every instrumented span
+        (browser work, tool calls, LLM calls) that ran on behalf of the task.
+
+        Args:
+            start_task_request: The task to run
+            events: Optional stream that receives a step event per tool invocation
         """
-        # Setup browser session
-        browser, context = await ensure_session(
+        with record_task_timings() as timings:
+            async with span("task"):
+                response = await self._start_task(start_task_request, events or TaskEventStream())
+            response.timings = timings.summary()
+            return response
+
+    async def _start_task(self, start_task_request: StartTaskRequest, events: TaskEventStream) -> StartTaskResponse:
+        # Lease a browser context from the warm pool
+        lease = await ensure_session(
             login_url=start_task_request.login_url,
             session_path=start_task_request.session_path
         )
+        context = lease.context
+
+        try:
+            response = await self._run(start_task_request, context, events)
+            response.blocked_requests = dict(lease.request_blocker.blocked)
+            return response
+        finally:
+            # Keep cookies the app refreshed during the run for the next task
+            await get_session_manager().refresh(context, start_task_request.session_path)
+            await lease.release()
+
+    async def _run(self, start_task_request: StartTaskRequest, context, events: TaskEventStream) -> StartTaskResponse:
+        """
+        Replay the recorded trace if asked to and possible, otherwise run the agents.
+        """
+        if start_task_request.replay:
+            trace = await asyncio.to_thread(
+                get_workflow_trace_store().load, start_task_request.task, start_task_request.session_path
+            )
+            if trace is not None:
+                response = await self._replay(start_task_request, trace, context, events)
+                if response is not None:
+                    return response
+                print("Replay failed, falling back to the agents")
+
+        # Steps of a failed replay are already in the history; only the agents' steps are recorded
+        crew_start = len(events.history)
+        response = await self._run_crew(start_task_request, context, events)
+        await self._record_trace(start_task_request, events.history[crew_start:], response)
+        return response
 
+    async def _replay(
+        self, start_task_request: StartTaskRequest, trace: WorkflowTrace, context, events: TaskEventStream
+    ) -> StartTaskResponse:
+        """
+        Replay a recorded trace. Returns None if a step failed.
+        """
+        id_number = start_task_request.task_id
+        print(f"Replaying {len(trace.steps)} recorded steps")
+        step_paths = await replay_trace(trace, context, id_number, events, start_task_request.screenshot)
+        if step_paths is None:
+            return None
+
+        paths = [step_paths[index] for index in trace.path_steps if step_paths[index]]
+        return await self._build_response(
+            paths, trace.explanation, context, id_number, start_task_request.screenshot, replayed=True
+        )
+
+    async def _record_trace(self, start_task_request: StartTaskRequest, history: List[TaskEvent], response: StartTaskResponse):
+        """
+        Save the browser actions of a successful run, given by its events, for later replay.
+        """
+        trace = build_trace(
+            start_task_request.task, start_task_request.session_path,
+            history, response.paths, response.explanation,
+        )
+        if trace is None:
+            return
+        try:
+            await asyncio.to_thread(get_workflow_trace_store().save, trace)
+        except OSError as e:
+            print(f"Recording the workflow trace failed: {type(e).__name__} - {e}")
+
+    async def _run_crew(self, start_task_request: StartTaskRequest, context, events: TaskEventStream) -> StartTaskResponse:
+        """
+        Build the crew for a leased browser context and run it to completion.
+        """
         id_number = start_task_request.task_id
 
         # Create all available tools
-        all_tools = create_tools(context, id_number)
+        all_tools = create_tools(context, id_number, events, start_task_request.screenshot)
         
         # Separate tools for different tasks
-        url_finder_tools = [tool for tool in all_tools if tool.name in ["web_search_url_tool", "navigate_page_and_take_screenshot_tool", "capture_ui_snapshot_tool"]]
-        executor_tools = [tool for tool in all_tools if tool.name != "web_search_url_tool"]
+        url_finder_tools = [tool for tool in all_tools if tool.name in ["web_search_url_tool", "verify_urls_tool", "navigate_page_and_take_screenshot_tool", "capture_ui_snapshot_tool"]]
+        executor_tools = [tool for tool in all_tools if tool.name not in ["web_search_url_tool", "verify_urls_tool"]]
         
         
         url_finder_agent = URLFinderAgent().get_agent()
@@ -55,15 +151,14 @@ class TaskService:
             cache=False,   # Disable tool result caching otherwise it does not work with the snapshot tool
         )
         
-        result = await crew.kickoff_async(inputs={"task_description": start_task_request.task})
+        async with span("crew_run"):
+            result = await crew.kickoff_async(inputs={"task_description": start_task_request.task})
 
         print("\n=== FINAL RESULT ===")
         print(result)
         
         # Finalize workflow result with final screenshot
-        final_result = await self._finalize_workflow_result(result, context, id_number)
-
-        await browser.close()
+        final_result = await self._finalize_workflow_result(result, context, id_number, start_task_request.screenshot)
 
         return final_result
 
@@ -71,7 +166,8 @@ class TaskService:
         self, 
         result, 
         context, 
-        id_number: str
+        id_number: str,
+        screenshot_options: ScreenshotOptions = None,
     ) -> StartTaskResponse:
         """
         Finalize the workflow result by parsing output and capturing final screenshot.
@@ -80,24 +176,79 @@ class TaskService:
             result: The CrewAI task result
             context: Browser context for taking final screenshot
             id_number: Task identifier for screenshot naming
+            screenshot_options: Encoding options for the final screenshot
             
         Returns:
-            StartTaskResponse with paths and explanation
+            StartTaskResponse with paths, thumbnail paths and explanation
         """
         
         parsed = result.pydantic.model_dump() if hasattr(result, 'pydantic') else json.loads(result.raw)
         paths = parsed.get("paths", [])
         explanation = parsed.get("explanation", "")
 
+        return await self._build_response(paths, explanation, context, id_number, screenshot_options)
+
+    async def _build_response(
+        self,
+        paths: list,
+        explanation: str,
+        context,
+        id_number: str,
+        screenshot_options: ScreenshotOptions = None,
+        replayed: bool = False,
+    ) -> StartTaskResponse:
+        """
+        Add the final screenshot to the workflow's screenshots, deduplicate them and build the response.
+        """
         current_page = await get_current_page(context)
-        final_screenshot_path = await take_screenshot(current_page, id_number, tag="final_state")
+        final_screenshot_path = await take_screenshot(current_page, id_number, tag="final_state", options=screenshot_options)
 
         paths.append(final_screenshot_path)
+        paths = await self._deduplicate_screenshots(paths, id_number)
+
+        # Thumbnails are only stored when they are smaller than the screenshot
+        store = get_screenshot_store()
+        thumbnail_paths = await asyncio.to_thread(
+            lambda: [store.thumbnail_for(os.path.normpath(path)) or path for path in paths]
+        )
 
         return StartTaskResponse(
             paths=paths,
-            explanation=explanation
+            thumbnail_paths=thumbnail_paths,
+            explanation=explanation,
+            replayed=replayed,
         )
+
+    async def _deduplicate_screenshots(self, paths: list, id_number: str) -> list:
+        """
+        Link near-identical screenshots to the first frame showing the same UI state
+        and release the task's references to the duplicates.
+
+        Paths keep their order and length so they stay aligned with the explanation
+        steps; duplicates just point at the same image.
+        """
+        max_distance = int(os.getenv("SCREENSHOT_DEDUP_DISTANCE", "4"))
+        if max_distance < 0:
+            return paths
+
+        # Paths come from the LLM, so only ever touch images this task references
+        store = get_screenshot_store()
+        frames = await asyncio.to_thread(
+            lambda: [os.path.normpath(path) for path in paths if store.is_referenced_by(id_number, os.path.normpath(path))]
+        )
+
+        # Frames highlighting different elements document different steps
+        highlights = await asyncio.to_thread(
+            lambda: {path: store.highlight_for(path) for path in frames}
+        )
+        duplicates = await asyncio.to_thread(find_duplicates, frames, max_distance, highlights)
+        if not duplicates:
+            return paths
+
+        print(f"Linked {len(duplicates)} duplicate screenshots")
+        for path in duplicates:
+            await asyncio.to_thread(store.release, id_number, path)
+        return [duplicates.get(os.path.normpath(path), path) for path in paths]
     
 
 
@@ -8,9 +8,9 @@ This task is responsible for:
 - Confirming navigation to the verified URL
 """
 
-import yaml
 from crewai import Task, Agent
 from models.task_config import TaskConfig
+from helper.config_registry import get_config_registry
 from models.url_finder_agent_output import URLFinderOutput
 
 
@@ -19,7 +19,7 @@ class URLFindingTask:
     URL Finding Task class for creating tasks that discover workflow starting points.
     
     This class handles:
-    - Loading task configuration from YAML
+    - Loading task configuration from the config registry
     - Creating and configuring the CrewAI Task
     """
     
@@ -38,15 +38,12 @@ class URLFindingTask:
     
     def _load_config(self) -> TaskConfig:
         """
-        Load task configuration from YAML file.
+        Get the task configuration from the config registry.
         
         Returns:
-            TaskConfig object with description and expected output
+            TaskConfig object loaded from configs/tasks/url_finding_task.yaml
         """
-        with open("configs/tasks/url_finding_task.yaml", "r") as f:
-            yaml_data = yaml.safe_load(f)
-            config = TaskConfig(**yaml_data["url_finding_task"])
-        return config
+        return get_config_registry().task_config("url_finding_task")
     
     def _create_task(self) -> Task:
         """
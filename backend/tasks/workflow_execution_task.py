@@ -8,9 +8,9 @@ This task is responsible for:
 - Providing comprehensive explanations
 """
 
-import yaml
 from crewai import Task, Agent
 from models.task_config import TaskConfig
+from helper.config_registry import get_config_registry
 from models.workflow_executor_output import WorkflowExecutorOutput
 
 class WorkflowExecutionTask:
@@ -18,7 +18,7 @@ class WorkflowExecutionTask:
     Workflow Execution Task class for creating workflow execution tasks.
     
     This class handles:
-    - Loading task configuration from YAML
+    - Loading task configuration from the config registry
     - Creating and configuring the CrewAI Task
     """
     
@@ -38,15 +38,12 @@ class WorkflowExecutionTask:
     
     def _load_config(self) -> TaskConfig:
         """
-        Load task configuration from YAML file.
+        Get the task configuration from the config registry.
         
         Returns:
-            TaskConfig object with description and expected output
+            TaskConfig object loaded from configs/tasks/workflow_execution_task.yaml
         """
-        with open("configs/tasks/workflow_execution_task.yaml", "r") as f:
-            yaml_data = yaml.safe_load(f)
-            config = TaskConfig(**yaml_data["workflow_execution_task"])
-        return config
+        return get_config_registry().task_config("workflow_execution_task")
     
     def _create_task(self) -> Task:
         """
@@ -9,6 +9,7 @@ from .click_element_tool import create_click_element_tool
 from .fill_input_tool import create_fill_input_tool
 from .navigate_tool import create_navigate_tool
 from .snapshot_tool import create_snapshot_tool
+from .ui_actions_tool import create_ui_actions_tool
 from .web_search_tool import create_web_search_tool
 
 __all__ = [
@@ -16,6 +17,7 @@ __all__ = [
     'create_fill_input_tool',
     'create_navigate_tool',
     'create_snapshot_tool',
+    'create_ui_actions_tool',
     'create_web_search_tool',
 ]
 
@@ -1,91 +1,170 @@
 from playwright.async_api import BrowserContext
 from crewai.tools import tool
 import asyncio
+from typing import Optional
+from helper.perception import resolve_element, describe_element
 from helper.take_screenshot import take_screenshot
 from helper.async_utils import create_async_to_sync_decorator
 from helper.page_helper import get_current_page
+from helper.task_events import TaskEventStream
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from models.screenshot_options import ScreenshotOptions
 
 
-def create_click_element_tool(context: BrowserContext, id_number: str, loop: asyncio.AbstractEventLoop):
-    """Factory function to create click_element_and_take_screenshot_tool with context and id_number bound."""
+async def click_element_and_take_screenshot(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    selector: Optional[str] = None,
+    bbox_x: Optional[float] = None,
+    bbox_y: Optional[float] = None,
+    bbox_width: Optional[float] = None,
+    bbox_height: Optional[float] = None,
+    screenshot_options: ScreenshotOptions = None,
+    element_id: Optional[int] = None,
+) -> str:
+    """
+    Click an element and screenshot it with its bounding box highlighted.
+
+    The element is given by a snapshot element id or by a selector. Shared by the
+    CrewAI tool and workflow replay; reports the step to events.
+    """
+    async with events.step(
+        "click_element_and_take_screenshot_tool", selector=selector, element_id=element_id,
+        bbox_x=bbox_x, bbox_y=bbox_y, bbox_width=bbox_width, bbox_height=bbox_height
+    ) as step:
+        try:
+            page = await get_current_page(context)
+
+            if element_id is not None:
+                element = await resolve_element(page, element_id)
+                if element is None:
+                    step.error = "Unknown element id"
+                    return f"No element with id {element_id} on the page, take a new capture_ui_snapshot_tool() and try again"
+
+                # Record a selector and the element's own box so the step can be replayed
+                description = await describe_element(element)
+                box = description["box"]
+                bbox_x, bbox_y, bbox_width, bbox_height = box["x"], box["y"], box["width"], box["height"]
+                step.args.update(
+                    selector=description["selector"],
+                    bbox_x=bbox_x, bbox_y=bbox_y, bbox_width=bbox_width, bbox_height=bbox_height,
+                )
+
+                path = await take_screenshot(
+                    page, id_number, tag="before_click",
+                    bbox_x=bbox_x, bbox_y=bbox_y,
+                    bbox_width=bbox_width, bbox_height=bbox_height,
+                    options=screenshot_options
+                )
+                step.screenshot_path = path
+                await element.click(timeout=3000)
+                step.url = page.url
+                return f"Clicked element and screenshot saved to path: {path}"
+
+            if not selector:
+                step.error = "No element given"
+                return "Pass the element_id of an element from the latest snapshot"
+
+            element = page.locator(selector)
+            count = await element.count()
+
+
+            if count == 0:
+                step.error = "No element found"
+                return "No element found please look at capture_ui_snapshot_tool() and try again"
+
+            path = await take_screenshot(
+                page, id_number, tag="before_click", 
+                bbox_x=bbox_x, bbox_y=bbox_y,
+                bbox_width=bbox_width, bbox_height=bbox_height,
+                options=screenshot_options
+            )
+            step.screenshot_path = path
+            
+            # If there is only one element (or no box to tell them apart), click it
+            if count == 1 or None in (bbox_x, bbox_y, bbox_width, bbox_height):
+                await element.first.click(timeout=3000)
+                step.url = page.url
+                return f"Clicked element and screenshot saved to path: {path}"
+
+            # If there is more than one element, click the center of the bounding box
+            click_x = bbox_x + bbox_width / 2
+            click_y = bbox_y + bbox_height / 2
+
+            # Scroll target into view 
+            await page.evaluate(
+                """({x, y}) => {
+                    window.scrollTo({
+                        top: Math.max(y - window.innerHeight / 2, 0),
+                        left: Math.max(x - window.innerWidth / 2, 0),
+                        behavior: 'instant'
+                    });
+                }""",
+                {"x": click_x, "y": click_y}  
+            )
+            await page.wait_for_timeout(150) 
+
+            await page.mouse.click(click_x, click_y)
+            step.url = page.url
+            return f"Clicked element and screenshot saved to path: {path}"
+
+        except Exception as e:
+            error_msg = f"Click failed: {type(e).__name__} - {e}"
+            print(error_msg)
+            step.error = error_msg
+            return error_msg
+
+
+def create_click_element_tool(
+    context: BrowserContext,
+    id_number: str,
+    loop: asyncio.AbstractEventLoop,
+    events: TaskEventStream,
+    screenshot_options: ScreenshotOptions = None,
+    prefetcher: SnapshotPrefetcher = None,
+):
+    """Factory function to create click_element_and_take_screenshot_tool with context, id_number, event stream, screenshot options and snapshot prefetcher bound."""
     
     # Create the async_to_sync decorator bound to this event loop
-    async_to_sync = create_async_to_sync_decorator(loop)
+    async_to_sync = create_async_to_sync_decorator(loop, name="click_element_and_take_screenshot_tool")
 
     @tool("click_element_and_take_screenshot_tool")
     def click_element_and_take_screenshot_tool(
-        selector: str, 
-        bbox_x: float, 
-        bbox_y: float, 
-        bbox_width: float, 
-        bbox_height: float
+        element_id: Optional[int] = None,
+        selector: Optional[str] = None,
+        bbox_x: Optional[float] = None,
+        bbox_y: Optional[float] = None,
+        bbox_width: Optional[float] = None,
+        bbox_height: Optional[float] = None,
     ):
         """
-        Click an element on the web page using a Playwright selector and take a screenshot of the element.
+        Click an element on the web page and take a screenshot of the element.
         
         Args:
-            selector (str): A CSS selector, text selector, or other Playwright-compatible selector.
-                           Do not make up any selector, use the selector that is already in the snapshot.
-                           Be as specific as possible.
+            element_id (int): The id of the element in the latest capture_ui_snapshot_tool() result
+                           (first column of the table). Preferred: no selector or bounding box is needed.
+            selector (str): Only when the element has no id: a CSS selector, text selector, or other
+                           Playwright-compatible selector. Do not make up any selector.
                            Examples: "[aria-label='Share'], div[role='button']:has-text('Share'), div[class*='Share']"
-            bbox_x (float): The x coordinate of the bounding box of the element.
-            bbox_y (float): The y coordinate of the bounding box of the element.
-            bbox_width (float): The width of the bounding box of the element.
-            bbox_height (float): The height of the bounding box of the element.
+            bbox_x (float): With a selector: the x coordinate of the bounding box of the element.
+            bbox_y (float): With a selector: the y coordinate of the bounding box of the element.
+            bbox_width (float): With a selector: the width of the bounding box of the element.
+            bbox_height (float): With a selector: the height of the bounding box of the element.
         
         Returns:
             str: Success message with the selector clicked and the screenshot path, or error message if the click fails.
         
         Usage: Use this when you need to interact with buttons, links, or clickable elements.
         """
-        @async_to_sync
-        async def _click():
-            try:
-                                
-                page = await get_current_page(context)
-                element = page.locator(selector)
-                count = await element.count()
-
-
-                if count == 0:
-                    return "No element found please look at capture_ui_snapshot_tool() and try again"
-
-                path = await take_screenshot(
-                    page, id_number, tag="before_click", 
-                    bbox_x=bbox_x, bbox_y=bbox_y,
-                    bbox_width=bbox_width, bbox_height=bbox_height
-                )
-                
-                # If there is only one element, click it
-                if count == 1:
-                    await element.first.click(timeout=3000)
-                    return f"Clicked element and screenshot saved to path: {path}"
-
-                # If there is more than one element, click the center of the bounding box
-                click_x = bbox_x + bbox_width / 2
-                click_y = bbox_y + bbox_height / 2
-
-                # Scroll target into view 
-                await page.evaluate(
-                    """({x, y}) => {
-                        window.scrollTo({
-                            top: Math.max(y - window.innerHeight / 2, 0),
-                            left: Math.max(x - window.innerWidth / 2, 0),
-                            behavior: 'instant'
-                        });
-                    }""",
-                    {"x": click_x, "y": click_y}  
-                )
-                await page.wait_for_timeout(150) 
-
-                await page.mouse.click(click_x, click_y)
-                return f"Clicked element and screenshot saved to path: {path}"
-
-            except Exception as e:
-                error_msg = f"Click failed: {type(e).__name__} - {e}"
-                print(error_msg)
-                return error_msg
-        return _click()
+        result = async_to_sync(click_element_and_take_screenshot)(
+            context, id_number, events, selector, bbox_x, bbox_y, bbox_width, bbox_height,
+            screenshot_options, element_id=element_id
+        )
+        # Snapshot the page in the background while the agent decides what to do next
+        if prefetcher is not None:
+            prefetcher.schedule()
+        return result
     
     return click_element_and_take_screenshot_tool
 
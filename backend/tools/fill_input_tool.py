@@ -1,38 +1,113 @@
 from playwright.async_api import BrowserContext
 from crewai.tools import tool
 import asyncio
+from typing import Optional
+from helper.perception import resolve_element, describe_element
 from helper.take_screenshot import take_screenshot
 from helper.async_utils import create_async_to_sync_decorator
 from helper.page_helper import get_current_page
+from helper.task_events import TaskEventStream
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from models.screenshot_options import ScreenshotOptions
 
 
-def create_fill_input_tool(context: BrowserContext, id_number: str, loop: asyncio.AbstractEventLoop):
-    """Factory function to create fill_input_and_take_screenshot_tool with context and id_number bound."""
+async def fill_input_and_take_screenshot(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    selector: Optional[str] = None,
+    bbox_x: Optional[float] = None,
+    bbox_y: Optional[float] = None,
+    bbox_width: Optional[float] = None,
+    bbox_height: Optional[float] = None,
+    value: str = "",
+    screenshot_options: ScreenshotOptions = None,
+    element_id: Optional[int] = None,
+) -> str:
+    """
+    Fill an input and screenshot it with its bounding box highlighted.
+
+    The input is given by a snapshot element id or by a selector. Shared by the
+    CrewAI tool and workflow replay; reports the step to events.
+    """
+    async with events.step(
+        "fill_input_and_take_screenshot_tool", selector=selector, element_id=element_id, value=value,
+        bbox_x=bbox_x, bbox_y=bbox_y, bbox_width=bbox_width, bbox_height=bbox_height
+    ) as step:
+        try:
+            page = await get_current_page(context)
+            if element_id is not None:
+                element = await resolve_element(page, element_id)
+                if element is None:
+                    step.error = "Unknown element id"
+                    return f"No element with id {element_id} on the page, take a new capture_ui_snapshot_tool() and try again"
+
+                # Record a selector and the element's own box so the step can be replayed
+                description = await describe_element(element)
+                box = description["box"]
+                bbox_x, bbox_y, bbox_width, bbox_height = box["x"], box["y"], box["width"], box["height"]
+                step.args.update(
+                    selector=description["selector"],
+                    bbox_x=bbox_x, bbox_y=bbox_y, bbox_width=bbox_width, bbox_height=bbox_height,
+                )
+                await element.fill(value, timeout=3000)
+            elif selector:
+                await page.fill(selector, value, timeout=3000)
+            else:
+                step.error = "No element given"
+                return "Pass the element_id of an input from the latest snapshot"
+
+            path = await take_screenshot(
+                page, id_number, tag="after_fill", 
+                bbox_x=bbox_x, bbox_y=bbox_y,
+                bbox_width=bbox_width, bbox_height=bbox_height,
+                options=screenshot_options
+            )
+            step.screenshot_path = path
+            step.url = page.url
+            return f"Input filled and screenshot saved to path: {path}"
+        except Exception as e:
+            step.error = f"{type(e).__name__} - {e}"
+            return f"Input fill failed: {type(e).__name__} - {e}"
+
+
+def create_fill_input_tool(
+    context: BrowserContext,
+    id_number: str,
+    loop: asyncio.AbstractEventLoop,
+    events: TaskEventStream,
+    screenshot_options: ScreenshotOptions = None,
+    prefetcher: SnapshotPrefetcher = None,
+):
+    """Factory function to create fill_input_and_take_screenshot_tool with context, id_number, event stream, screenshot options and snapshot prefetcher bound."""
     
     # Create the async_to_sync decorator bound to this event loop
-    async_to_sync = create_async_to_sync_decorator(loop)
+    async_to_sync = create_async_to_sync_decorator(loop, name="fill_input_and_take_screenshot_tool")
 
     @tool("fill_input_and_take_screenshot_tool")
     def fill_input_and_take_screenshot_tool(
-        selector: str, 
-        bbox_x: float, 
-        bbox_y: float, 
-        bbox_width: float, 
-        bbox_height: float, 
-        value: str
+        value: str,
+        element_id: Optional[int] = None,
+        selector: Optional[str] = None,
+        bbox_x: Optional[float] = None,
+        bbox_y: Optional[float] = None,
+        bbox_width: Optional[float] = None,
+        bbox_height: Optional[float] = None,
     ):
         """
         Fill an input field with the specified text value and take a screenshot of the element.
         
         Args:
-            selector (str): A CSS selector, text selector, or other Playwright-compatible selector.
-                           Do not make up any selector, use the selector that is already in the snapshot.
-                           Be as specific as possible for selector. Always look for whether there is a clash for the selector.
+            element_id (int): The id of the input in the latest capture_ui_snapshot_tool() result
+                           (first column of the table). Preferred: no selector or bounding box is needed.
+            selector (str): Only when the input has no id: a CSS selector, text selector, or other
+                           Playwright-compatible selector. Do not make up any selector.
+                           Always look for whether there is a clash for the selector.
                            Examples: "input[placeholder='Add emails'], input[class*='email']"
-            bbox_x (float): The x coordinate of the bounding box of the element.
-            bbox_y (float): The y coordinate of the bounding box of the element.
-            bbox_width (float): The width of the bounding box of the element.
-            bbox_height (float): The height of the bounding box of the element.
+            bbox_x (float): With a selector: the x coordinate of the bounding box of the element.
+            bbox_y (float): With a selector: the y coordinate of the bounding box of the element.
+            bbox_width (float): With a selector: the width of the bounding box of the element.
+            bbox_height (float): With a selector: the height of the bounding box of the element.
             value (str): The text value to fill into the input field.
                 Example: "arda@example.com"
         Returns:
@@ -40,20 +115,14 @@ def create_fill_input_tool(context: BrowserContext, id_number: str, loop: asynci
         
         Usage: Use this to enter text into input fields, textareas, or contenteditable elements.
         """
-        @async_to_sync
-        async def _fill():
-            try:
-                page = await get_current_page(context)
-                await page.fill(selector, value, timeout=3000)
-                path = await take_screenshot(
-                    page, id_number, tag="after_fill", 
-                    bbox_x=bbox_x, bbox_y=bbox_y,
-                    bbox_width=bbox_width, bbox_height=bbox_height
-                )
-                return f"Input filled and screenshot saved to path: {path}"
-            except Exception as e:
-                return f"Input fill failed: {type(e).__name__} - {e}"
-        return _fill()
+        result = async_to_sync(fill_input_and_take_screenshot)(
+            context, id_number, events, selector, bbox_x, bbox_y, bbox_width, bbox_height, value,
+            screenshot_options, element_id=element_id
+        )
+        # Snapshot the page in the background while the agent decides what to do next
+        if prefetcher is not None:
+            prefetcher.schedule()
+        return result
     
     return fill_input_and_take_screenshot_tool
 
@@ -4,13 +4,49 @@ import asyncio
 from helper.take_screenshot import take_screenshot
 from helper.async_utils import create_async_to_sync_decorator
 from helper.page_helper import get_current_page
+from helper.task_events import TaskEventStream
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from models.screenshot_options import ScreenshotOptions
 
 
-def create_navigate_tool(context: BrowserContext, id_number: str, loop: asyncio.AbstractEventLoop):
-    """Factory function to create navigate_page_and_take_screenshot_tool with context and id_number bound."""
+async def navigate_page_and_take_screenshot(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    url: str,
+    screenshot_options: ScreenshotOptions = None,
+) -> str:
+    """
+    Navigate the current page to a URL and screenshot it once it has settled.
+
+    Shared by the CrewAI tool and workflow replay; reports the step to events.
+    """
+    async with events.step("navigate_page_and_take_screenshot_tool", url=url) as step:
+        try:
+            page = await get_current_page(context)
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            # take_screenshot waits for dynamic content to settle
+            path = await take_screenshot(page, id_number, tag="after_navigate", options=screenshot_options)
+            step.screenshot_path = path
+            step.url = page.url
+            return f"Navigated to {url} and screenshot saved to path: {path}"
+        except Exception as e:
+            step.error = f"{type(e).__name__} - {e}"
+            return f"Navigation failed: {type(e).__name__} - {e}"
+
+
+def create_navigate_tool(
+    context: BrowserContext,
+    id_number: str,
+    loop: asyncio.AbstractEventLoop,
+    events: TaskEventStream,
+    screenshot_options: ScreenshotOptions = None,
+    prefetcher: SnapshotPrefetcher = None,
+):
+    """Factory function to create navigate_page_and_take_screenshot_tool with context, id_number, event stream, screenshot options and snapshot prefetcher bound."""
     
     # Create the async_to_sync decorator bound to this event loop
-    async_to_sync = create_async_to_sync_decorator(loop)
+    async_to_sync = create_async_to_sync_decorator(loop, name="navigate_page_and_take_screenshot_tool")
 
     @tool("navigate_page_and_take_screenshot_tool")
     def navigate_page_and_take_screenshot_tool(url: str):
@@ -27,18 +63,11 @@ def create_navigate_tool(context: BrowserContext, id_number: str, loop: asyncio.
         Usage: Use this to load new pages or navigate to different URLs. The page will wait 
                until DOM content is loaded before considering the navigation complete.
         """
-        @async_to_sync
-        async def _navigate():
-            try:
-                page = await get_current_page(context)
-                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                # Wait for dynamic content to settle
-                await page.wait_for_timeout(600)
-                path = await take_screenshot(page, id_number, tag="after_navigate")
-                return f"Navigated to {url} and screenshot saved to path: {path}"
-            except Exception as e:
-                return f"Navigation failed: {type(e).__name__} - {e}"
-        return _navigate()
+        result = async_to_sync(navigate_page_and_take_screenshot)(context, id_number, events, url, screenshot_options)
+        # Snapshot the page in the background while the agent decides what to do next
+        if prefetcher is not None:
+            prefetcher.schedule()
+        return result
     
     return navigate_page_and_take_screenshot_tool
 
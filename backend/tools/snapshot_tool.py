@@ -1,30 +1,50 @@
 from playwright.async_api import BrowserContext
 from crewai.tools import tool
-from typing import Dict
+from typing import Dict, Optional
 import asyncio
-from helper.perception import Perception
 from helper.async_utils import create_async_to_sync_decorator
 from helper.page_helper import get_current_page
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from helper.task_events import TaskEventStream
 
 
-def create_snapshot_tool(context: BrowserContext, loop: asyncio.AbstractEventLoop):
-    """Factory function to create capture_ui_snapshot_tool with context bound."""
+def create_snapshot_tool(
+    context: BrowserContext,
+    loop: asyncio.AbstractEventLoop,
+    events: TaskEventStream,
+    prefetcher: SnapshotPrefetcher = None,
+):
+    """Factory function to create capture_ui_snapshot_tool with context, event stream and snapshot prefetcher bound."""
     
-    perception = Perception()
+    # Without a prefetcher every call takes a fresh snapshot
+    if prefetcher is None:
+        prefetcher = SnapshotPrefetcher(context, loop, enabled=False)
     
     # Create the async_to_sync decorator bound to this event loop
-    async_to_sync = create_async_to_sync_decorator(loop)
+    async_to_sync = create_async_to_sync_decorator(loop, name="capture_ui_snapshot_tool")
 
     @tool("capture_ui_snapshot_tool")
-    def capture_ui_snapshot_tool() -> Dict:
+    def capture_ui_snapshot_tool(since_snapshot_id: Optional[int] = None) -> Dict:
         """
         Extract and analyze the UI structure and interactive elements of the current page.
-        IMPORTANT: This tool always captures a fresh snapshot and never returns cached results.
+        IMPORTANT: This tool always reflects the current page. A snapshot prepared right after
+        your last action is only returned when the page has not changed since.
+        
+        Args:
+            since_snapshot_id (int, optional): The snapshot_id of a previous snapshot of the same page.
+                           When given, only the elements added, changed or removed since that snapshot
+                           are returned, which is much shorter after small UI changes such as an
+                           opened modal or menu. Leave empty for a full snapshot, and always after
+                           navigating to another page.
         
         Returns:
-            Dict: A structured snapshot containing information about interactive elements,
-                  their selectors, labels, types, and hierarchy. Useful for understanding
-                  what actions are available on the current page.
+            Dict: A structured snapshot of the visible text and interactive elements. Elements are
+                  a table with one element per line and the columns given in "columns":
+                  id|tag|role|text|label|class|x,y,w,h (empty cells are left out, role only when
+                  the tag does not imply it). Pass the id to the click and fill tools. Interactive
+                  and on-screen elements are listed first when the page has more elements than fit;
+                  omitted_count tells how many were left out. Every snapshot has a snapshot_id that
+                  can be passed back as since_snapshot_id.
         
         Usage: Use this to get a comprehensive understanding of the page structure before
                deciding which elements to interact with. This is particularly useful when
@@ -33,16 +53,18 @@ def create_snapshot_tool(context: BrowserContext, loop: asyncio.AbstractEventLoo
         """
         @async_to_sync
         async def _capture():
-            try:
-                page = await get_current_page(context)
-                await page.wait_for_load_state("domcontentloaded")
-                await page.wait_for_timeout(600)
-                snapshot = await perception.extract_ui_snapshot(page)
-                
-                return snapshot
-            except Exception as e:
-                error_msg = f"Capture UI snapshot failed: {type(e).__name__} - {e}"
-                return error_msg
+            async with events.step("capture_ui_snapshot_tool", since_snapshot_id=since_snapshot_id) as step:
+                try:
+                    page = await get_current_page(context)
+                    await page.wait_for_load_state("domcontentloaded")
+                    snapshot = await prefetcher.snapshot(page, since_snapshot_id)
+                    step.url = snapshot["url"]
+                    
+                    return snapshot
+                except Exception as e:
+                    error_msg = f"Capture UI snapshot failed: {type(e).__name__} - {e}"
+                    step.error = error_msg
+                    return error_msg
         return _capture()
     
     return capture_ui_snapshot_tool
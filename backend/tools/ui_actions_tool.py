@@ -0,0 +1,239 @@
+from playwright.async_api import BrowserContext, Page
+from crewai.tools import tool
+import asyncio
+import os
+from typing import Dict, List, Optional
+from helper.perception import resolve_element, describe_element
+from helper.take_screenshot import take_screenshot
+from helper.async_utils import get_tool_bridge
+from helper.page_helper import get_current_page
+from helper.settle import wait_for_settle
+from helper.task_events import TaskEventStream, ToolStep
+from helper.snapshot_prefetch import SnapshotPrefetcher
+from models.screenshot_options import ScreenshotOptions
+from models.ui_action import UIAction
+from tools.click_element_tool import click_element_and_take_screenshot
+from tools.fill_input_tool import fill_input_and_take_screenshot
+
+# Most actions one tool call may run; longer lists are rejected
+MAX_UI_ACTIONS = int(os.getenv("UI_ACTIONS_MAX", "10"))
+
+
+async def _locate(page: Page, step: ToolStep, element_id: Optional[int], selector: Optional[str]):
+    """
+    The element of a snapshot id or selector and its box, or (None, None). For an id the
+    element's selector is recorded in the step so the action can be replayed.
+    """
+    if element_id is not None:
+        element = await resolve_element(page, element_id)
+        if element is None:
+            return None, None
+        description = await describe_element(element)
+        step.args.update(selector=description["selector"])
+        return element, description["box"]
+
+    element = page.locator(selector).first
+    if await element.count() == 0:
+        return None, None
+    return element, await element.bounding_box()
+
+
+async def press_key_and_take_screenshot(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    key: str,
+    selector: Optional[str] = None,
+    screenshot_options: ScreenshotOptions = None,
+    element_id: Optional[int] = None,
+) -> str:
+    """
+    Press a key on an element, or on the page when none is given, and screenshot the result.
+
+    Shared by the UI actions tool and workflow replay; reports the step to events.
+    """
+    async with events.step("press_key_and_take_screenshot_tool", key=key, selector=selector, element_id=element_id) as step:
+        try:
+            page = await get_current_page(context)
+            box = None
+            if element_id is not None or selector:
+                element, box = await _locate(page, step, element_id, selector)
+                if element is None:
+                    step.error = "No element found"
+                    return "No element found, take a new capture_ui_snapshot_tool() and try again"
+                await element.press(key, timeout=3000)
+            else:
+                await page.keyboard.press(key)
+
+            box = box or {}
+            path = await take_screenshot(
+                page, id_number, tag="after_press",
+                bbox_x=box.get("x"), bbox_y=box.get("y"),
+                bbox_width=box.get("width"), bbox_height=box.get("height"),
+                options=screenshot_options
+            )
+            step.screenshot_path = path
+            step.url = page.url
+            return f"Pressed {key} and screenshot saved to path: {path}"
+        except Exception as e:
+            step.error = f"{type(e).__name__} - {e}"
+            return f"Key press failed: {type(e).__name__} - {e}"
+
+
+async def select_option_and_take_screenshot(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    value: str,
+    selector: Optional[str] = None,
+    screenshot_options: ScreenshotOptions = None,
+    element_id: Optional[int] = None,
+) -> str:
+    """
+    Select the option of a <select> matching value (by value or label) and screenshot it.
+
+    Shared by the UI actions tool and workflow replay; reports the step to events.
+    """
+    async with events.step("select_option_and_take_screenshot_tool", value=value, selector=selector, element_id=element_id) as step:
+        try:
+            page = await get_current_page(context)
+            element, box = await _locate(page, step, element_id, selector)
+            if element is None:
+                step.error = "No element found"
+                return "No element found, take a new capture_ui_snapshot_tool() and try again"
+            await element.select_option(value, timeout=3000)
+
+            box = box or {}
+            path = await take_screenshot(
+                page, id_number, tag="after_select",
+                bbox_x=box.get("x"), bbox_y=box.get("y"),
+                bbox_width=box.get("width"), bbox_height=box.get("height"),
+                options=screenshot_options
+            )
+            step.screenshot_path = path
+            step.url = page.url
+            return f"Selected {value} and screenshot saved to path: {path}"
+        except Exception as e:
+            step.error = f"{type(e).__name__} - {e}"
+            return f"Select failed: {type(e).__name__} - {e}"
+
+
+async def perform_ui_actions(
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    actions: List[UIAction],
+    screenshot_options: ScreenshotOptions = None,
+) -> List[Dict]:
+    """
+    Run actions in order on the current page, letting the page settle in between.
+
+    Every action is its own step with its own screenshot, so the run is recorded
+    and replayed like single tool calls. Stops at the first failed action; the
+    remaining ones are reported as skipped.
+    """
+    results = []
+    for index, action in enumerate(actions):
+        if results and results[-1]["status"] != "ok":
+            results.append({"index": index, "action": action.action, "status": "skipped"})
+            continue
+        if index > 0:
+            # The previous action may have opened a menu or started a request
+            await wait_for_settle(await get_current_page(context))
+
+        if action.action == "click":
+            message = await click_element_and_take_screenshot(
+                context, id_number, events, action.selector,
+                screenshot_options=screenshot_options, element_id=action.element_id
+            )
+        elif action.action == "fill":
+            message = await fill_input_and_take_screenshot(
+                context, id_number, events, action.selector, value=action.value or "",
+                screenshot_options=screenshot_options, element_id=action.element_id
+            )
+        elif action.action == "press":
+            message = await press_key_and_take_screenshot(
+                context, id_number, events, action.key or "Enter", action.selector,
+                screenshot_options, element_id=action.element_id
+            )
+        else:
+            message = await select_option_and_take_screenshot(
+                context, id_number, events, action.value or "", action.selector,
+                screenshot_options, element_id=action.element_id
+            )
+
+        step = events.history[-1]
+        result = {"index": index, "action": action.action, "status": step.status}
+        if step.status == "ok":
+            result["screenshot_path"] = step.screenshot_path
+        else:
+            result["error"] = message
+        results.append(result)
+    return results
+
+
+def create_ui_actions_tool(
+    context: BrowserContext,
+    id_number: str,
+    loop: asyncio.AbstractEventLoop,
+    events: TaskEventStream,
+    screenshot_options: ScreenshotOptions = None,
+    prefetcher: SnapshotPrefetcher = None,
+):
+    """Factory function to create perform_ui_actions_tool with context, id_number, event stream, screenshot options and snapshot prefetcher bound."""
+
+    # A batch may take as long as its actions would as single tool calls
+    bridge = get_tool_bridge(loop)
+
+    @tool("perform_ui_actions_tool")
+    def perform_ui_actions_tool(actions: List[UIAction]) -> Dict:
+        """
+        Perform several clicks, fills, key presses and selects on the current page in one call,
+        taking a screenshot after each of them.
+
+        Args:
+            actions (list): The actions in order, each an object with:
+                           action: "click", "fill", "press" or "select"
+                           element_id: the id of the element in the latest capture_ui_snapshot_tool() result
+                           selector: only when the element has no id, a Playwright-compatible selector
+                           value: the text to fill, or the value or label of the option to select
+                           key: the key to press, e.g. "Enter" (without an element the key goes to the page)
+                Example: [{"action": "fill", "element_id": 12, "value": "Arda"},
+                          {"action": "fill", "element_id": 14, "value": "arda@example.com"},
+                          {"action": "select", "element_id": 17, "value": "Admin"},
+                          {"action": "click", "element_id": 21}]
+
+        Returns:
+            Dict: "results" with one entry per action: its index, action, status ("ok", "error" or
+                  "skipped") and screenshot_path or error. The actions stop at the first failure;
+                  the following actions are skipped. "url" is the page URL afterwards.
+
+        Usage: Use this to fill a form or run a known sequence of actions on elements that are all
+               in the latest snapshot, instead of one tool call per field. Element ids of an action
+               must not depend on the result of an earlier action in the same call (e.g. an item
+               of a menu that is only opened by the call); use single tools for those.
+        """
+        try:
+            parsed = [UIAction.model_validate(action) for action in actions]
+        except Exception as e:
+            return {"error": f"Invalid actions: {e}"}
+        if not parsed:
+            return {"error": "Pass at least one action"}
+        if len(parsed) > MAX_UI_ACTIONS:
+            return {"error": f"At most {MAX_UI_ACTIONS} actions per call"}
+
+        async def _perform():
+            results = await perform_ui_actions(context, id_number, events, parsed, screenshot_options)
+            page = await get_current_page(context)
+            return {"results": results, "url": page.url}
+
+        result = bridge.run(
+            "perform_ui_actions_tool", _perform,
+            timeout=bridge.timeout_for("perform_ui_actions_tool") * len(parsed)
+        )
+        # Snapshot the page in the background while the agent decides what to do next
+        if prefetcher is not None:
+            prefetcher.schedule()
+        return result
+
+    return perform_ui_actions_tool
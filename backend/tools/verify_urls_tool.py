@@ -0,0 +1,103 @@
+from playwright.async_api import BrowserContext, Page
+from crewai.tools import tool
+import asyncio
+import json
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+from helper.async_utils import create_async_to_sync_decorator
+from helper.request_blocking import site_of
+from helper.task_events import TaskEventStream
+from session import LOGIN_PATH_PATTERN
+
+# Candidates checked per call and the page load budget of each
+MAX_CANDIDATES = 5
+LOAD_TIMEOUT_MS = 15000
+
+
+async def _check_candidate(page: Page, url: str) -> Dict:
+    """Load a URL and collect the cheap signals the ranking uses."""
+    result = {"url": url, "final_url": None, "status": None, "title": "", "login_wall": False, "error": None}
+    started = time.perf_counter()
+    try:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=LOAD_TIMEOUT_MS)
+        result["status"] = response.status if response is not None else None
+        result["final_url"] = page.url
+        result["title"] = (await page.title()).strip()[:120]
+        has_password_field = await page.locator("input[type='password']").count() > 0
+        result["login_wall"] = has_password_field or bool(LOGIN_PATH_PATTERN.search(urlparse(page.url).path))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__} - {str(e).splitlines()[0]}"
+    result["load_ms"] = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+def _score(result: Dict) -> float:
+    if result["error"] or result["status"] is None:
+        return 0
+    score = 4 if result["status"] < 400 else 1
+    if not result["login_wall"]:
+        score += 2
+    final_host, requested_host = urlparse(result["final_url"]).hostname, urlparse(result["url"]).hostname
+    if final_host and requested_host and site_of(final_host) == site_of(requested_host):
+        score += 1
+    return score
+
+
+async def verify_urls(context: BrowserContext, events: TaskEventStream, urls: List[str]) -> str:
+    """
+    Load candidate URLs concurrently in throwaway pages of the context and rank them.
+
+    The pages are closed again, so the task's current page is left untouched.
+    """
+    candidates = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))[:MAX_CANDIDATES]
+    async with events.step("verify_urls_tool", urls=candidates) as step:
+        if not candidates:
+            step.error = "No URLs given"
+            return json.dumps({"results": [], "best_url": None})
+
+        pages = []
+        try:
+            pages = list(await asyncio.gather(*(context.new_page() for _ in candidates)))
+            results = await asyncio.gather(*(
+                _check_candidate(page, url) for page, url in zip(pages, candidates)
+            ))
+        finally:
+            await asyncio.gather(*(page.close() for page in pages), return_exceptions=True)
+
+        # Stable sort: equally good candidates keep the search order
+        ranked = sorted(results, key=_score, reverse=True)
+        best = ranked[0] if _score(ranked[0]) > 0 else None
+        step.url = best["final_url"] if best else None
+        if best is None:
+            step.error = "No candidate URL could be loaded"
+        return json.dumps({"results": ranked, "best_url": best["url"] if best else None})
+
+
+def create_verify_urls_tool(context: BrowserContext, loop: asyncio.AbstractEventLoop, events: TaskEventStream):
+    """Factory function to create verify_urls_tool with context and event stream bound."""
+
+    # Create the async_to_sync decorator bound to this event loop
+    async_to_sync = create_async_to_sync_decorator(loop, name="verify_urls_tool")
+
+    @tool("verify_urls_tool")
+    def verify_urls_tool(urls: List[str]) -> str:
+        """
+        Check several candidate URLs at once and rank them, without taking screenshots.
+
+        Args:
+            urls (List[str]): Candidate URLs, e.g. all urls returned by web_search_url_tool().
+                              At most 5 are checked.
+
+        Returns:
+            str: JSON with "best_url" and "results", best first. Each result has the requested url,
+                 the final_url after redirects, the HTTP status, the page title, whether the page is
+                 a login wall (login_wall) and an error if the page did not load.
+
+        Usage: Use this right after web_search_url_tool() when it returns more than one URL, instead
+               of navigating to each candidate. Then navigate to best_url with
+               navigate_page_and_take_screenshot_tool().
+        """
+        return async_to_sync(verify_urls)(context, events, urls)
+
+    return verify_urls_tool
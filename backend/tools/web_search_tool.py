@@ -1,6 +1,7 @@
 from crewai.tools import tool
 from openai import OpenAI
 import json
+from helper.url_cache import get_url_cache
 
 
 def create_web_search_tool():
@@ -8,10 +9,12 @@ def create_web_search_tool():
     Factory function to create web_search_url_tool.
     
     This tool doesn't need page, id_number, or loop dependencies since it only
-    makes API calls to OpenAI's web search feature.
+    makes API calls to OpenAI's web search feature. Goals naming a known app and
+    goals resolved before are answered from the URL cache without a web search.
     """
     
     client = OpenAI()
+    url_cache = get_url_cache()
     
     @tool("web_search_url_tool")
     def web_search_url_tool(goal: str) -> str:
@@ -33,7 +36,9 @@ def create_web_search_tool():
                based on the user's goal. This is especially useful when the starting
                URL depends on the task context (like a specific repository or project).
         """
-        
+        cached_urls = url_cache.lookup(goal)
+        if cached_urls is not None:
+            return json.dumps({"urls": cached_urls})
 
         system_prompt = """You are a web URL finder assistant. 
 Your job is to identify the **base URL (domain only)** of the web application where the user's workflow should begin,
@@ -68,6 +73,8 @@ You MUST return ONLY a valid JSON object with this exact structure (no extra tex
             try:
                 parsed = json.loads(result)
                 if "urls" in parsed:
+                    if parsed["urls"]:
+                        url_cache.store(goal, parsed["urls"])
                     return result
                 else:
                     return f'{{"urls": [], "error": "Invalid response format from web search"}}'
@@ -0,0 +1,92 @@
+"""
+Worker - A process that runs workflow jobs from the shared job store.
+
+Every worker process owns its Playwright driver, browser pool and event loop,
+and runs up to TASK_MAX_CONCURRENT_BROWSERS jobs at a time. Workers are started
+by the API process when TASK_WORKER_PROCESSES is set, or by hand:
+
+    python worker.py 0
+"""
+
+import asyncio
+import os
+import signal
+import sys
+from dotenv import load_dotenv
+from browser_pool import get_browser_pool
+from helper.config_registry import get_config_registry
+from helper.job_store import JobStore, StoredTaskEventStream, get_job_store
+from task_service import get_task_service
+
+# Seconds running jobs get to finish after a stop signal before they are cancelled
+SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+# How often an idle worker slot looks for queued jobs
+CLAIM_POLL_SECONDS = 0.5
+
+
+def run_worker(index: int):
+    """Process entry point: run jobs until SIGTERM or SIGINT."""
+    load_dotenv()
+    asyncio.run(_serve(f"worker-{index}"))
+
+
+async def _serve(worker_id: str):
+    get_config_registry().load_all()
+    store = get_job_store()
+    await asyncio.to_thread(store.fail_orphaned, worker_id)
+    browser_pool = get_browser_pool()
+    await browser_pool.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    slots = int(os.getenv("TASK_MAX_CONCURRENT_BROWSERS", os.getenv("BROWSER_POOL_SIZE", "2")))
+    runners = [asyncio.create_task(_run_jobs(worker_id, stop)) for _ in range(slots)]
+    print(f"{worker_id} (pid {os.getpid()}) running up to {slots} jobs at a time")
+
+    await stop.wait()
+    # Let running jobs finish briefly, then cancel them
+    _, pending = await asyncio.wait(runners, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    for runner in pending:
+        runner.cancel()
+    await asyncio.gather(*runners, return_exceptions=True)
+    await browser_pool.close()
+
+
+async def _run_jobs(worker_id: str, stop: asyncio.Event):
+    store = get_job_store()
+    while not stop.is_set():
+        claimed = await asyncio.to_thread(store.claim, worker_id)
+        if claimed is None:
+            try:
+                await asyncio.wait_for(stop.wait(), CLAIM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        job_id, request = claimed
+        events = StoredTaskEventStream(store, job_id)
+        try:
+            result = await get_task_service().start_task(request, events=events)
+            await _finish(store, events, job_id, result)
+        except asyncio.CancelledError:
+            await asyncio.shield(_finish(store, events, job_id, None, "Job cancelled during shutdown"))
+            raise
+        except Exception as e:
+            print(f"Job {job_id} failed on {worker_id}: {str(e)}")
+            await _finish(store, events, job_id, None, str(e))
+        finally:
+            events.close()
+
+
+async def _finish(store: JobStore, events: StoredTaskEventStream, job_id: str, result, error: str = None):
+    """Record a job's outcome once all its events are stored, so its final status event comes last."""
+    await events.drain()
+    await asyncio.to_thread(store.finish, job_id, result, error)
+
+
+if __name__ == "__main__":
+    run_worker(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
@@ -0,0 +1,68 @@
+"""
+Workflow Replay - Re-executes a recorded workflow trace without the agents.
+
+Each recorded step is run through the same implementation the agents' tools
+use, so replayed steps take screenshots and publish step events exactly like a
+live run. Replay stops at the first step that fails, e.g. because a selector
+no longer matches, and the caller falls back to the agents.
+"""
+
+import asyncio
+from typing import List, Optional
+from playwright.async_api import BrowserContext
+from helper.async_utils import get_tool_bridge
+from helper.page_helper import get_current_page
+from helper.settle import wait_for_settle
+from helper.task_events import TaskEventStream
+from models.screenshot_options import ScreenshotOptions
+from models.workflow_trace import WorkflowTrace
+from tools.click_element_tool import click_element_and_take_screenshot
+from tools.fill_input_tool import fill_input_and_take_screenshot
+from tools.navigate_tool import navigate_page_and_take_screenshot
+from tools.ui_actions_tool import press_key_and_take_screenshot, select_option_and_take_screenshot
+
+REPLAY_FUNCTIONS = {
+    "navigate_page_and_take_screenshot_tool": navigate_page_and_take_screenshot,
+    "click_element_and_take_screenshot_tool": click_element_and_take_screenshot,
+    "fill_input_and_take_screenshot_tool": fill_input_and_take_screenshot,
+    "press_key_and_take_screenshot_tool": press_key_and_take_screenshot,
+    "select_option_and_take_screenshot_tool": select_option_and_take_screenshot,
+}
+
+
+async def replay_trace(
+    trace: WorkflowTrace,
+    context: BrowserContext,
+    id_number: str,
+    events: TaskEventStream,
+    screenshot_options: ScreenshotOptions = None,
+) -> Optional[List[str]]:
+    """
+    Replay the steps of a trace in order.
+
+    Returns:
+        The screenshot path of every step, or None if a step failed
+    """
+    bridge = get_tool_bridge()
+    screenshot_paths = []
+    for index, step in enumerate(trace.steps):
+        # Without an agent thinking between steps, let the previous action finish first
+        await wait_for_settle(await get_current_page(context))
+        try:
+            await asyncio.wait_for(
+                REPLAY_FUNCTIONS[step.tool](
+                    context, id_number, events, **step.args, screenshot_options=screenshot_options
+                ),
+                bridge.timeout_for(step.tool),
+            )
+        except asyncio.TimeoutError:
+            print(f"Replay step {index + 1}/{len(trace.steps)} ({step.tool}) timed out")
+            return None
+
+        event = events.history[-1]
+        if event.status != "ok":
+            print(f"Replay step {index + 1}/{len(trace.steps)} ({step.tool}) failed: {event.error}")
+            return None
+        screenshot_paths.append(event.screenshot_path)
+
+    return screenshot_paths
@@ -2,7 +2,12 @@
 
 import { useState, useEffect } from "react";
 import axios from "axios";
-import { StartTaskRequest, StartTaskResponse, WorkflowDisplay } from "@/types";
+import {
+  JobResponse,
+  StartTaskRequest,
+  SubmitJobResponse,
+  WorkflowDisplay,
+} from "@/types";
 import LoginExplanationModal from "./LoginExplanationModal";
 
 interface WorkflowCaptureProps {
@@ -12,6 +17,9 @@ interface WorkflowCaptureProps {
 }
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+const POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
 
 export default function WorkflowCapture({
   onWorkflowCaptured,
@@ -53,17 +61,28 @@ export default function WorkflowCapture({
         task_id: taskId,
       };
 
-      const response = await axios.post<StartTaskResponse>(
-        `${API_URL}/tasks/start`,
-        requestData,
-        {
-          timeout: 300000, // 5 minutes timeout
-        }
+      // Queue the task, then poll until a worker has finished it
+      const submitResponse = await axios.post<SubmitJobResponse>(
+        `${API_URL}/tasks`,
+        requestData
       );
+      const jobId = submitResponse.data.job_id;
+
+      let job: JobResponse;
+      do {
+        await sleep(POLL_INTERVAL_MS);
+        job = (await axios.get<JobResponse>(`${API_URL}/tasks/${jobId}`)).data;
+      } while (job.status === "queued" || job.status === "running");
+
+      if (job.status === "failed" || !job.result) {
+        setError(`Task execution failed: ${job.error}`);
+        onCapturingChange(false);
+        return;
+      }
 
       // Add client metadata to backend response
       const workflowDisplay: WorkflowDisplay = {
-        ...response.data,
+        ...job.result,
         task_id: taskId,
         task: task.trim(),
       };
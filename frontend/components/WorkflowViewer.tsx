@@ -1,5 +1,6 @@
 "use client";
 
+import { useState } from "react";
 import Image from "next/image";
 import { WorkflowDisplay } from "@/types";
 
@@ -9,6 +10,41 @@ interface WorkflowViewerProps {
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+interface ScreenshotProps {
+  path: string;
+  thumbnailPath?: string;
+  alt: string;
+}
+
+// Shows the small thumbnail right away and swaps in the full image once it has loaded
+function Screenshot({ path, thumbnailPath, alt }: ScreenshotProps) {
+  const [fullLoaded, setFullLoaded] = useState(!thumbnailPath || thumbnailPath === path);
+
+  return (
+    <div className="relative">
+      {!fullLoaded && (
+        <Image
+          src={`${API_URL}/${thumbnailPath}`}
+          alt={alt}
+          width={1920}
+          height={1080}
+          className="w-full h-auto"
+          unoptimized
+        />
+      )}
+      <Image
+        src={`${API_URL}/${path}`}
+        alt={alt}
+        width={1920}
+        height={1080}
+        className={fullLoaded ? "w-full h-auto" : "absolute inset-0 w-full h-auto opacity-0"}
+        onLoad={() => setFullLoaded(true)}
+        unoptimized
+      />
+    </div>
+  );
+}
+
 export default function WorkflowViewer({ workflow }: WorkflowViewerProps) {
   // Parse explanation into steps (split by numbered list)
   const explanationSteps = workflow.explanation
@@ -128,13 +164,10 @@ export default function WorkflowViewer({ workflow }: WorkflowViewerProps) {
                       </p>
                     )}
                     <div className="relative rounded-lg overflow-hidden border-2 border-gray-200 dark:border-gray-600 shadow-md hover:shadow-xl transition-shadow">
-                      <Image
-                        src={`${API_URL}/${screenshotPath}`}
+                      <Screenshot
+                        path={screenshotPath}
+                        thumbnailPath={workflow.thumbnail_paths?.[index]}
                         alt={`Step ${index + 1}`}
-                        width={1920}
-                        height={1080}
-                        className="w-full h-auto"
-                        unoptimized
                       />
                     </div>
                   </div>
@@ -1,14 +1,51 @@
 // Backend API Types (matching backend/models/)
+export interface ScreenshotOptions {
+  format?: "png" | "jpeg" | "webp";
+  quality?: number;
+  scale?: number;
+  thumbnail_width?: number;
+}
+
 export interface StartTaskRequest {
   login_url?: string;
   session_path: string;
   task: string;
   task_id: string;
+  screenshot?: ScreenshotOptions;
+  replay?: boolean;
 }
 
 export interface StartTaskResponse {
   paths: string[];
+  thumbnail_paths?: string[];
   explanation: string;
+  replayed?: boolean;
+  blocked_requests?: Record<string, number>;
+  timings?: Record<string, SpanTiming>;
+}
+
+export interface SpanTiming {
+  count: number;
+  total_ms: number;
+  max_ms: number;
+}
+
+export type JobStatus = "queued" | "running" | "succeeded" | "failed";
+
+export interface SubmitJobResponse {
+  job_id: string;
+  status: JobStatus;
+}
+
+export interface JobResponse {
+  job_id: string;
+  task_id: string;
+  status: JobStatus;
+  result?: StartTaskResponse;
+  error?: string;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
 }
 
 // Frontend display type - extends backend response with client metadata